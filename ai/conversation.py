@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from ai.job_queue import BACKGROUND
+from core.metrics import registry
+from config import (
+    CHAT_CONTEXT_MAX, CHAT_HISTORY, CHAT_KEEP_TURNS, CHAT_TOKEN_BUDGET, DATA_DIR,
+)
+
+PERSONA = (
+    "You are a cute pixel cat pet named Mrs. Mewlette who lives on the user's desktop. "
+    "Keep your replies short, warm, and positive. Use emojis sometimes."
+)
+
+
+# Per-turn profiling entries kept (the app runs for days)
+LOG_SIZE = 100
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English; only used for budgeting
+    return len(text) // 4 + 1
+
+
+class Conversation:
+    """Multi-turn chat memory within a token budget.
+
+    While the server hands back its `context` (the evaluated token state),
+    each turn sends only the new message and continues from it. Without a
+    usable context (first turn, subprocess fallback, context over
+    CHAT_CONTEXT_MAX) the prompt is rebuilt from a running summary plus the
+    newest turns that fit in CHAT_TOKEN_BUDGET. Older turns are folded into
+    the summary by a background job. Everything is saved to disk, context
+    included, so a restart picks up where it left off.
+    """
+
+    def __init__(self, ollama, ai_queue, path=os.path.join(DATA_DIR, CHAT_HISTORY),
+                 budget=CHAT_TOKEN_BUDGET, keep_turns=CHAT_KEEP_TURNS,
+                 context_max=CHAT_CONTEXT_MAX, log_size=LOG_SIZE):
+        self.ollama = ollama
+        self.ai_queue = ai_queue
+        self.path = path
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.context_max = context_max
+
+        self.lock = threading.Lock()
+        self.reply_lock = threading.Lock()   # one exchange at a time, held while streaming
+        self.summary = ""
+        self.turns = []        # [{"role": "user"|"assistant", "content"}] not yet summarized
+        self.context = None    # server token state after the last reply
+        self.summary_job = None
+
+        # Newest turns' numbers for profiling: {"prompt_tokens", "latency", "reused"}
+        self.log = deque(maxlen=log_size)
+        self._load()
+
+    # -------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------
+    def stream_reply(self, user_text):
+        """Yield the pet's reply tokens and record the exchange.
+
+        Replies are taken one at a time: a second caller waits until the
+        first exchange is recorded, so turns stay in user/pet order.
+        """
+        with self.reply_lock:
+            with self.lock:
+                context = self.context
+                full_prompt = self._rebuild_prompt(user_text)
+                prompt = user_text if context else full_prompt
+
+            info = {}
+            parts = []
+            start = time.perf_counter()
+            for token in self.ollama.stream(prompt, context=context, system=PERSONA, info=info,
+                                            fallback_prompt=PERSONA + "\n\n" + full_prompt):
+                parts.append(token)
+                yield token
+            reply = "".join(parts).strip()
+
+            with self.lock:
+                self.log.append({
+                    "prompt_tokens": info.get("prompt_eval_count", estimate_tokens(prompt)),
+                    "latency": time.perf_counter() - start,
+                    "reused": bool(context),
+                })
+                if not reply:
+                    return
+                self.turns.append({"role": "user", "content": user_text})
+                self.turns.append({"role": "assistant", "content": reply})
+
+                # Carry the server state forward while it stays within bounds
+                new_context = info.get("context")
+                if new_context and len(new_context) <= self.context_max:
+                    self.context = new_context
+                else:
+                    self.context = None
+            self._maybe_summarize()
+            self.save()
+
+    def recent_turns(self, count):
+        with self.lock:
+            return list(self.turns[-count:])
+
+    def reset(self):
+        with self.lock:
+            self.summary, self.turns, self.context = "", [], None
+        self.save()
+
+    # -------------------------------------------------
+    # PROMPT BUILDING
+    # -------------------------------------------------
+    def _rebuild_prompt(self, user_text):
+        """Summary + as many of the newest turns as fit in the budget + new message."""
+        lines = [f"User: {user_text}", "Pet:"]
+        used = estimate_tokens(user_text)
+        if self.summary:
+            used += estimate_tokens(self.summary)
+
+        history = []
+        for turn in reversed(self.turns):
+            line = ("User: " if turn["role"] == "user" else "Pet: ") + turn["content"]
+            cost = estimate_tokens(line)
+            if used + cost > self.budget:
+                break
+            history.append(line)
+            used += cost
+        history.reverse()
+
+        head = [f"Earlier in this conversation: {self.summary}"] if self.summary else []
+        return "\n".join(head + history + lines)
+
+    # -------------------------------------------------
+    # BACKGROUND SUMMARIZATION
+    # -------------------------------------------------
+    def _maybe_summarize(self):
+        # Only called under reply_lock, so one check-and-submit runs at a time
+        # and a summary is never submitted twice. The submit itself is outside
+        # self.lock: a queue may run on_done (and _fold) right away.
+        with self.lock:
+            if self.summary_job is not None and not self.summary_job.done.is_set():
+                return
+            if len(self.turns) <= self.keep_turns:
+                return
+            # Only once the turns no longer fit a rebuilt prompt
+            if sum(estimate_tokens(t["content"]) for t in self.turns) <= self.budget:
+                return
+            folded = self.turns[:len(self.turns) - self.keep_turns]
+            previous = self.summary
+
+        text = "\n".join(
+            ("User: " if t["role"] == "user" else "Pet: ") + t["content"] for t in folded
+        )
+        prompt = (
+            "Update this summary of a chat between a user and their desk pet cat. "
+            "Keep names, facts and plans; under 80 words; reply with the summary only.\n\n"
+            f"Summary so far: {previous or '(none)'}\n\nNew messages:\n{text}"
+        )
+        # Dropped or failed jobs still set done, so the next turn retries
+        self.summary_job = self.ai_queue.submit(
+            lambda: self.ollama.generate(prompt),
+            priority=BACKGROUND,
+            key=("summarize", id(self)),
+            on_done=lambda summary: self._fold(folded, summary),
+        )
+
+    def _fold(self, folded, summary):
+        with self.lock:
+            if not summary or self.turns[:len(folded)] != folded:
+                return
+            self.summary = summary.strip()
+            del self.turns[:len(folded)]
+        self.save()
+
+    # -------------------------------------------------
+    # LOAD / SAVE
+    # -------------------------------------------------
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.summary = data.get("summary", "")
+        self.turns = data.get("turns", [])
+        # A context only means something to the model that produced it
+        if data.get("model") == self.ollama.model:
+            self.context = data.get("context")
+
+    def save(self):
+        start = time.perf_counter()
+        with self.lock:
+            data = json.dumps({
+                "model": self.ollama.model,
+                "summary": self.summary,
+                "turns": self.turns,
+                "context": self.context,
+            }, ensure_ascii=False)
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print("Chat history save error:", e)
+            return
+        registry.histogram("json_write_ms", help="JSON file saves", file="chat_history").observe(
+            (time.perf_counter() - start) * 1000)
@@ -0,0 +1,178 @@
+import itertools
+import threading
+import time
+
+from config import AI_MAX_WORKERS, AI_MAX_PENDING
+from core.metrics import registry
+
+# Waits and generations: from instant up to a cold model load
+JOB_BUCKETS = (10, 50, 100, 250, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+# Priorities (lower runs first)
+CHAT = 0
+MILESTONE = 1
+AMBIENT = 2
+BACKGROUND = 3
+
+
+class AIJob:
+    def __init__(self, fn, priority, key=None, on_done=None, is_relevant=None):
+        self.fn = fn
+        self.priority = priority
+        self.key = key
+        self.on_done = on_done
+        self.is_relevant = is_relevant
+        self.cancelled = False
+        self.done = threading.Event()
+        self.result = None
+        self.seq = 0
+        self.submitted = time.perf_counter()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def relevant(self):
+        if self.cancelled:
+            return False
+        return self.is_relevant is None or self.is_relevant()
+
+
+class AIJobQueue:
+    """One bounded, prioritized queue for all LLM work.
+
+    Jobs with the same key coalesce while pending, jobs whose is_relevant()
+    turns False are dropped before running and before delivering, and
+    BACKGROUND work never takes the last free worker.
+    """
+
+    def __init__(self, max_workers=AI_MAX_WORKERS, max_pending=AI_MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.pending = []
+        self.active = 0
+        self.active_background = 0
+        self.running = False
+        self._seq = itertools.count()
+
+        registry.gauge("ai_queue_depth", "AI jobs waiting for a worker", fn=lambda: len(self.pending))
+        registry.gauge("ai_workers_busy", "AI workers running a job", fn=lambda: self.active)
+        self.wait_time = registry.histogram("ai_job_wait_ms", JOB_BUCKETS, "Submit to start of an AI job")
+        self.run_time = registry.histogram("ai_job_run_ms", JOB_BUCKETS, "AI job run time (LLM call)")
+        self.outcomes = {
+            outcome: registry.counter("ai_jobs_total", "AI jobs by outcome", outcome=outcome)
+            for outcome in ("done", "skipped", "dropped", "error")
+        }
+
+    # -------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------
+    def start(self):
+        self.running = True
+        for _ in range(self.max_workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            for job in self.pending:
+                job.cancel()
+                job.done.set()
+            self.pending.clear()
+            self.cond.notify_all()
+
+    def submit(self, fn, priority=AMBIENT, key=None, on_done=None, is_relevant=None):
+        """Queue fn() to run on a worker; never blocks. Returns the AIJob."""
+        with self.cond:
+            if key is not None:
+                for job in self.pending:
+                    if job.key == key and not job.cancelled:
+                        job.priority = min(job.priority, priority)
+                        return job
+
+            job = AIJob(fn, priority, key, on_done, is_relevant)
+            job.seq = next(self._seq)
+
+            if len(self.pending) >= self.max_pending:
+                # Full → drop the least important (oldest among equals)
+                worst = max(self.pending, key=lambda j: (j.priority, -j.seq))
+                self.outcomes["dropped"].inc()
+                if worst.priority < priority:
+                    job.cancel()
+                    job.done.set()
+                    return job
+                self.pending.remove(worst)
+                worst.cancel()
+                worst.done.set()
+
+            self.pending.append(job)
+            self.cond.notify()
+            return job
+
+    def cancel_where(self, predicate):
+        """Cancel every pending job matching predicate(job)."""
+        with self.cond:
+            for job in self.pending:
+                if predicate(job):
+                    job.cancel()
+
+    def depth(self):
+        with self.cond:
+            return len(self.pending)
+
+    # -------------------------------------------------
+    # WORKERS
+    # -------------------------------------------------
+    def _next_job(self):
+        for job in self.pending:
+            if job.cancelled:
+                job.done.set()
+        self.pending = [job for job in self.pending if not job.cancelled]
+        runnable = self.pending
+        if self.max_workers > 1 and self.active_background >= self.max_workers - 1:
+            runnable = [job for job in self.pending if job.priority != BACKGROUND]
+        if not runnable:
+            return None
+        job = min(runnable, key=lambda j: (j.priority, j.seq))
+        self.pending.remove(job)
+        return job
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                # Check running before popping: a job taken off the queue
+                # always runs (or is skipped) and gets done set
+                job = None
+                while self.running:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self.cond.wait()
+                if job is None:
+                    return
+                background = job.priority == BACKGROUND
+                self.active += 1
+                if background:
+                    self.active_background += 1
+
+            start = time.perf_counter()
+            self.wait_time.observe((start - job.submitted) * 1000)
+            try:
+                if job.relevant():
+                    job.result = job.fn()
+                    self.run_time.observe((time.perf_counter() - start) * 1000)
+                    if job.on_done and job.relevant():
+                        job.on_done(job.result)
+                    self.outcomes["done"].inc()
+                else:
+                    self.outcomes["skipped"].inc()
+            except Exception as e:
+                self.outcomes["error"].inc()
+                print("AI job error:", e)
+            finally:
+                job.done.set()
+                with self.cond:
+                    self.active -= 1
+                    if background:
+                        self.active_background -= 1
+                    self.cond.notify_all()
@@ -1,12 +1,145 @@
+import json
 import subprocess
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.metrics import registry
+from config import (
+    OLLAMA_HOST, OLLAMA_MODEL, OLLAMA_PATH, OLLAMA_KEEP_ALIVE,
+    OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT, OLLAMA_HTTP_RETRY,
+)
+
 
 class OllamaReact:
-    def __init__(self, model="llama3.2:1b"):
+    def __init__(self, model=OLLAMA_MODEL, host=OLLAMA_HOST, use_http=True):
         self.model = model
-        # Make sure to update this path to yours
-        self.ollama_path = r"C:\Users\GSPL\AppData\Local\Programs\Ollama\ollama.exe"
+        self.ollama_path = OLLAMA_PATH
+        self.keep_alive = OLLAMA_KEEP_ALIVE
+        self.timeout = (OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT)
+        self.use_http = use_http
+
+        if not host.startswith("http"):
+            host = "http://" + host
+        self.host = host.rstrip("/")
+
+        # One pooled keep-alive session for every request
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._http_down_until = 0
 
+        buckets = (50, 100, 250, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+        self.first_token_time = registry.histogram(
+            "llm_first_token_ms", buckets, "Request to first streamed token")
+        self.request_time = registry.histogram("llm_request_ms", buckets, "Whole LLM request")
+        self.fallbacks = registry.counter("llm_fallbacks_total", "Requests served by `ollama run`")
+        self.errors = registry.counter("llm_http_errors_total", "Failed HTTP requests to Ollama")
+
+    # -------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------
     def generate(self, prompt):
+        """Return the full reply for a one-shot prompt (None on failure)."""
+        return self._collect(self.stream(prompt))
+
+    def chat(self, messages):
+        """Return the full reply for a list of {"role", "content"} messages."""
+        return self._collect(self.stream_chat(messages))
+
+    def stream(self, prompt, context=None, system=None, info=None, fallback_prompt=None):
+        """Yield reply tokens for a prompt as they arrive.
+
+        `context` is the token state a previous reply returned in
+        info["context"]; the server continues from it and only evaluates the
+        new prompt. `info`, if given, receives the final chunk's context and
+        token counts (it stays empty on the subprocess fallback, which gets
+        `fallback_prompt` instead).
+        """
+        payload = {"model": self.model, "prompt": prompt}
+        if context:
+            payload["context"] = context
+        if system:
+            payload["system"] = system
+        yield from self._stream("/api/generate", payload, "response",
+                                fallback_prompt or prompt, info)
+
+    def stream_chat(self, messages, info=None):
+        """Yield reply tokens for a chat conversation as they arrive."""
+        payload = {"model": self.model, "messages": messages}
+        fallback_prompt = "\n".join(m["content"] for m in messages)
+        yield from self._stream("/api/chat", payload, "message", fallback_prompt, info)
+
+    def close(self):
+        self.session.close()
+
+    # -------------------------------------------------
+    # HTTP BACKEND
+    # -------------------------------------------------
+    def _stream(self, path, payload, key, fallback_prompt, info=None):
+        start = time.perf_counter()
+        first = True
+        try:
+            for token in self._stream_any(path, payload, key, fallback_prompt, info):
+                if first:
+                    self.first_token_time.observe((time.perf_counter() - start) * 1000)
+                    first = False
+                yield token
+        finally:
+            self.request_time.observe((time.perf_counter() - start) * 1000)
+
+    def _stream_any(self, path, payload, key, fallback_prompt, info):
+        if self.use_http and time.time() >= self._http_down_until:
+            got_token = False
+            try:
+                for token in self._stream_http(path, payload, key, info):
+                    got_token = True
+                    yield token
+                return
+            except (requests.RequestException, ValueError) as e:
+                print("Ollama HTTP error:", e)
+                self.errors.inc()
+                if got_token:
+                    return  # don't repeat a half-delivered reply
+                self._http_down_until = time.time() + OLLAMA_HTTP_RETRY
+
+        self.fallbacks.inc()
+        text = self._generate_subprocess(fallback_prompt)
+        if text:
+            yield text
+
+    def _stream_http(self, path, payload, key, info=None):
+        payload = dict(payload, stream=True, keep_alive=self.keep_alive)
+        with self.session.post(self.host + path, json=payload,
+                               stream=True, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise ValueError(chunk["error"])
+
+                token = chunk.get(key, "")
+                if key == "message":
+                    token = token.get("content", "") if token else ""
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    if info is not None:
+                        for name in ("context", "prompt_eval_count", "eval_count"):
+                            if name in chunk:
+                                info[name] = chunk[name]
+                    return
+
+    def _collect(self, tokens):
+        text = "".join(tokens).strip()
+        return text or None
+
+    # -------------------------------------------------
+    # SUBPROCESS FALLBACK
+    # -------------------------------------------------
+    def _generate_subprocess(self, prompt):
         try:
             result = subprocess.run(
                 [self.ollama_path, "run", self.model],
@@ -14,11 +147,11 @@ class OllamaReact:
                 text=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                encoding="utf-8",    
-                errors="ignore"      
+                encoding="utf-8",
+                errors="ignore",
+                timeout=OLLAMA_READ_TIMEOUT,
             )
             return result.stdout.strip()
         except Exception as e:
             print("Ollama error:", e)
             return None
-          
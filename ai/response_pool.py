@@ -0,0 +1,180 @@
+import json
+import os
+import random
+import threading
+import time
+
+from ai.job_queue import BACKGROUND
+from core.metrics import registry
+from config import (
+    RESPONSE_POOL_FILE, RESPONSE_POOL_SIZE, RESPONSE_POOL_TTL, RESPONSE_POOL_MAX_USES,
+)
+
+
+class ResponsePool:
+    """Pre-generated speech lines per fixed prompt, refilled while the LLM is idle."""
+
+    def __init__(self, ollama, ai_queue, path=RESPONSE_POOL_FILE, size=RESPONSE_POOL_SIZE,
+                 ttl=RESPONSE_POOL_TTL, max_uses=RESPONSE_POOL_MAX_USES):
+        self.ollama = ollama
+        self.ai_queue = ai_queue
+        self.path = path
+        self.size = size
+        self.ttl = ttl
+        self.max_uses = max_uses
+
+        self.lock = threading.Lock()
+        self.prompts = set()   # registered prompts the refill thread keeps warm
+        self.pools = {}        # prompt -> [{"text", "created", "uses"}]
+        self.last_served = {}  # prompt -> text
+        self.hits = {}
+        self.misses = {}
+
+        self.running = False
+        self.paused = False   # set by the power governor
+        self.wakeup = threading.Event()
+        self._load()
+
+    # -------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------
+    def register(self, prompt):
+        """Mark a prompt as one worth keeping variants for."""
+        with self.lock:
+            self.prompts.add(prompt)
+            self.pools.setdefault(prompt, [])
+            self.hits.setdefault(prompt, 0)
+            self.misses.setdefault(prompt, 0)
+        self.wakeup.set()
+
+    def get(self, prompt):
+        """Return a ready line for the prompt, or None on a miss."""
+        with self.lock:
+            self._evict(prompt)
+            lines = self.pools.get(prompt) or []
+            last = self.last_served.get(prompt)
+            choices = [line for line in lines if line["text"] != last]
+            if not choices:
+                self.misses[prompt] = self.misses.get(prompt, 0) + 1
+                self.wakeup.set()
+                return None
+
+            line = random.choice(choices)
+            line["uses"] += 1
+            if line["uses"] >= self.max_uses:
+                lines.remove(line)
+            self.last_served[prompt] = line["text"]
+            self.hits[prompt] = self.hits.get(prompt, 0) + 1
+
+        self.wakeup.set()
+        return line["text"]
+
+    def add(self, prompt, text):
+        """Store a freshly generated line (duplicates are ignored)."""
+        text = text.strip() if text else ""
+        if not text:
+            return
+        with self.lock:
+            lines = self.pools.setdefault(prompt, [])
+            if any(line["text"] == text for line in lines):
+                return
+            lines.append({"text": text, "created": time.time(), "uses": 0})
+            # Over size → drop the oldest
+            lines.sort(key=lambda line: line["created"])
+            del lines[:-self.size]
+
+    def stats(self):
+        with self.lock:
+            return {
+                prompt: {
+                    "hits": self.hits.get(prompt, 0),
+                    "misses": self.misses.get(prompt, 0),
+                    "ready": len(lines),
+                }
+                for prompt, lines in self.pools.items()
+            }
+
+    # -------------------------------------------------
+    # BACKGROUND REFILL
+    # -------------------------------------------------
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._refill_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        self.save()
+
+    def _refill_loop(self):
+        while self.running:
+            # Power saving: keep serving what is pooled, generate nothing new
+            if self.paused:
+                self.wakeup.wait(timeout=self.ttl / 4)
+                self.wakeup.clear()
+                continue
+
+            prompt = self._emptiest_prompt()
+            if prompt is None:
+                # Everything full → sleep until a line is used or goes stale
+                self.wakeup.wait(timeout=self.ttl / 4)
+                self.wakeup.clear()
+                continue
+
+            # Lowest priority: runs only when chat/speech leave a worker free
+            job = self.ai_queue.submit(
+                lambda: self.ollama.generate(prompt),
+                priority=BACKGROUND,
+                key=("refill", prompt),
+            )
+            job.done.wait()
+            if not self.running:
+                return
+
+            text = job.result
+            if text:
+                self.add(prompt, text)
+                self.save()
+            else:
+                time.sleep(30)  # LLM unavailable, try again later
+
+    def _emptiest_prompt(self):
+        with self.lock:
+            missing = []
+            for prompt in self.prompts:
+                self._evict(prompt)
+                if len(self.pools[prompt]) < self.size:
+                    missing.append((len(self.pools[prompt]), prompt))
+        return min(missing)[1] if missing else None
+
+    def _evict(self, prompt):
+        lines = self.pools.get(prompt)
+        if lines:
+            cutoff = time.time() - self.ttl
+            lines[:] = [line for line in lines if line["created"] > cutoff]
+
+    # -------------------------------------------------
+    # PERSISTENCE
+    # -------------------------------------------------
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.pools = json.load(f)
+        except (OSError, ValueError):
+            self.pools = {}
+
+    def save(self):
+        start = time.perf_counter()
+        with self.lock:
+            data = json.dumps(self.pools, ensure_ascii=False)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print("Response pool save error:", e)
+            return
+        registry.histogram("json_write_ms", help="JSON file saves", file="response_pool").observe(
+            (time.perf_counter() - start) * 1000)
@@ -0,0 +1,39 @@
+"""Render-clock wakeups and redraws per minute for each pet state.
+
+    python -m benchmarks.bench_animator
+
+"before" is the old fixed loop: one wakeup and one redraw every FPS ms.
+"""
+from benchmarks.headless_tk import FakeRoot, patch_tk
+from config import FPS
+
+patch_tk()
+from core.animator import Animator  # noqa: E402
+
+MINUTE = 60_000
+
+
+class FixedState:
+    def __init__(self, state):
+        self.state = state
+
+    def get_state(self):
+        return self.state
+
+    def subscribe(self, callback):
+        pass
+
+
+def main():
+    before = MINUTE // FPS
+    print(f"{'state':<10}{'before':>8}{'wakeups':>9}{'redraws':>9}")
+    for state in ["idle", "focused", "happy", "pat", "sleeping"]:
+        root = FakeRoot()
+        animator = Animator(root, FixedState(state))
+        animator.update_frame()
+        root.run_for(MINUTE)
+        print(f"{state:<10}{before:>8}{animator.wakeups[state]:>9}{animator.label.redraws:>9}")
+
+
+if __name__ == "__main__":
+    main()
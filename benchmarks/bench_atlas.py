@@ -0,0 +1,61 @@
+"""Cold vs warm skin loading on a synthetic skin with hundreds of frames.
+
+    python -m benchmarks.bench_atlas [frames]
+
+"png" is the old per-file decode + resize, "cold" builds the atlas,
+"warm" maps an up-to-date atlas. PhotoImage conversion (needs a display)
+is the same for every path and is not included.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from core.sprite_atlas import list_frames, load_atlas, load_frame
+
+STATES = ["idle", "focused", "happy", "pat", "sleeping"]
+
+
+def make_skin(root, frames, size=(32, 32)):
+    skin = os.path.join(root, "synthetic")
+    per_state = max(1, frames // len(STATES))
+    for s, state in enumerate(STATES):
+        folder = os.path.join(skin, state)
+        os.makedirs(folder)
+        for i in range(per_state):
+            img = Image.new("RGB", size, (s * 40, i % 256, 128))
+            img.putpixel((i % size[0], i % size[1]), (255, 255, 255))
+            img.save(os.path.join(folder, f"{i}.png"))
+    return skin
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    root = tempfile.mkdtemp()
+    try:
+        skin = make_skin(root, frames)
+        cache = os.path.join(root, "cache")
+
+        png = timed(lambda: [load_frame(p) for ps in list_frames(skin).values() for p in ps])
+        cold = timed(lambda: load_atlas(skin, cache))
+        warm = timed(lambda: load_atlas(skin, cache))
+
+        print(f"{frames} frames")
+        print(f"png decode   {png:8.1f} ms")
+        print(f"atlas cold   {cold:8.1f} ms")
+        print(f"atlas warm   {warm:8.1f} ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
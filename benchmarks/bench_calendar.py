@@ -0,0 +1,183 @@
+"""Calendar loading and lookups on large synthetic shared calendars.
+
+    python -m benchmarks.bench_calendar [events per file] [files]
+
+Each file is a mix of daily standups, every-other-week syncs, monthly
+reviews and one-off meetings in three time zones (plus floating times),
+started up to three years back, with EXDATEs, moved occurrences
+(RECURRENCE-ID), cancelled and free events. Rows:
+
+  full expansion   rules expanded from their DTSTART (no skip-ahead)
+  cold             parse + expand every file, writing the cache
+  warm start       a new Calendar reading the cached occurrences
+  refresh          nothing changed (stat only), one file touched (hash,
+                   no parse), one file edited (parse that file only)
+  lookups          IntervalIndex.lookup (meeting on + next change) and
+                   at (every overlapping meeting) at random times, and
+                   Calendar.current as the Signals loop calls it
+
+The skip-ahead expansion is checked against the full one, and lookup()
+against at().
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from core.calendar_index import Calendar, IntervalIndex, expand_file, window
+
+ZONES = ["Europe/Berlin", "America/New_York", "Asia/Tokyo", None]
+
+
+def _stamp(dt):
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def _dt(prop, dt, zone):
+    if zone is None:
+        return f"{prop}:{_stamp(dt)}"
+    return f"{prop};TZID={zone}:{_stamp(dt)}"
+
+
+def make_ics(events, seed, now):
+    rng = random.Random(seed)
+    today = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//bench//calendar//EN"]
+    for i in range(events):
+        zone = rng.choice(ZONES)
+        kind = rng.random()
+        first = today - timedelta(days=rng.randint(0, 3 * 365))
+        start = first.replace(hour=rng.randint(7, 17), minute=rng.choice([0, 15, 30, 45]))
+        length = timedelta(minutes=rng.choice([15, 25, 30, 45, 60, 90]))
+        uid = f"bench-{seed}-{i}"
+        body = [f"UID:{uid}", f"SUMMARY:Meeting {i}", _dt("DTSTART", start, zone),
+                _dt("DTEND", start + length, zone)]
+        if kind < 0.35:
+            body.append("RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR")
+        elif kind < 0.65:
+            body.append(f"RRULE:FREQ=WEEKLY;INTERVAL={rng.choice([1, 2])};BYDAY="
+                        + ",".join(rng.sample(["MO", "TU", "WE", "TH", "FR"], 2)))
+        elif kind < 0.75:
+            until = today + timedelta(days=rng.randint(-30, 30))
+            body.append(f"RRULE:FREQ=WEEKLY;UNTIL={_stamp(until)}Z")
+        elif kind < 0.85:
+            body.append(f"RRULE:FREQ=MONTHLY;BYMONTHDAY={start.day if start.day <= 28 else 1}")
+        else:
+            # One-off in the coming weeks
+            start = today + timedelta(days=rng.randint(-2, 20), hours=rng.randint(8, 18))
+            body[2:4] = [_dt("DTSTART", start, zone), _dt("DTEND", start + length, zone)]
+        if kind < 0.65:
+            for _ in range(rng.randint(0, 3)):
+                skip = today + timedelta(days=rng.randint(-1, 14))
+                body.append(_dt("EXDATE", skip.replace(hour=start.hour, minute=start.minute), zone))
+        if rng.random() < 0.05:
+            body.append("STATUS:CANCELLED")
+        elif rng.random() < 0.05:
+            body.append("TRANSP:TRANSPARENT")
+        lines += ["BEGIN:VEVENT", *body, "END:VEVENT"]
+
+        if kind < 0.35 and rng.random() < 0.2:
+            # One occurrence of this standup moved by an hour
+            day = today + timedelta(days=rng.randint(0, 10))
+            if day.weekday() < 5:
+                original = day.replace(hour=start.hour, minute=start.minute)
+                moved = original + timedelta(hours=1)
+                lines += ["BEGIN:VEVENT", f"UID:{uid}", f"SUMMARY:Meeting {i} (moved)",
+                          _dt("RECURRENCE-ID", original, zone), _dt("DTSTART", moved, zone),
+                          _dt("DTEND", moved + length, zone), "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    now = time.time()
+    root = tempfile.mkdtemp()
+    try:
+        cal_dir = os.path.join(root, "calendars")
+        cache_dir = os.path.join(root, "cache")
+        os.makedirs(cal_dir)
+        paths = []
+        for i in range(files):
+            path = os.path.join(cal_dir, f"shared{i}.ics")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(make_ics(events, i, now))
+            paths.append(path)
+        size = sum(os.path.getsize(p) for p in paths)
+        print(f"{files} calendars x {events} events ({size / 1e6:.1f} MB), "
+              f"window {window(now)[1] - window(now)[0]:.0f} s")
+
+        lo, hi = window(now)
+        full, full_time = timed(lambda: [expand_file(p, lo, hi, skip_ahead=False) for p in paths])
+        print(f"full expansion     {full_time * 1000:8.0f} ms")
+
+        calendar = Calendar(directory=cal_dir, cache_dir=cache_dir)
+        _, cold = timed(calendar.refresh)
+        build = timed(lambda: IntervalIndex(o for entry in calendar.files.values() for o in entry[2]))[1]
+        occurrences = len(calendar.index)
+        print(f"cold               {cold * 1000:8.0f} ms  ({occurrences} occurrences, "
+              f"index build {build * 1000:.0f} ms)")
+        fast = sorted(tuple(o) for entry in calendar.files.values() for o in entry[2])
+        slow = sorted(tuple(o) for occ in full for o in occ)
+        print(f"  skip-ahead matches full expansion: {fast == slow}")
+
+        warm_calendar = Calendar(directory=cal_dir, cache_dir=cache_dir)
+        _, warm = timed(warm_calendar.refresh)
+        print(f"warm start         {warm * 1000:8.1f} ms")
+
+        _, unchanged = timed(warm_calendar.refresh)
+        os.utime(paths[0], ns=(time.time_ns(), time.time_ns()))
+        _, touched = timed(warm_calendar.refresh)
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            f.write(make_ics(events, files + 1, now))
+        _, edited = timed(warm_calendar.refresh)
+        print(f"refresh unchanged  {unchanged * 1e6:8.0f} us")
+        print(f"refresh 1 touched  {touched * 1e3:8.1f} ms")
+        print(f"refresh 1 of {files} edited {edited * 1000:5.0f} ms")
+
+        index = warm_calendar.index
+        rng = random.Random(0)
+        times = [rng.uniform(lo, hi) for _ in range(20_000)]
+        start = time.perf_counter_ns()
+        busy = sum(1 for t in times if index.at(t))
+        at_ns = (time.perf_counter_ns() - start) / len(times)
+        start = time.perf_counter_ns()
+        for t in times:
+            index.lookup(t)
+        lookup_ns = (time.perf_counter_ns() - start) / len(times)
+
+        agree = all(index.lookup(t)[0] == (index.at(t) or [None])[0] for t in times)
+
+        # The Signals loop: time moves forward, a pass every few seconds
+        t, calls = now, 0
+        start = time.perf_counter_ns()
+        while t < now + 8 * 3600:
+            warm_calendar.current(t)
+            t += 2.5
+            calls += 1
+        current_ns = (time.perf_counter_ns() - start) / calls
+        print(f"lookups            lookup {lookup_ns:4.0f} ns  at {at_ns:5.0f} ns  "
+              f"current (loop) {current_ns:4.0f} ns  busy {busy / len(times):.0%} of the time")
+        print(f"  lookup agrees with at: {agree}")
+
+        empty = IntervalIndex()
+        start = time.perf_counter_ns()
+        for t in times:
+            empty.lookup(t)
+        print(f"  empty calendar   lookup {(time.perf_counter_ns() - start) / len(times):5.0f} ns")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
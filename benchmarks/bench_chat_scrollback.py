@@ -0,0 +1,135 @@
+"""ChatWindow over a long session: streamed replies, bounded scrollback.
+
+    python -m benchmarks.bench_chat_scrollback [messages]
+
+Replays `messages` exchanges (user line + a 30-token streamed reply, a few
+tokens per 16 ms UI tick) through the real ChatWindow and UIQueue on the
+virtual clock from headless_tk. The Text widget is a fake that keeps its
+lines in a list, so widget size and Python memory can be measured; flush
+cost is timed per tick. "unbounded" disables the scrollback cap.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tkinter
+import tracemalloc
+from collections import deque
+
+from benchmarks.headless_tk import FakeRoot
+from core.chat_window import ChatWindow
+from core.ui_queue import UIQueue
+
+TOKENS = 30
+TOKENS_PER_TICK = 4
+
+
+class FakeText:
+    """Line-indexed text store with the Text calls ChatWindow makes."""
+
+    def __init__(self):
+        self.lines = [""]
+        self.calls = 0
+
+    def config(self, **kwargs):
+        self.calls += 1
+
+    def yview(self, *args):
+        self.calls += 1
+        return (0.0, 1.0)
+
+    def insert(self, index, text):
+        self.calls += 1
+        new = text.split("\n")
+        self.lines[-1] += new[0]
+        self.lines.extend(new[1:])
+
+    def delete(self, start, end):
+        self.calls += 1
+        del self.lines[:int(end.split(".")[0]) - 1]
+
+    def chars(self):
+        return sum(len(line) + 1 for line in self.lines)
+
+
+class Tokens:
+    """Conversation stand-in that streams a fixed reply."""
+
+    def __init__(self, words):
+        self.words = words
+
+    def stream_reply(self, user_text):
+        return iter(self.words)
+
+    def recent_turns(self, count):
+        return []
+
+
+def run(name, messages, scrollback, transcript):
+    root = FakeRoot()
+    ui = UIQueue(root).start()
+    words = [f"word{i} " for i in range(TOKENS)]
+    chat = ChatWindow(root, None, None, ui, conversation=Tokens(words),
+                      scrollback=scrollback, transcript=transcript)
+    chat.window = object()
+    chat.chat_box = box = FakeText()
+
+    flush = chat._flush_text
+    flush_times = deque(maxlen=500)   # bounded, so it doesn't show up in memory
+    flushes = [0]
+
+    def timed_flush():
+        start = time.perf_counter()
+        flush()
+        flush_times.append(time.perf_counter() - start)
+        flushes[0] += 1
+
+    chat._flush_text = timed_flush
+
+    # Stream replies a few tokens per tick, as an AI worker would
+    chat._queue_text = lambda text, ends_message=False, queue=chat._queue_text: (
+        queue(text, ends_message), tick_if_due())
+    posted = [0]
+
+    def tick_if_due():
+        posted[0] += 1
+        if posted[0] % TOKENS_PER_TICK == 0:
+            root.run_for(16)
+
+    tracemalloc.start()
+    checkpoints = []
+    for i in range(messages):
+        chat._append_text("You", f"message {i}")
+        chat._get_response(f"message {i}")
+        root.run_for(16)
+        if (i + 1) % (messages // 4) == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            checkpoints.append((i + 1, len(box.lines), box.chars(), current,
+                                sum(flush_times) / len(flush_times) * 1e6))
+    tracemalloc.stop()
+
+    print(f"{name}: {box.calls / messages:.1f} widget calls/exchange, "
+          f"{flushes[0] / messages:.1f} flushes/exchange")
+    for done, lines, chars, current, flush_us in checkpoints:
+        print(f"  after {done:6d}  widget lines {lines:7d}  chars {chars:9d}  "
+              f"traced {current / 1e6:6.2f} MB  flush {flush_us:6.1f} us")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    tk_toplevel = tkinter.Toplevel
+    tkinter.Toplevel = type("FakeToplevel", (), {"winfo_exists": staticmethod(lambda w: True)})
+    root = tempfile.mkdtemp()
+    try:
+        for name, scrollback in [("unbounded", float("inf")), ("scrollback 200", 200)]:
+            transcript = os.path.join(root, f"{scrollback}.txt")
+            run(name, messages, scrollback, transcript)
+            print(f"  transcript {os.path.getsize(transcript) / 1e6:.2f} MB on disk")
+    finally:
+        tkinter.Toplevel = tk_toplevel
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Prompt tokens and latency per turn over a 50-turn chat.
+
+    python -m benchmarks.bench_conversation [turns] [ms_per_prompt_token]
+
+Runs against the stub server, which charges ms_per_prompt_token for every
+prompt token it evaluates (CPU inference is in this range) and returns a
+growing context. Strategies:
+
+  one-shot       persona + latest message (the old behavior, no memory)
+  full history   persona + every previous turn, resent each time
+  conversation   ai.conversation.Conversation: context reuse, budgeted
+                 rebuilds, background summaries
+
+The last row restarts Conversation from its saved file and sends one more
+turn, to show it resumes without reprocessing the history.
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from ai.conversation import PERSONA, Conversation
+from ai.job_queue import AIJobQueue
+from ai.ollama_react import OllamaReact
+from benchmarks.stub_ollama import start_server
+
+TOPICS = ["my project deadline", "the coffee machine", "a bug in the parser",
+          "lunch plans", "the weekly meeting", "my cat at home", "a long code review"]
+
+
+def message(i):
+    return (f"Message {i}: I keep thinking about {TOPICS[i % len(TOPICS)]} and "
+            f"whether I should take a short break before the next task.")
+
+
+def timed(tokens):
+    start = time.perf_counter()
+    first = None
+    for _ in tokens:
+        if first is None:
+            first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+
+def run_stateless(ollama, turns, with_history):
+    rows, history = [], []
+    for i in range(turns):
+        lines = history if with_history else []
+        prompt = "\n".join(lines + [f"User: {message(i)}", "Pet:"])
+        info = {}
+        ttft, total = timed(ollama.stream(prompt, system=PERSONA, info=info))
+        rows.append((info.get("prompt_eval_count", 0), ttft, total))
+        history += [f"User: {message(i)}", "Pet: Purr! You are doing great, keep going!"]
+    return rows
+
+
+def run_conversation(ollama, queue, path, turns):
+    conversation = Conversation(ollama, queue, path=path, log_size=turns)
+    rows = []
+    for i in range(turns):
+        ttft, total = timed(conversation.stream_reply(message(i)))
+        rows.append((conversation.log[-1]["prompt_tokens"], ttft, total))
+    return conversation, rows
+
+
+def report(name, rows):
+    tokens = [r[0] for r in rows]
+    ttft = [r[1] * 1000 for r in rows]
+    print(f"{name:<14} prompt tokens first {tokens[0]:5d}  median {statistics.median(tokens):7.0f}  "
+          f"last {tokens[-1]:5d}  total {sum(tokens):7d}   "
+          f"first token median {statistics.median(ttft):7.1f} ms  last {ttft[-1]:7.1f} ms")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    prompt_delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+    server, url = start_server(token_delay=0.002, prompt_delay=prompt_delay)
+    ollama = OllamaReact(host=url)
+    queue = AIJobQueue()
+    queue.start()
+    root = tempfile.mkdtemp()
+    try:
+        print(f"{turns} turns, {prompt_delay * 1000:g} ms per evaluated prompt token")
+        report("one-shot", run_stateless(ollama, turns, with_history=False))
+        report("full history", run_stateless(ollama, turns, with_history=True))
+
+        path = os.path.join(root, "chat_history.json")
+        conversation, rows = run_conversation(ollama, queue, path, turns)
+        report("conversation", rows)
+        # Summaries are background work: they run once the chat goes quiet
+        if conversation.summary_job is not None:
+            conversation.summary_job.done.wait(10)
+        reused = sum(1 for entry in conversation.log if entry["reused"])
+        print(f"               context reused on {reused}/{turns} turns, "
+              f"{len(conversation.turns)} turns kept, summary {len(conversation.summary)} chars")
+
+        # Restart: a new instance loads the saved summary, turns and context
+        queue.stop()
+        queue = AIJobQueue()
+        queue.start()
+        _, rows = run_conversation(ollama, queue, path, 1)
+        report("after restart", rows)
+    finally:
+        queue.stop()
+        server.shutdown()
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
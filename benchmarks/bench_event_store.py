@@ -0,0 +1,80 @@
+"""A year of synthetic reward events: batched insert cost and aggregate queries.
+
+    python -m benchmarks.bench_event_store
+"""
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from rewards.event_store import EventStore
+
+DAY = 86400
+
+
+def synthetic_year(store, start, seed=0):
+    """~8 h workdays: state changes every few minutes, XP every minute or so."""
+    rng = random.Random(seed)
+    count = 0
+    for day in range(365):
+        if day % 7 in (5, 6):
+            continue
+        t = start + day * DAY + 9 * 3600
+        end = t + 8 * 3600
+        state = "idle"
+        while t < end:
+            new_state = rng.choice(["focused", "focused", "idle", "sleeping", "happy"])
+            store.append("state_transition", data={"from": state, "to": new_state}, ts=t)
+            state = new_state
+            count += 1
+            span = rng.randint(120, 1500)
+            if state == "focused":
+                for m in range(0, span, 60):
+                    store.append("xp_gained", rng.choice([2, 5, 10]), ts=t + m)
+                    count += 1
+                if span > 60:
+                    store.append("quest_completed", data={"quest": "1min_focus"}, ts=t + 60)
+                    count += 1
+            t += span
+        store.flush()  # one batch per day
+    return count
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    root = tempfile.mkdtemp()
+    try:
+        store = EventStore(os.path.join(root, "bench.db"), threading.RLock(), debounce=3600)
+        start = time.time() - 365 * DAY
+
+        ms, count = timed(lambda: synthetic_year(store, start))
+        print(f"insert {count} events in {store.writes} batches: {ms:8.1f} ms "
+              f"({ms * 1000 / count:.1f} us/event)")
+
+        now = start + 365 * DAY
+        week = now - 7 * DAY
+        queries = [
+            ("focused minutes this week",
+             lambda: store.seconds_in_state("focused", week, now) / 60),
+            ("xp this week", lambda: store.sum_value("xp_gained", week, now)),
+            ("xp per day, whole year", lambda: len(store.daily_sum("xp_gained", start, now))),
+            ("quests completed, whole year", lambda: store.count("quest_completed", start, now)),
+            ("focused minutes, whole year",
+             lambda: store.seconds_in_state("focused", start, now) / 60),
+        ]
+        for name, query in queries:
+            ms, result = timed(query)
+            print(f"{name:<30} {ms:8.2f} ms   -> {result:.0f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
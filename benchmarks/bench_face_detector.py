@@ -0,0 +1,105 @@
+"""FaceDetector ms/frame and agreement with the original full-frame pipeline.
+
+    python -m benchmarks.bench_face_detector [video.mp4 ...]
+
+Synthetic frames (noise + moving blobs) always run; pass recorded webcam
+clips to measure real detections. "agree" is the share of frames where both
+pipelines agree on face presence and, when both see one, the boxes overlap
+with IoU >= 0.5.
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from core.face_detector import FaceDetector
+
+SYNTHETIC_FRAMES = 120
+SIZE = (480, 640)
+
+
+def synthetic_frames(count=SYNTHETIC_FRAMES, seed=0):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        frame = rng.integers(0, 40, (*SIZE, 3), dtype=np.uint8)
+        cx, cy = 200 + (i * 3) % 240, 240
+        cv2.ellipse(frame, (cx, cy), (70, 90), 0, 0, 360, (170, 190, 220), -1)
+        cv2.circle(frame, (cx - 25, cy - 20), 8, (30, 30, 30), -1)
+        cv2.circle(frame, (cx + 25, cy - 20), 8, (30, 30, 30), -1)
+        cv2.ellipse(frame, (cx, cy + 35), (25, 10), 0, 0, 180, (40, 40, 120), 3)
+        yield frame
+
+
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+    cap.release()
+
+
+def reference_detect(detector, frame):
+    """The original pipeline: full-res gray, whole-frame scan, smile on every face."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    faces = detector.face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+    if len(faces) == 0:
+        return None
+    for (x, y, w, h) in faces:
+        detector.smile_cascade.detectMultiScale(
+            gray[y:y + h, x:x + w], scaleFactor=1.8, minNeighbors=25
+        )
+    return tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+def run(name, frames):
+    reference = FaceDetector(None, None, None, enable_camera=False)
+    reference.load_cascades()
+    tiered = FaceDetector(None, None, None, enable_camera=False)
+
+    ref_ms = new_ms = 0.0
+    agree = total = faces = 0
+    for frame in frames:
+        start = time.perf_counter()
+        ref = reference_detect(reference, frame)
+        ref_ms += time.perf_counter() - start
+
+        start = time.perf_counter()
+        new, _ = tiered.process_frame(frame)
+        new_ms += time.perf_counter() - start
+
+        total += 1
+        faces += ref is not None
+        if ref is None and new is None:
+            agree += 1
+        elif ref is not None and new is not None and iou(ref, new) >= 0.5:
+            agree += 1
+
+    if not total:
+        print(f"{name}: no frames")
+        return
+    print(f"{name:<24} frames {total:5d}  faces {faces:5d}  "
+          f"reference {ref_ms * 1000 / total:7.2f} ms/frame  "
+          f"tiered {new_ms * 1000 / total:7.2f} ms/frame  "
+          f"agree {agree * 100 / total:5.1f}%")
+
+
+def main():
+    run("synthetic", synthetic_frames())
+    for path in sys.argv[1:]:
+        run(path, video_frames(path))
+
+
+if __name__ == "__main__":
+    main()
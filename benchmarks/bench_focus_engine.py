@@ -0,0 +1,133 @@
+"""Monitor wakeups and missed rewards: 1 s polling vs FocusEngine deadlines.
+
+    python -m benchmarks.bench_focus_engine [max_stall_seconds]
+
+Replays a scripted workday on a virtual clock: typing blocks separated by
+short breaks and a lunch. Every wakeup of the monitor thread is delayed by
+a random stall of up to max_stall_seconds (GC, a slow save, the GIL held by
+the camera). "polling" is the old loop with its 25 < d < 27 / 60 < d < 62
+reward windows; "deadline" sleeps until FocusEngine.next_deadline or until
+the first key after a break.
+"""
+import bisect
+import random
+import sys
+
+from config import BURST_WINDOW, FOCUS_MILESTONES
+from core.focus_engine import FocusEngine
+
+KEYS_PER_SECOND = 5
+
+
+def workday():
+    """Sorted keystroke times for ~8 h: 50 min typing blocks with 10 min breaks."""
+    rng = random.Random(1)
+    keys, t = [], 0.0
+    for block in range(8):
+        end = t + 50 * 60
+        while t < end:
+            t += rng.expovariate(KEYS_PER_SECOND)
+            # Short pauses inside a block (reading, thinking)
+            if rng.random() < 0.0005:
+                t += rng.uniform(20, 90)
+            keys.append(t)
+        t += 60 * 60 if block == 3 else 10 * 60
+    return keys
+
+
+class Keys:
+    def __init__(self, times):
+        self.times = times
+
+    def last_before(self, now):
+        i = bisect.bisect_right(self.times, now)
+        return self.times[i - 1] if i else -1e9
+
+    def next_after(self, now):
+        i = bisect.bisect_right(self.times, now)
+        return self.times[i] if i < len(self.times) else None
+
+
+def run_polling(keys, stall, rng):
+    wakeups, granted = 0, 0
+    prev, focus_start, given = None, None, set()
+    now, end = 0.0, keys.times[-1] + 300
+    while now < end:
+        wakeups += 1
+        last = keys.last_before(now)
+        idle = now - last
+        state = "sleeping" if idle > 120 else "idle" if idle > 20 else "focused"
+        if state != prev:
+            prev = state
+            focus_start = now if state == "focused" else None
+            given = set()
+        if state == "focused":
+            d = now - focus_start
+            if 25 < d < 27 and 25 not in given:
+                given.add(25)
+                granted += 1
+            if 60 < d < 62 and 60 not in given:
+                given.add(60)
+                granted += 1
+        now += 1 + rng.uniform(0, stall)
+    return wakeups, granted
+
+
+def run_deadline(keys, stall, rng):
+    engine = FocusEngine()
+    wakeups, granted = 0, 0
+    prev = None
+    now, end = 0.0, keys.times[-1] + 300
+    while now < end:
+        wakeups += 1
+        last = keys.last_before(now)
+        state = engine.state_for(now, last)
+        granted += len(engine.due(now, last))
+        if state != prev:
+            prev = state
+            if state == "focused":
+                engine.start_focus(last)   # as Signals._process_activity does
+            else:
+                engine.end_focus()
+
+        deadline = engine.next_deadline(now, last)
+        if now - last < BURST_WINDOW:
+            deadline = min(deadline or now + BURST_WINDOW, now + BURST_WINDOW)
+        if state != "focused":
+            # A keystroke while not focused wakes the monitor immediately
+            key = keys.next_after(now)
+            if key is not None and (deadline is None or key < deadline):
+                deadline = key
+        if deadline is None:
+            break
+        now = max(deadline, now) + rng.uniform(0, stall)
+    return wakeups, granted
+
+
+def sessions_earning(keys):
+    """How many milestones an ideal monitor would grant."""
+    engine = FocusEngine()
+    earned, start, prev_key = 0, keys.times[0], keys.times[0]
+    for t in keys.times[1:] + [float("inf")]:
+        if t - prev_key >= engine.idle_after:
+            length = prev_key + engine.idle_after - start
+            earned += sum(1 for m in FOCUS_MILESTONES if m["after"] <= length)
+            start = t
+        prev_key = t
+    return earned
+
+
+def main():
+    stall = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    keys = Keys(workday())
+    hours = (keys.times[-1] + 300) / 3600
+    print(f"{len(keys.times)} keys over {hours:.1f} h, stalls up to {stall:g} s, "
+          f"milestones earned: {sessions_earning(keys)}")
+    for name, run in [("polling", run_polling), ("deadline", run_deadline)]:
+        wakeups, granted = run(keys, stall, random.Random(2))
+        print(f"{name:<9} wakeups {wakeups:6d} ({wakeups / hours / 60:5.1f}/min)  "
+              f"milestones granted {granted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Power governor on injected sensor readings: chosen profiles, flapping, cost.
+
+    python -m benchmarks.bench_governor
+
+Each scenario is a scripted series of readings (one per GOVERNOR_INTERVAL)
+fed to Governor.update() through a fake sensor. "no hysteresis" is the same
+governor with margin 0 and relax 1: it follows every reading, so noisy load
+near a threshold flips the profile back and forth. The last column checks
+the profile the scenario should end in. The real psutil sampling cost and
+what a profile change does to the live knobs are measured at the end.
+"""
+import contextlib
+import io
+import math
+import random
+import statistics
+import time
+
+from core.duty_cycle import DutyCycle
+from core.governor import Governor, PsutilSensors
+
+SAMPLES = 120
+
+
+def reading(cpu=10, memory=50, on_battery=False, battery=None):
+    return {"cpu": cpu, "memory": memory, "on_battery": on_battery, "battery": battery}
+
+
+def noisy_compile(rng):
+    """Idle, then a long build: CPU hovering around the saver threshold, then idle."""
+    for i in range(SAMPLES):
+        if 20 <= i < 90:
+            yield reading(cpu=max(0, min(100, rng.gauss(82, 8))))
+        else:
+            yield reading(cpu=rng.uniform(3, 15))
+
+
+def near_balanced(rng):
+    """Steady background load just around the balanced threshold."""
+    for _ in range(SAMPLES):
+        yield reading(cpu=max(0, rng.gauss(60, 6)))
+
+
+def unplugged(rng):
+    """Unplugged at 60 %, drains to 15 %, plugged back in."""
+    for i in range(SAMPLES):
+        if i < 100:
+            yield reading(cpu=rng.uniform(5, 20), on_battery=True, battery=60 - i * 0.45)
+        else:
+            yield reading(cpu=rng.uniform(5, 20), on_battery=False, battery=15 + (i - 100))
+
+
+def memory_pressure(rng):
+    """A browser slowly eating memory past 95 %, then closed."""
+    for i in range(SAMPLES):
+        memory = 70 + 30 * math.sin(math.pi * i / SAMPLES) + rng.uniform(-2, 2)
+        yield reading(cpu=rng.uniform(5, 20), memory=min(99, memory))
+
+
+SCENARIOS = [
+    ("noisy compile", noisy_compile, "full"),
+    ("near balanced", near_balanced, None),
+    ("unplugged", unplugged, "full"),
+    ("memory pressure", memory_pressure, "full"),
+]
+
+
+class FakeSensors:
+    def __init__(self, readings):
+        self.readings = iter(readings)
+
+    def read(self):
+        return next(self.readings)
+
+
+def replay(readings, **kwargs):
+    governor = Governor(FakeSensors(readings), pinned=None, **kwargs)
+    timeline = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(SAMPLES):
+            timeline.append(governor.sample())
+    switches = sum(1 for a, b in zip(timeline, timeline[1:]) if a != b)
+    return timeline, switches
+
+
+def summary(timeline):
+    return " ".join(f"{name[0]}{timeline.count(name)}" for name in ["full", "balanced", "saver"])
+
+
+def main():
+    print(f"{SAMPLES} samples per scenario; f/b/s = samples in full/balanced/saver")
+    print(f"{'scenario':<16}{'no hysteresis':>26}{'governor':>26}   ends in")
+    for name, scenario, expected in SCENARIOS:
+        raw, raw_switches = replay(scenario(random.Random(1)), margin=0, relax_samples=1)
+        timeline, switches = replay(scenario(random.Random(1)))
+        check = ""
+        if expected:
+            check = "ok" if timeline[-1] == expected else f"EXPECTED {expected}"
+        print(f"{name:<16}{raw_switches:4d} switches {summary(raw):>11}"
+              f"{switches:4d} switches {summary(timeline):>11}   {timeline[-1]:<9}{check}")
+
+    # Real sensors: cost of one sample
+    sensors = PsutilSensors()
+    samples = []
+    for _ in range(200):
+        start = time.perf_counter()
+        sensors.read()
+        samples.append((time.perf_counter() - start) * 1e6)
+    print(f"psutil sample: median {statistics.median(samples):.0f} us, max {max(samples):.0f} us "
+          f"(every {Governor().interval} s)")
+
+    # What a profile change does to the live knobs
+    governor = Governor(FakeSensors([reading(cpu=95)]), pinned=None)
+    duty = DutyCycle()
+    governor.subscribe(lambda name, profile: setattr(duty, "scale", profile["camera_scale"]))
+    with contextlib.redirect_stdout(io.StringIO()):
+        governor.sample()
+    print(f"at cpu 95%: {governor.name}, camera interval while idle "
+          f"{duty.next_interval('idle', False):.0f} s, profile {governor.profile}")
+
+
+if __name__ == "__main__":
+    main()
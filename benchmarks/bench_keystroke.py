@@ -0,0 +1,169 @@
+"""Cost of Signals.on_key_press inside the input hook: old inline logic vs ring buffer.
+
+    python -m benchmarks.bench_keystroke [seconds]
+
+Keys are paced at 20 keys/s (fast typing) so each call sees a cold-ish
+cache, like the real hook. "steady" is typing while already focused;
+"wake" is the first key after the pet went idle, where the old handler
+switched state, wrote XP and queued speech before returning. The
+aggregator row is the per-tick cost the monitor thread now pays instead.
+The back-to-back row repeats the steady case without pacing.
+
+pynput needs a display just to import, so a placeholder keyboard module is
+installed before importing core.signals; no listener is started.
+"""
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+
+if "pynput" not in sys.modules:
+    pynput = types.ModuleType("pynput")
+    pynput.keyboard = types.ModuleType("pynput.keyboard")
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.keyboard"] = pynput.keyboard
+
+from core.activity import ActivityRing, CoalescedActivity
+from core.focus_engine import FocusEngine
+from core.metrics import Counter
+from core.signals import PROMPTS, Signals
+from core.state_manager import StateManager
+from rewards.rewards_manager import RewardsManager
+
+KEYS_PER_SECOND = 20
+
+
+def legacy_on_key_press(self, key):
+    # The handler as it was before the ring buffer
+    current_state = self.current_state
+    self.last_key_time = time.time()
+    self.started_typing = True
+
+    if current_state == "happy" and (time.time() - self.last_focus_state_change < 10):
+        return
+
+    was_idle = current_state not in ["focused", "happy"]
+
+    if current_state != "focused":
+        self.focus_start_time = time.time()
+        self.state_manager.set_state("focused")
+        self.prev_state = "focused"
+        self.last_focus_state_change = time.time()
+        self.reward_25_given = False
+        self.reward_60_given = False
+
+    if was_idle:
+        self.rewards.add_xp(2)
+        self._speak_ai(PROMPTS["welcome"], state="focused")
+
+
+def make_signals(data_dir):
+    """A Signals with just the attributes the key path touches."""
+    signals = Signals.__new__(Signals)
+    signals.state_manager = StateManager()
+    signals.clock = time
+    signals.now = time.time
+    signals.rewards = RewardsManager(data_dir)
+    signals.state_manager.subscribe(signals.on_state_change)
+    signals.last_input_time = time.time()
+    signals.prev_state = None
+    signals.last_focus_state_change = 0
+    signals.started_typing = False
+    signals.current_state = "idle"
+    signals.focus = FocusEngine()
+    signals.activity = ActivityRing()
+    signals.record_key = signals.activity.append
+    signals.keys_total = Counter("keys_total")
+    signals.seen_key_time = 0.0
+    signals.mouse = CoalescedActivity()
+    signals.seen_mouse_time = 0.0
+    signals.keys_per_minute = 0.0
+    signals.in_burst = False
+    signals.wakeup = threading.Event()
+    signals.calendar = None
+    signals.in_meeting = False
+    signals.spoken = 0
+    signals._speak_ai = lambda prompt, **kwargs: setattr(signals, "spoken", signals.spoken + 1)
+    return signals
+
+
+def pct(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def report(name, samples):
+    samples.sort()
+    print(f"{name:<22} p50 {statistics.median(samples):9.0f} ns  "
+          f"p99 {pct(samples, 0.99):9.0f} ns  max {samples[-1]:9.0f} ns  n={len(samples)}")
+
+
+def time_keys(signals, handler, keys, wake_every=0):
+    samples = []
+    for i in range(keys):
+        if wake_every and i % wake_every == 0:
+            signals.state_manager.set_state("idle")
+            signals.wakeup.clear()
+        start = time.perf_counter_ns()
+        handler(signals, None)
+        samples.append(time.perf_counter_ns() - start)
+        if wake_every and i % wake_every == 0:
+            signals._process_activity(time.time())   # aggregator catches up
+        time.sleep(1 / KEYS_PER_SECOND)
+    return samples
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    keys = int(seconds * KEYS_PER_SECOND)
+    root = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            old = make_signals(os.path.join(root, "old"))
+            old.state_manager.set_state("focused")
+            steady_old = time_keys(old, legacy_on_key_press, keys)
+            wake_old = time_keys(old, legacy_on_key_press, max(20, keys // 10), wake_every=1)
+
+            new = make_signals(os.path.join(root, "new"))
+            new.state_manager.set_state("focused")
+            steady_new = time_keys(new, Signals.on_key_press, keys)
+            wake_new = time_keys(new, Signals.on_key_press, max(20, keys // 10), wake_every=1)
+
+            ticks = []
+            for _ in range(200):
+                start = time.perf_counter_ns()
+                new._process_activity(time.time())
+                ticks.append(time.perf_counter_ns() - start)
+
+            # Back-to-back calls: the handler's own cost without cache misses
+            hot = {}
+            for name, signals, handler in [("old", old, legacy_on_key_press),
+                                           ("new", new, Signals.on_key_press)]:
+                signals.state_manager.set_state("focused")
+                start = time.perf_counter_ns()
+                for _ in range(100_000):
+                    handler(signals, None)
+                hot[name] = (time.perf_counter_ns() - start) / 100_000
+
+            old.rewards.flush()
+            new.rewards.flush()
+
+        print(f"{KEYS_PER_SECOND} keys/s for {seconds:g} s")
+        report("old handler  steady", steady_old)
+        report("ring buffer  steady", steady_new)
+        report("old handler  wake", wake_old)
+        report("ring buffer  wake", wake_new)
+        report("aggregator tick", ticks)
+        print(f"back-to-back steady     old {hot['old']:.0f} ns/key  ring buffer {hot['new']:.0f} ns/key")
+        print(f"keys/min seen by aggregator: {new.keys_per_minute:.0f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
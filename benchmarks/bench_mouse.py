@@ -0,0 +1,143 @@
+"""CPU cost of the mouse listener callbacks under a synthetic 500 events/s stream.
+
+    python -m benchmarks.bench_mouse [seconds]
+
+The main thread stands in for the pynput hook thread: every 10 ms it
+delivers a batch of 5 events (mostly moves, some scrolls, the odd click)
+to the callback, for `seconds` seconds, while a monitor thread runs the
+real Signals.tick loop. The pet starts idle, so the first event wakes it.
+
+  no-op      empty callback: the floor of the measurement loop itself
+  per-event  each event appends a timestamp and may set wakeup, like the
+             keyboard hook does per key
+  coalesced  CoalescedActivity.touch, what Signals wires to the listener
+
+"callback CPU" is the time spent inside the callbacks as a share of one
+core; "process CPU" is process_time over the run (feeder pacing, monitor
+and callbacks together). The back-to-back row is the unpaced cost per call.
+The OS hook's own cost of delivering events is outside Python and not
+measured here.
+"""
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_keystroke import make_signals
+from core.activity import CoalescedActivity
+
+RATE = 500
+BATCH = 5
+
+
+def event_args(i):
+    """(x, y[, ...]) like pynput passes: 94% moves, 5% scrolls, 1% clicks."""
+    x, y = i % 1920, i % 1080
+    if i % 100 == 0:
+        return (x, y, "left", True)
+    if i % 20 == 0:
+        return (x, y, 0, -1)
+    return (x, y)
+
+
+def per_event_handler(signals):
+    mouse = signals.mouse
+    append = mouse.ring.append
+
+    def on_event(*args):
+        append(time.time())
+        mouse.ticks += 1
+        if signals.current_state != "focused":
+            signals.wakeup.set()
+    return on_event
+
+
+def run(make_callback, seconds, root):
+    with contextlib.redirect_stdout(io.StringIO()):
+        signals = make_signals(root)
+    signals.mouse = CoalescedActivity(on_tick=signals._on_mouse_tick)
+    callback = make_callback(signals)
+
+    passes = [0]
+
+    def monitor():
+        while signals.running:
+            with contextlib.redirect_stdout(io.StringIO()):
+                deadline = signals.tick(signals.now())
+            passes[0] += 1
+            timeout = None if deadline is None else max(0, deadline - signals.now())
+            signals.wakeup.wait(timeout)
+            signals.wakeup.clear()
+
+    signals.running = True
+    thread = threading.Thread(target=monitor, daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    passes[0] = 0
+
+    events = int(seconds * RATE)
+    args = [event_args(i) for i in range(events)]
+    inside = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    next_batch = wall_start
+    for i in range(0, events, BATCH):
+        start = time.perf_counter_ns()
+        for a in args[i:i + BATCH]:
+            callback(*a)
+        inside += time.perf_counter_ns() - start
+        next_batch += BATCH / RATE
+        delay = next_batch - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    signals.running = False
+    signals.wakeup.set()
+    thread.join(1)
+    state = signals.current_state
+    ticks = signals.mouse.ticks
+
+    # Unpaced, focused: the steady cost of one call
+    signals.current_state = "focused"
+    n = 200_000
+    start = time.perf_counter_ns()
+    for i in range(n):
+        callback(i, i)
+    back_to_back = (time.perf_counter_ns() - start) / n
+
+    signals.rewards.flush()
+    signals.rewards.store.engine.dispose()
+    return {
+        "callback": inside / 1e9 / wall * 100, "per_event": inside / events,
+        "process": cpu / wall * 100, "ticks": ticks / wall, "passes": passes[0],
+        "state": state, "back_to_back": back_to_back,
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    print(f"{RATE} mouse events/s in batches of {BATCH} for {seconds:g} s")
+    root = tempfile.mkdtemp()
+    try:
+        floor = None
+        for name, make_callback in [("no-op", lambda signals: (lambda *args: None)),
+                                    ("per-event", per_event_handler),
+                                    ("coalesced", lambda signals: signals.mouse.touch)]:
+            r = run(make_callback, seconds, root)
+            floor = floor or r
+            print(f"{name:<10} callback CPU {r['callback']:6.3f}% of a core "
+                  f"(+{r['callback'] - floor['callback']:5.3f}% over no-op, "
+                  f"{r['per_event']:5.0f} ns/event)  process CPU {r['process']:4.1f}%  "
+                  f"ticks {r['ticks']:6.1f}/s  monitor passes {r['passes']:2d}  "
+                  f"{r['state']:<8} back-to-back {r['back_to_back']:4.0f} ns")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
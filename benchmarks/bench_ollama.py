@@ -0,0 +1,64 @@
+"""Time-to-first-token and total latency: HTTP streaming vs `ollama run`.
+
+    python -m benchmarks.bench_ollama
+"""
+import os
+import stat
+import statistics
+import sys
+import tempfile
+import time
+
+from ai.ollama_react import OllamaReact
+from benchmarks.stub_ollama import start_server
+
+ROUNDS = 10
+PROMPT = "Say a cute, short 'welcome back' message under 6 words. Use emojis."
+
+
+def make_cli_wrapper():
+    """Executable that runs the stub in CLI mode, standing in for ollama.exe."""
+    stub = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_ollama.py")
+    fd, path = tempfile.mkstemp(suffix=".sh")
+    with os.fdopen(fd, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{stub}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def measure(tokens):
+    start = time.perf_counter()
+    first = None
+    for _ in tokens:
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return first if first is not None else total, total
+
+
+def report(name, samples):
+    ttft = [s[0] * 1000 for s in samples]
+    total = [s[1] * 1000 for s in samples]
+    print(f"{name:<12} ttft median {statistics.median(ttft):8.1f} ms   "
+          f"total median {statistics.median(total):8.1f} ms")
+
+
+def main():
+    server, url = start_server()
+
+    http = OllamaReact(host=url)
+    report("http", [measure(http.stream(PROMPT)) for _ in range(ROUNDS)])
+
+    cli = OllamaReact(host=url, use_http=False)
+    cli.ollama_path = make_cli_wrapper()
+    try:
+        report("subprocess", [measure(cli.stream(PROMPT)) for _ in range(ROUNDS)])
+    finally:
+        os.remove(cli.ollama_path)
+
+    http.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
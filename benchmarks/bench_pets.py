@@ -0,0 +1,140 @@
+"""Memory and CPU of 1..10 pets in one process against one process per pet.
+
+    python -m benchmarks.bench_pets [max pets]
+
+Each row is a fresh interpreter (so RSS is not shared between rows) that
+builds the pets on the headless Tk of benchmarks.headless_tk, with one set
+of services: the Signals rewards store and a face detector with its
+cascades loaded, as the real app holds once per process. It then replays a
+virtual minute MINUTES times: every pet animating idle, each pet patted
+once at its own time (so their frames drift out of phase), and the group
+sent to focused, happy and back to idle like Signals does.
+
+  separate      N x the one-pet process: what running the app N times costs
+  shared        Pets on one root: one frame cache, RenderClock, reaction
+                timer, UI queue and set of services
+  own timers    as shared, but each Animator with its own FrameCache and
+                `after` timers: what the frame cache and render clock add
+
+"cpu" is process CPU per replayed minute after the first (setup and frame
+decoding excluded), "wakeups" Tk timer callbacks and "redraws" pet frames
+drawn per minute. USS is memory private to the process; RSS also counts
+the shared libraries each process maps; "per pet" is the USS each pet
+after the first adds.
+"""
+import contextlib
+import gc
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+MINUTE = 60_000
+MINUTES = 11   # the first is warm-up
+
+
+def child(mode, count):
+    import psutil
+
+    from benchmarks.headless_tk import FakeRoot, FakeScheduler, FakeToplevel, patch_tk
+    patch_tk()
+    from benchmarks.bench_keystroke import make_signals
+    from core.face_detector import FaceDetector
+    from core.frame_cache import FrameCache
+    from core.pets import Pet, PetGroup
+    from core.render_clock import RenderClock
+    from core.ui_queue import UIQueue
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        root = FakeRoot()
+        shared = mode == "shared"
+        app = SimpleNamespace(
+            ui=UIQueue(root).start(), scheduler=FakeScheduler(root), signals=None,
+            frame_cache=FrameCache() if shared else None,
+            render_clock=RenderClock(root, clock=root) if shared else None,
+        )
+        pets = []
+        for i in range(count):
+            window = root if i == 0 else FakeToplevel(root)
+            if not shared:
+                app.frame_cache = FrameCache()
+            pets.append(Pet(app, window, name=f"pet{i + 1}" if i else None))
+        group = PetGroup(pets)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.signals = make_signals(data_dir)
+            detector = FaceDetector(group, None, None, enable_camera=False)
+            detector.load_cascades()
+
+        for pet in pets:
+            pet.animator.update_frame()
+        for minute in range(MINUTES):
+            start = minute * MINUTE
+            for i, pet in enumerate(pets):
+                root.after(start + 3000 + i * 47_000 // count, pet.animator.on_click, None)
+            root.after(start + 20_000, group.set_state, "focused")
+            root.after(start + 35_000, group.set_state, "happy")
+            root.after(start + 45_000, group.set_state, "idle")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            root.run_for(MINUTE)   # first minute decodes frames: warm-up
+            fired, cpu = root.fired, time.process_time()
+            root.run_for((MINUTES - 1) * MINUTE)
+        cpu = (time.process_time() - cpu) / (MINUTES - 1)
+
+        gc.collect()
+        memory = psutil.Process().memory_full_info()
+        result = {
+            "rss": memory.rss, "uss": memory.uss, "cpu": cpu,
+            "wakeups": (root.fired - fired) / (MINUTES - 1),
+            "redraws": sum(pet.animator.label.redraws for pet in pets) / MINUTES,
+            "threads": threading.active_count(),
+        }
+        app.signals.rewards.flush()
+        app.signals.rewards.store.engine.dispose()
+        return result
+    finally:
+        shutil.rmtree(data_dir)
+
+
+def run(mode, count):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_pets", "--child", mode, str(count)],
+                         capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def row(mode, count, r, base):
+    mb = 1024 * 1024
+    per_pet = (r["uss"] - base["uss"]) / (count - 1) / 1024 if count > 1 else 0
+    print(f"{mode:<11}{count:>4}  RSS {r['rss'] / mb:6.1f} MB  USS {r['uss'] / mb:6.1f} MB "
+          f"({r['uss'] / base['uss']:4.1f}x, {per_pet:6.0f} KB per pet)  "
+          f"cpu {r['cpu'] * 1000:5.1f} ms ({r['cpu'] / base['cpu']:4.1f}x)  "
+          f"wakeups {r['wakeups']:5.0f}  redraws {r['redraws']:5.0f}  threads {r['threads']:3d}")
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    counts = [n for n in (1, 2, 5, 10) if n < top] + [top]
+    print(f"per virtual minute, averaged over {MINUTES - 1}; (Nx) is relative to one pet in one process")
+    one = run("shared", 1)
+    for count in counts:
+        separate = {key: value * count for key, value in one.items()}
+        row("separate", count, separate, one)
+    for mode in ("own timers", "shared"):
+        for count in counts:
+            row(mode, count, run(mode.replace(" ", "-"), count), one)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        print(json.dumps(child(sys.argv[2].replace("-", " "), int(sys.argv[3]))))
+    else:
+        main()
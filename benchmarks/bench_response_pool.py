@@ -0,0 +1,49 @@
+"""Latency of a pooled speech line vs a fresh generation.
+
+    python -m benchmarks.bench_response_pool
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from ai.job_queue import AIJobQueue
+from ai.ollama_react import OllamaReact
+from ai.response_pool import ResponsePool
+from benchmarks.stub_ollama import start_server
+
+ROUNDS = 200
+PROMPT = "Say something excited and celebratory in under 5 words. Use emojis."
+
+
+def main():
+    server, url = start_server()
+    ollama = OllamaReact(host=url)
+    path = os.path.join(tempfile.mkdtemp(), "pool.json")
+    pool = ResponsePool(ollama, AIJobQueue(), path=path, max_uses=ROUNDS)
+
+    prompt = PROMPT
+    pool.register(prompt)
+    for i in range(pool.size):
+        pool.add(prompt, f"Yay! {i} 🎉")
+
+    hit = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        pool.get(prompt)
+        hit.append((time.perf_counter() - start) * 1000)
+
+    miss = []
+    for _ in range(10):
+        start = time.perf_counter()
+        ollama.generate(prompt)
+        miss.append((time.perf_counter() - start) * 1000)
+
+    print(f"pool hit     median {statistics.median(hit):8.4f} ms   max {max(hit):8.4f} ms")
+    print(f"generation   median {statistics.median(miss):8.1f} ms")
+    print("counters", pool.stats()[prompt])
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
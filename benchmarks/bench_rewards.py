@@ -0,0 +1,144 @@
+"""RewardsManager write cost: synchronous JSON rewrite per call vs batched events.
+
+    python -m benchmarks.bench_rewards [calls]
+
+"sync json" replays the original behavior (json.dump with indent=4 on every
+save); "json store" the write-behind JSON store that replaced it, kept here
+as a baseline (one atomic write per dirty file per window); "event store"
+is the current RewardsManager, where a batch is one SQLite transaction.
+JSON writes are counted by wrapping open().
+"""
+import builtins
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from rewards.rewards_manager import RewardsManager
+from rewards.write_behind import WriteBehind
+
+
+class OpenCounter:
+    def __init__(self, root):
+        self.root = root
+        self.writes = 0
+        self._open = builtins.open
+
+    def __enter__(self):
+        def counting_open(file, mode="r", *args, **kwargs):
+            if "w" in mode and str(file).startswith(self.root):
+                self.writes += 1
+            return self._open(file, mode, *args, **kwargs)
+        builtins.open = counting_open
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open = self._open
+
+
+def sync_save(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+class JsonStore(WriteBehind):
+    """The write-behind JSON persistence RewardsManager had before the event store.
+
+    Every dirty file is written once per debounce window, atomically (temp
+    file + fsync + rename); a file that fails is retried a window later.
+    """
+
+    def __init__(self, lock):
+        super().__init__(lock)
+        self.dirty = {}        # path -> data (live reference)
+
+    def mark_dirty(self, path, data):
+        with self.lock:
+            self.dirty[path] = data
+            self._schedule()
+
+    def _take(self):
+        snapshot = {path: (data, json.dumps(data, indent=4)) for path, data in self.dirty.items()}
+        self.dirty.clear()
+        return snapshot
+
+    def _write(self, snapshot):
+        failed = {}
+        for path, (data, text) in snapshot.items():
+            try:
+                self.write_atomic(path, text)
+            except OSError as e:
+                print("Save error:", path, e)
+                failed[path] = (data, text)
+        if failed:
+            snapshot.clear()
+            snapshot.update(failed)   # only these go back
+            raise OSError(f"{len(failed)} file(s) not written")
+
+    def _restore(self, snapshot):
+        for path, (data, _) in snapshot.items():
+            self.dirty.setdefault(path, data)
+
+    def write_atomic(self, path, text):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+def run(name, rewards, calls):
+    latencies = []
+    writes_before = rewards.store.writes
+    with OpenCounter(rewards.data_dir) as counter, contextlib.redirect_stdout(io.StringIO()):
+        for i in range(calls):
+            start = time.perf_counter()
+            rewards.add_xp(2)
+            if i % 50 == 0:
+                rewards.complete_quest("25sec_focus")
+                rewards.quests["25sec_focus"] = False
+            latencies.append((time.perf_counter() - start) * 1e6)
+        rewards.flush()
+
+    latencies.sort()
+    print(f"{name:<12} add_xp p50 {statistics.median(latencies):8.1f} us  "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:8.1f} us  "
+          f"json writes {counter.writes:5d}  db transactions "
+          f"{rewards.store.writes - writes_before:5d}  for {calls} calls")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    root = tempfile.mkdtemp()
+    try:
+        legacy = RewardsManager(os.path.join(root, "sync"))
+        legacy.flush()
+        files = {"stats": legacy.stats_file, "quests": legacy.quests_file}
+        legacy.store.append = lambda *args, **kwargs: None
+        legacy._save = lambda key, data: sync_save(files[key], data)  # inline, as before
+        run("sync json", legacy, calls)
+
+        behind = RewardsManager(os.path.join(root, "behind"))
+        behind.flush()
+        json_store = JsonStore(behind.lock)
+        files = {"stats": behind.stats_file, "quests": behind.quests_file}
+        behind.store.append = lambda *args, **kwargs: None
+        behind._save = lambda key, data: json_store.mark_dirty(files[key], data)
+        behind.flush = json_store.flush
+        run("json store", behind, calls)
+
+        current = RewardsManager(os.path.join(root, "events"))
+        current.flush()
+        run("event store", current, calls)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
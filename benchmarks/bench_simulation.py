@@ -0,0 +1,60 @@
+"""How fast the headless simulation replays an 8 h workday.
+
+    python -m benchmarks.bench_simulation [days]
+
+Replays core.simulation.workday_trace() (typing blocks, pauses, smiles,
+breaks and a lunch) through the real Signals / StateManager / FocusEngine /
+RewardsManager on the virtual clock, once per seed. Target: well under a
+second per simulated day, so scenarios can be regression-tested in bulk.
+
+Each day is also checked: every focus session (until the monitor ends it at
+idle, sleep or a meeting) grants each milestone at most once, however long
+the typing runs and through its happy celebrations.
+"""
+import bisect
+import statistics
+import sys
+import time
+
+from core.simulation import simulate, workday_trace
+
+
+def repeated_milestones(results):
+    """Milestones granted more than once within one focus session."""
+    ends = results["focus_ends"]
+    seen, repeats = set(), []
+    for row in results["milestones"]:
+        # Milestones due at an idle deadline are granted just before it ends the session
+        session = bisect.bisect_left(ends, row["t"])
+        if (session, row["id"]) in seen:
+            repeats.append(row)
+        seen.add((session, row["id"]))
+    return repeats
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    times, failed = [], 0
+    for seed in range(1, days + 1):
+        events = workday_trace(seed)
+        keys = sum(int(e["for"] * e["kps"]) for e in events if e["event"] == "typing")
+        start = time.perf_counter()
+        results = simulate(events)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        print(f"day {seed}: {results['duration'] / 3600:4.1f} h simulated, {keys:6d} keys, "
+              f"{results['monitor_ticks']:5d} monitor passes, {len(results['timeline']):4d} state changes, "
+              f"{len(results['ledger']):4d} ledger rows in {elapsed * 1000:6.0f} ms")
+        repeats = repeated_milestones(results)
+        if repeats:
+            failed += 1
+            print(f"  EXPECTED each milestone once per session; repeated: "
+                  + ", ".join(f"{r['id']} at {r['t']:.0f} s" for r in repeats[:5]))
+    print(f"median {statistics.median(times) * 1000:.0f} ms per simulated day "
+          f"({statistics.median([8 * 3600 / t for t in times]):,.0f}x real time)")
+    print("milestones once per session:", "ok" if not failed else f"FAILED on {failed} day(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Main-loop latency under a flood of 1,000 speech lines and 1,000 chat lines.
+
+    python -m benchmarks.bench_ui_queue [messages] [widget_cost_us]
+
+A small real-time `after` loop stands in for Tk's mainloop, with a 16 ms
+heartbeat (an animation frame) whose lateness is the main-loop latency.
+Widget calls are fakes that spin for widget_cost_us each. A background
+thread posts the flood as fast as it can:
+
+  after(0) each   one Tk callback per message, each doing its own widget
+                  work and scheduling its own hide timer (the old code,
+                  minus the cross-thread widget calls)
+  ui queue        UIQueue: newest bubble wins, chat text batched per tick
+
+"early hides" counts bubbles hidden by an older line's timer.
+"""
+import heapq
+import itertools
+import statistics
+import sys
+import threading
+import time
+import tkinter
+
+from core.chat_window import ChatWindow
+from core.speech_bubble import SpeechBubble
+from core.ui_queue import UIQueue
+
+FRAME_MS = 16
+BUBBLE_MS = 4000
+
+
+class RealtimeRoot:
+    """Thread-safe `after` on the real clock, run by run_until() on one thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = []
+        self.cancelled = set()
+        self._ids = itertools.count()
+
+    def after(self, ms, fn, *args):
+        with self.lock:
+            after_id = next(self._ids)
+            heapq.heappush(self.queue, (time.perf_counter() + ms / 1000, after_id, fn, args))
+        return after_id
+
+    def after_cancel(self, after_id):
+        with self.lock:
+            self.cancelled.add(after_id)
+
+    def run_until(self, done):
+        while not done():
+            with self.lock:
+                item = self.queue[0] if self.queue else None
+                if item and item[0] <= time.perf_counter():
+                    heapq.heappop(self.queue)
+                else:
+                    item = None
+            if item is None:
+                time.sleep(0.0005)
+                continue
+            _, after_id, fn, args = item
+            if after_id in self.cancelled:
+                continue
+            fn(*args)
+
+
+class Widgets:
+    """Fake Tk widgets that cost `cost` seconds per call."""
+
+    def __init__(self, cost):
+        self.cost = cost
+        self.calls = 0
+
+    def call(self, *args, **kwargs):
+        self.calls += 1
+        end = time.perf_counter() + self.cost
+        while time.perf_counter() < end:
+            pass
+
+    def widget(self, *args, **kwargs):
+        w = type("FakeWidget", (), {})()
+        w.config = w.lift = w.place = w.place_forget = self.call
+        w.insert = w.delete = self.call
+        # ChatWindow reads the scroll position before auto-scrolling
+        w.yview = lambda *args: (self.call(), (0.0, 1.0))[1]
+        return w
+
+
+class Bubble:
+    """Tracks what the bubble shows, to count hides from stale timers."""
+
+    def __init__(self):
+        self.shown_at = None
+        self.early_hides = 0
+
+    def hide(self):
+        if self.shown_at is not None and time.perf_counter() - self.shown_at < BUBBLE_MS / 1000 - 0.001:
+            self.early_hides += 1
+        self.shown_at = None
+
+
+def heartbeat(root, lateness, expected):
+    now = time.perf_counter()
+    lateness.append((now - expected) * 1000)
+    root.after(FRAME_MS, heartbeat, root, lateness, now + FRAME_MS / 1000)
+
+
+def flood(post_speech, post_chat, messages):
+    for i in range(messages):
+        post_speech(f"line {i}")
+        post_chat("Pet", f"reply {i}")
+
+
+def run_after_each(messages, widgets, root):
+    bubble, label, chat_box = Bubble(), widgets.widget(), widgets.widget()
+    remaining = [2 * messages]
+
+    def show(message):
+        label.config(text=message)
+        label.lift()
+        label.place(x=10, y=10)
+        bubble.shown_at = time.perf_counter()
+        root.after(BUBBLE_MS, hide)
+        remaining[0] -= 1
+
+    def hide():
+        bubble.hide()
+        label.place_forget()
+
+    def append(sender, text):
+        chat_box.config(state="normal")
+        chat_box.insert("end", f"{sender}: {text}\n\n")
+        chat_box.config(state="disabled")
+        chat_box.yview("end")
+        remaining[0] -= 1
+
+    poster = threading.Thread(target=flood, args=(
+        lambda m: root.after(0, show, m),
+        lambda s, t: root.after(0, append, s, t),
+        messages))
+    return poster, bubble, lambda: remaining[0] == 0
+
+
+def run_ui_queue(messages, widgets, root):
+    tkinter.Label = widgets.widget
+    tkinter.Toplevel = type("FakeToplevel", (), {"winfo_exists": staticmethod(lambda w: True)})
+    ui = UIQueue(root).start()
+    bubble = Bubble()
+
+    speech = SpeechBubble(root, ui)
+    show = speech._show
+    hide = speech.hide
+
+    def tracked_show(message, duration):
+        show(message, duration)
+        bubble.shown_at = time.perf_counter()
+
+    def tracked_hide():
+        bubble.hide()
+        hide()
+
+    speech._show, speech.hide = tracked_show, tracked_hide
+
+    chat = ChatWindow(root, None, None, ui)
+    chat.window = object()
+    chat.chat_box = widgets.widget()
+
+    poster = threading.Thread(target=flood, args=(speech.show, chat._append_text, messages))
+    return poster, bubble, lambda: not poster.is_alive() and not ui.commands and not chat.pending_text
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    cost = (float(sys.argv[2]) if len(sys.argv) > 2 else 100) / 1e6
+    tk_label, tk_toplevel = tkinter.Label, tkinter.Toplevel
+    print(f"{messages} speech + {messages} chat lines, {cost * 1e6:.0f} us per widget call")
+    try:
+        for name, setup in [("after(0) each", run_after_each), ("ui queue", run_ui_queue)]:
+            root, widgets, lateness = RealtimeRoot(), Widgets(cost), []
+            poster, bubble, drained = setup(messages, widgets, root)
+            heartbeat(root, lateness, time.perf_counter())
+            start = time.perf_counter()
+            poster.start()
+            root.run_until(drained)
+            drain = time.perf_counter() - start
+
+            # Let the hide timers run out
+            end = time.perf_counter() + BUBBLE_MS / 1000 + 0.2
+            root.run_until(lambda: time.perf_counter() > end)
+            lateness.sort()
+            print(f"{name:<14} frame lateness p50 {statistics.median(lateness):6.1f} ms  "
+                  f"p99 {lateness[int(len(lateness) * 0.99)]:6.1f} ms  max {lateness[-1]:6.1f} ms  "
+                  f"drained in {drain * 1000:6.0f} ms  widget calls {widgets.calls:5d}  "
+                  f"early hides {bubble.early_hides}")
+    finally:
+        tkinter.Label, tkinter.Toplevel = tk_label, tk_toplevel
+
+
+if __name__ == "__main__":
+    main()
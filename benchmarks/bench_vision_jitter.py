@@ -0,0 +1,65 @@
+"""Main-thread tick jitter while faces are detected in a thread vs a child process.
+
+    python -m benchmarks.bench_vision_jitter [seconds]
+
+The main thread stands in for the Tk loop: it wakes every TICK_MS, does a
+little Python work and records how late each wakeup was. Meanwhile a
+camera thread feeds synthetic frames to the detector back to back.
+"""
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks.bench_face_detector import synthetic_frames
+from core.face_detector import FaceDetector
+from core.vision_process import VisionProcess
+
+TICK_MS = 10
+
+
+def camera_loop(detector, stop):
+    while not stop.is_set():
+        for frame in synthetic_frames(30):
+            if stop.is_set():
+                return
+            detector.process_frame(frame)
+
+
+def measure(detector, seconds):
+    stop = threading.Event()
+    worker = threading.Thread(target=camera_loop, args=(detector, stop), daemon=True)
+    worker.start()
+
+    late = []
+    next_tick = time.perf_counter() + TICK_MS / 1000
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+        late.append((time.perf_counter() - next_tick) * 1000)
+        sum(i * i for i in range(2000))  # a tick's worth of Python work
+        next_tick += TICK_MS / 1000
+
+    stop.set()
+    worker.join()
+    late.sort()
+    return statistics.median(late), late[int(len(late) * 0.99)], late[-1]
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    thread_mode = FaceDetector(None, None, None, enable_camera=False)
+    process_mode = VisionProcess(None, None, None, enable_camera=False)
+    process_mode._spawn()
+    process_mode.process_frame(next(synthetic_frames(1)))  # wait for child start-up
+
+    for name, detector in [("thread", thread_mode), ("process", process_mode)]:
+        p50, p99, worst = measure(detector, seconds)
+        print(f"{name:<8} tick lateness p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  max {worst:6.2f} ms")
+
+    process_mode._shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Just enough of Tk to drive the Animator and pet windows without a display.
+
+FakeRoot runs `after` callbacks on a virtual millisecond clock, so a minute
+of animation replays instantly and every wakeup can be counted. FakeToplevel
+windows and FakeScheduler (StateManager timers) run on their root's clock.
+"""
+import heapq
+import itertools
+
+import core.animator
+import core.frame_cache
+from core.scheduler import ScheduledCall
+
+
+class FakeLabel:
+    def __init__(self, root, **kwargs):
+        self.image = None
+        self.redraws = 0
+
+    def place(self, **kwargs):
+        pass
+
+    def place_forget(self):
+        pass
+
+    def lift(self):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def config(self, image=None, **kwargs):
+        self.image = image
+        self.redraws += 1
+
+
+class FakeRoot:
+    def __init__(self):
+        self.now = 0
+        self.queue = []
+        self.cancelled = set()
+        self._ids = itertools.count()
+        self.fired = 0   # `after` callbacks run (Tk timer wakeups)
+
+    def monotonic(self):
+        """Virtual seconds, so the root can stand in for the time module."""
+        return self.now / 1000
+
+    def after(self, ms, fn, *args):
+        after_id = next(self._ids)
+        heapq.heappush(self.queue, (self.now + ms, after_id, fn, args))
+        return after_id
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def after_cancel(self, after_id):
+        self.cancelled.add(after_id)
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def title(self, *args):
+        pass
+
+    def geometry(self, *args):
+        pass
+
+    def attributes(self, *args):
+        pass
+
+    def overrideredirect(self, *args):
+        pass
+
+    def run_for(self, ms):
+        end = self.now + ms
+        while self.queue and self.queue[0][0] <= end:
+            when, after_id, fn, args = heapq.heappop(self.queue)
+            if after_id in self.cancelled:
+                continue
+            self.now = when
+            self.fired += 1
+            fn(*args)
+        self.now = end
+
+
+class FakeToplevel(FakeRoot):
+    """A second window: its timers go through the root's queue, like Tk's."""
+
+    def __init__(self, root):
+        self.master = root
+
+    def after(self, ms, fn, *args):
+        return self.master.after(ms, fn, *args)
+
+    def after_cancel(self, after_id):
+        self.master.after_cancel(after_id)
+
+
+class FakeScheduler:
+    """core.scheduler.Scheduler on the root's virtual clock, for StateManager."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def call_later(self, delay, fn, *args):
+        call = ScheduledCall(self.root.monotonic() + delay, fn, args)
+        self.root.after(round(delay * 1000), lambda: call.cancelled or call.fn(*call.args))
+        return call
+
+
+def patch_tk():
+    """Swap Tk labels/images for fakes (PhotoImage becomes the PIL image)."""
+    core.animator.tk.Label = FakeLabel
+    core.frame_cache.ImageTk.PhotoImage = lambda img: img
@@ -0,0 +1,96 @@
+"""Local stand-in for Ollama, used by the benchmarks.
+
+As a server it answers /api/generate and /api/chat with NDJSON streams.
+/api/generate returns a growing `context`; when a request passes it back,
+only the new prompt counts as evaluated, and each evaluated prompt token
+costs prompt_delay seconds before the first reply token.
+Run as a script (`stub_ollama.py run <model>`) it mimics the CLI: it pays a
+start-up delay, reads the prompt from stdin and prints the whole reply.
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "Purr! You are doing great, keep going! 😺✨".split(" ")
+TOKEN_DELAY = 0.01     # seconds between streamed tokens
+PROMPT_DELAY = 0.0     # seconds per evaluated prompt token
+CLI_STARTUP = 0.35     # process spawn + model load of `ollama run`
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    token_delay = TOKEN_DELAY
+    prompt_delay = PROMPT_DELAY
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path not in ("/api/generate", "/api/chat"):
+            self.send_error(404)
+            return
+
+        # Prompt evaluation: ~1.3 tokens per word, skipped for a reused context
+        if self.path == "/api/generate":
+            context = body.get("context") or []
+            text = body.get("prompt", "") if context else body.get("system", "") + " " + body.get("prompt", "")
+        else:
+            context = []
+            text = " ".join(m["content"] for m in body["messages"])
+        evaluated = int(len(text.split()) * 1.3) + 1
+        time.sleep(self.prompt_delay * evaluated)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for i, word in enumerate(REPLY):
+            time.sleep(self.token_delay)
+            token = word if i == 0 else " " + word
+            if self.path == "/api/chat":
+                chunk = {"message": {"role": "assistant", "content": token}, "done": False}
+            else:
+                chunk = {"response": token, "done": False}
+            self._write_chunk(chunk)
+
+        done = {"done": True, "prompt_eval_count": evaluated, "eval_count": len(REPLY)}
+        if self.path == "/api/generate":
+            done["context"] = context + list(range(evaluated + len(REPLY)))
+        self._write_chunk(done)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, obj):
+        data = json.dumps(obj).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(token_delay=TOKEN_DELAY, prompt_delay=PROMPT_DELAY):
+    """Start the stub on a free port; returns (server, "http://host:port")."""
+    handler = type("Handler", (StubHandler,),
+                   {"token_delay": token_delay, "prompt_delay": prompt_delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+def run_cli():
+    time.sleep(CLI_STARTUP)
+    sys.stdin.read()
+    time.sleep(TOKEN_DELAY * len(REPLY))
+    print(" ".join(REPLY))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        run_cli()
+    else:
+        server, url = start_server()
+        print("Stub Ollama listening on", url)
+        server.serve_forever()
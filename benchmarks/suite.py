@@ -0,0 +1,549 @@
+"""Benchmark suite: every hot path, headless, with JSON results and regression checks.
+
+    python -m benchmarks.suite run [--json out.json] [--only name,...] [--quick] [--repeat 3]
+                                   [--video clip.mp4]
+    python -m benchmarks.suite compare base.json new.json [--threshold 0.2]
+
+Needs no display, camera or model: Tk is replaced by benchmarks.headless_tk,
+faces are synthetic frames (plus any --video clips), pynput is a placeholder
+module and the LLM is benchmarks.stub_ollama on a local port.
+
+Cases:
+
+  skin_load      Animator first frame through FrameCache (the cold-load path
+                 that replaced Animator.load_all_frames) and load_atlas alone,
+                 cold build and warm map, synthetic skins of 10-1000 frames
+  animator       Animator.update_frame cost per tick; wakeups/min per state
+  face_detector  FaceDetector.process_frame ms/frame, synthetic and recorded
+  rewards        add_xp / complete_quest latency and write amplification
+  keystroke      Signals.on_key_press cost; monitor tick cost
+  mouse          mouse listener callback cost; ticks left after coalescing
+  ollama         OllamaReact.generate round trip and stream first token
+  simulation     one simulated 8 h workday through the behavior logic
+  metrics        cost of recording a counter, gauge or histogram value
+  calendar       .ics parse + expand, cached start, refresh, meeting lookups
+
+Each case runs --repeat times and keeps the best value of every metric.
+Each metric has a unit, a direction (lower or higher is better) and a
+tolerance; compare flags metrics that moved the wrong way by more than the
+tolerance (or --threshold when given) and exits non-zero if any did.
+The standalone bench_* scripts remain for before/after comparisons.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+QUICK = False
+DEFAULT_TOLERANCE = 0.25   # timings on a shared machine are noisy
+
+
+def metric(value, unit, better="lower", tolerance=DEFAULT_TOLERANCE):
+    return {"value": value, "unit": unit, "better": better, "tolerance": tolerance}
+
+
+def median_time(fn, repeat=5):
+    """Median wall time of fn() in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+# -------------------------------------------------
+# CASES
+# -------------------------------------------------
+def bench_skin_load(opts):
+    # Animator.load_all_frames is gone: skins now load lazily, one state at a
+    # time, via Animator._load_state → FrameCache → SkinAtlas. animator_*
+    # times that path to the first frame; cold_ms/warm_ms time load_atlas.
+    from benchmarks.bench_animator import FixedState
+    from benchmarks.bench_atlas import make_skin
+    from benchmarks.headless_tk import FakeRoot, patch_tk
+    patch_tk()
+    from core.animator import Animator
+    from core.frame_cache import FrameCache
+    from core.sprite_atlas import load_atlas
+
+    def first_frame(skins_dir, cache):
+        animator = Animator(FakeRoot(), FixedState("idle"),
+                            frame_cache=FrameCache(skins_dir=skins_dir, cache_dir=cache),
+                            skin="synthetic")
+        animator.update_frame()
+
+    results = {}
+    for frames in ([10, 100] if QUICK else [10, 100, 1000]):
+        root = tempfile.mkdtemp()
+        try:
+            skin = make_skin(root, frames)
+            with contextlib.redirect_stdout(io.StringIO()):
+                cache = os.path.join(root, "animator_cache")
+                start = time.perf_counter()
+                first_frame(root, cache)
+                cold = time.perf_counter() - start
+                warm = median_time(lambda: first_frame(root, cache))
+                results[f"animator_cold_ms[{frames}]"] = metric(cold * 1000, "ms")
+                results[f"animator_warm_ms[{frames}]"] = metric(warm * 1000, "ms")
+
+                cache = os.path.join(root, "cache")
+                start = time.perf_counter()
+                load_atlas(skin, cache)
+                cold = time.perf_counter() - start
+                warm = median_time(lambda: load_atlas(skin, cache))
+            results[f"cold_ms[{frames}]"] = metric(cold * 1000, "ms")
+            results[f"warm_ms[{frames}]"] = metric(warm * 1000, "ms")
+        finally:
+            shutil.rmtree(root)
+    return results
+
+
+def bench_animator(opts):
+    from benchmarks.bench_animator import FixedState
+    from benchmarks.headless_tk import FakeRoot, patch_tk
+    patch_tk()
+    from core.animator import Animator
+
+    results = {}
+    for state in ["idle", "focused", "happy", "pat", "sleeping"]:
+        root = FakeRoot()
+        animator = Animator(root, FixedState(state))
+        animator.update_frame()
+        root.run_for(60_000)
+        results[f"wakeups_per_min[{state}]"] = metric(animator.wakeups[state], "wakeups", tolerance=0)
+
+    # Per-tick cost on an animated state, the scheduled `after` dropped each time
+    root = FakeRoot()
+    animator = Animator(root, FixedState("focused"))
+    animator.update_frame()
+    ticks = 2000 if QUICK else 20_000
+    samples = []
+    for _ in range(ticks):
+        root.queue.clear()
+        start = time.perf_counter_ns()
+        animator.update_frame()
+        samples.append(time.perf_counter_ns() - start)
+    results["update_frame_ns_p50"] = metric(statistics.median(samples), "ns")
+    results["update_frame_ns_p99"] = metric(pct(samples, 0.99), "ns", tolerance=0.5)
+    return results
+
+
+def bench_face_detector(opts):
+    from benchmarks.bench_face_detector import synthetic_frames, video_frames
+    from core.face_detector import FaceDetector
+
+    def per_frame(frames):
+        detector = FaceDetector(None, None, None, enable_camera=False)
+        detector.process_frame(next(synthetic_frames(1)))   # cascades loaded
+        samples = []
+        for frame in frames:
+            start = time.perf_counter()
+            detector.process_frame(frame)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    samples = per_frame(synthetic_frames(40 if QUICK else 120))
+    results = {
+        "synthetic_ms_per_frame": metric(statistics.mean(samples) * 1000, "ms"),
+        "synthetic_ms_p95": metric(pct(samples, 0.95) * 1000, "ms", tolerance=0.5),
+    }
+    for path in opts.video or []:
+        samples = per_frame(video_frames(path))
+        if samples:
+            name = os.path.basename(path)
+            results[f"recorded_ms_per_frame[{name}]"] = metric(statistics.mean(samples) * 1000, "ms")
+    return results
+
+
+def bench_rewards(opts):
+    from rewards.rewards_manager import RewardsManager
+
+    def disk_bytes(folder):
+        return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+    calls = 200 if QUICK else 1000
+    root = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            rewards = RewardsManager(root)
+            rewards.flush()
+            writes, size = rewards.store.writes, disk_bytes(root)
+
+            xp, quests = [], []
+            for i in range(calls):
+                start = time.perf_counter()
+                rewards.add_xp(2)
+                xp.append(time.perf_counter() - start)
+                if i % 10 == 0:
+                    rewards.quests["25sec_focus"] = False
+                    start = time.perf_counter()
+                    rewards.complete_quest("25sec_focus")
+                    quests.append(time.perf_counter() - start)
+            rewards.flush()
+            transactions = rewards.store.writes - writes
+            written = disk_bytes(root) - size
+            rewards.store.engine.dispose()
+    finally:
+        shutil.rmtree(root)
+
+    updates = calls + len(quests)
+    return {
+        "add_xp_us_p50": metric(statistics.median(xp) * 1e6, "us"),
+        "add_xp_us_p99": metric(pct(xp, 0.99) * 1e6, "us", tolerance=0.5),
+        "complete_quest_us_p50": metric(statistics.median(quests) * 1e6, "us"),
+        # Debounced batches: transactions and bytes on disk per reward update
+        "transactions_per_1k_updates": metric(transactions * 1000 / updates, "tx", tolerance=1.0),
+        "disk_bytes_per_update": metric(max(0, written) / updates, "B", tolerance=0.5),
+    }
+
+
+def bench_keystroke(opts):
+    from benchmarks.bench_keystroke import make_signals
+    from core.signals import Signals
+
+    root = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            signals = make_signals(root)
+            signals.state_manager.set_state("focused")
+            keys = 20_000 if QUICK else 200_000
+            start = time.perf_counter_ns()
+            for _ in range(keys):
+                Signals.on_key_press(signals, None)
+            steady = (time.perf_counter_ns() - start) / keys
+
+            # First key after idle: the hook only records and sets wakeup
+            wake = []
+            for _ in range(200):
+                signals.state_manager.set_state("idle")
+                start = time.perf_counter_ns()
+                Signals.on_key_press(signals, None)
+                wake.append(time.perf_counter_ns() - start)
+                signals._process_activity(time.time())
+
+            ticks = []
+            for _ in range(1000):
+                start = time.perf_counter_ns()
+                signals._process_activity(time.time())
+                ticks.append(time.perf_counter_ns() - start)
+            signals.rewards.flush()
+            signals.rewards.store.engine.dispose()
+    finally:
+        shutil.rmtree(root)
+    return {
+        "on_key_press_ns": metric(steady, "ns"),
+        "on_key_press_wake_ns_p50": metric(statistics.median(wake), "ns"),
+        "monitor_tick_ns_p50": metric(statistics.median(ticks), "ns"),
+    }
+
+
+def bench_mouse(opts):
+    from core.activity import CoalescedActivity
+    from core.simulation import VirtualClock
+
+    mouse = CoalescedActivity()
+    touch = mouse.touch
+    calls = 100_000 if QUICK else 1_000_000
+    start = time.perf_counter_ns()
+    for i in range(calls):
+        touch(i, i)
+    cost = (time.perf_counter_ns() - start) / calls
+
+    # 60 s of a 500 events/s stream on a virtual clock
+    clock = VirtualClock()
+    mouse = CoalescedActivity(clock=clock)
+    for i in range(60 * 500):
+        clock.set(clock.start + i / 500)
+        mouse.touch(i, i)
+    return {
+        "mouse_touch_ns": metric(cost, "ns"),
+        "mouse_ticks_per_s_at_500hz": metric(mouse.ticks / 60, "ticks/s", tolerance=0),
+    }
+
+
+def bench_ollama(opts):
+    from ai.ollama_react import OllamaReact
+    from benchmarks.stub_ollama import start_server
+
+    prompt = "Say a cute, short 'welcome back' message under 6 words. Use emojis."
+    server, url = start_server(token_delay=0.001)
+    ollama = OllamaReact(host=url)
+    try:
+        ollama.generate(prompt)   # connection set up
+        rounds = 10 if QUICK else 40
+        generate, first = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            ollama.generate(prompt)
+            generate.append(time.perf_counter() - start)
+
+            # Read the stream to the end so the connection is reused
+            start, ttft = time.perf_counter(), None
+            for _ in ollama.stream(prompt):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            first.append(ttft)
+    finally:
+        ollama.close()
+        server.shutdown()
+    return {
+        "generate_ms_p50": metric(statistics.median(generate) * 1000, "ms"),
+        "generate_ms_p95": metric(pct(generate, 0.95) * 1000, "ms", tolerance=0.5),
+        "stream_first_token_ms_p50": metric(statistics.median(first) * 1000, "ms"),
+    }
+
+
+def bench_simulation(opts):
+    from benchmarks.bench_simulation import repeated_milestones
+    from core.simulation import simulate, workday_trace
+
+    events = workday_trace(1)
+    start = time.perf_counter()
+    results = simulate(events)
+    elapsed = time.perf_counter() - start
+    return {
+        "workday_ms": metric(elapsed * 1000, "ms"),
+        "workday_monitor_ticks": metric(results["monitor_ticks"], "ticks", tolerance=0),
+        "workday_state_changes": metric(len(results["timeline"]), "changes", tolerance=0),
+        "workday_repeated_milestones": metric(len(repeated_milestones(results)), "milestones",
+                                              tolerance=0),
+    }
+
+
+def bench_metrics(opts):
+    from core.metrics import Registry
+
+    metrics = Registry()
+    inc = metrics.counter("bench_total").inc
+    observe = metrics.histogram("bench_ms").observe
+    gauge = metrics.gauge("bench_gauge").set
+    calls = 100_000 if QUICK else 1_000_000
+    results = {}
+    for name, fn, arg in [("counter_inc_ns", inc, 1), ("histogram_observe_ns", observe, 7.5),
+                          ("gauge_set_ns", gauge, 3)]:
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            fn(arg)
+        results[name] = metric((time.perf_counter_ns() - start) / calls, "ns")
+    for _ in range(100):
+        metrics.histogram(f"bench_{_}_ms").observe(_)
+    results["snapshot_us"] = metric(median_time(metrics.snapshot) * 1e6, "us")
+    results["render_text_us"] = metric(median_time(metrics.render_text) * 1e6, "us")
+    return results
+
+
+def bench_calendar(opts):
+    from benchmarks.bench_calendar import make_ics
+    from core.calendar_index import Calendar
+
+    now = time.time()
+    root = tempfile.mkdtemp()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cal_dir, cache_dir = os.path.join(root, "calendars"), os.path.join(root, "cache")
+            os.makedirs(cal_dir)
+            with open(os.path.join(cal_dir, "shared.ics"), "w", encoding="utf-8") as f:
+                f.write(make_ics(100 if QUICK else 500, 0, now))
+            cold_cache = os.path.join(root, "cold")
+            cold = median_time(lambda: Calendar(directory=cal_dir, cache_dir=cold_cache).refresh(),
+                               repeat=1)
+            Calendar(directory=cal_dir, cache_dir=cache_dir).refresh()
+            warm = median_time(lambda: Calendar(directory=cal_dir, cache_dir=cache_dir).refresh())
+            calendar = Calendar(directory=cal_dir, cache_dir=cache_dir)
+            calendar.refresh()
+            unchanged = median_time(calendar.refresh)
+    finally:
+        shutil.rmtree(root)
+
+    times = [now + i * 37.0 for i in range(10_000)]
+    start = time.perf_counter_ns()
+    for t in times:
+        calendar.index.lookup(t)
+    lookup = (time.perf_counter_ns() - start) / len(times)
+    start = time.perf_counter_ns()
+    for t in times:
+        calendar.current(t)
+    current = (time.perf_counter_ns() - start) / len(times)
+    return {
+        "cold_load_ms": metric(cold * 1000, "ms"),
+        "cached_load_ms": metric(warm * 1000, "ms"),
+        "refresh_unchanged_us": metric(unchanged * 1e6, "us"),
+        "lookup_ns": metric(lookup, "ns"),
+        "current_ns": metric(current, "ns"),
+    }
+
+
+def bench_pets(opts):
+    from benchmarks.bench_pets import run
+
+    results = {}
+    one = run("shared", 1)
+    for count in (1, 10):
+        r = one if count == 1 else run("shared", count)
+        results[f"uss_mb[{count}]"] = metric(r["uss"] / 1024 / 1024, "MB", tolerance=0.1)
+        results[f"cpu_ms_per_min[{count}]"] = metric(r["cpu"] * 1000, "ms")
+        results[f"wakeups_per_min[{count}]"] = metric(r["wakeups"], "wakeups", tolerance=0)
+    return results
+
+
+CASES = {
+    "skin_load": bench_skin_load,
+    "animator": bench_animator,
+    "face_detector": bench_face_detector,
+    "rewards": bench_rewards,
+    "keystroke": bench_keystroke,
+    "mouse": bench_mouse,
+    "ollama": bench_ollama,
+    "simulation": bench_simulation,
+    "metrics": bench_metrics,
+    "calendar": bench_calendar,
+    "pets": bench_pets,
+}
+
+
+# -------------------------------------------------
+# RUN
+# -------------------------------------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def best_of(case, opts):
+    """Run a case opts.repeat times; keep each metric's best value.
+
+    On a busy machine noise only ever makes a run slower, so the best of a
+    few rounds is far more stable between runs than any single round.
+    """
+    best = case(opts)
+    for _ in range(opts.repeat - 1):
+        for key, m in case(opts).items():
+            kept = best.setdefault(key, m)
+            pick = min if m["better"] == "lower" else max
+            kept["value"] = pick(kept["value"], m["value"])
+    return best
+
+
+def run(opts):
+    global QUICK
+    QUICK = opts.quick
+    names = opts.only.split(",") if opts.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise SystemExit(f"Unknown case(s): {', '.join(unknown)} (have: {', '.join(CASES)})")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": QUICK,
+        "repeat": opts.repeat,
+        "metrics": {},
+        "errors": {},
+    }
+    for name in names:
+        start = time.perf_counter()
+        try:
+            results = best_of(CASES[name], opts)
+        except Exception as e:
+            # A missing optional piece (cv2, a codec) shouldn't sink the whole run
+            print(f"{name:<14} FAILED: {e!r}")
+            report["errors"][name] = repr(e)
+            continue
+        print(f"{name:<14} ({time.perf_counter() - start:.1f} s)")
+        for key, m in results.items():
+            report["metrics"][f"{name}.{key}"] = m
+            print(f"  {key:<34} {m['value']:12.2f} {m['unit']}")
+
+    if opts.json:
+        with open(opts.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {opts.json}")
+    return 1 if report["errors"] else 0
+
+
+# -------------------------------------------------
+# COMPARE
+# -------------------------------------------------
+def compare(opts):
+    with open(opts.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(opts.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"base {base.get('commit') or '?'} ({base.get('created')})  "
+          f"new {new.get('commit') or '?'} ({new.get('created')})")
+    if base.get("quick") != new.get("quick"):
+        print("  warning: comparing a --quick run with a full one; sizes and rounds differ")
+    regressions = 0
+    for name in sorted(set(base["metrics"]) | set(new["metrics"])):
+        old, cur = base["metrics"].get(name), new["metrics"].get(name)
+        if old is None or cur is None:
+            print(f"  {name:<48} {'only in ' + ('new' if old is None else 'base'):>30}")
+            continue
+
+        tolerance = opts.threshold if opts.threshold is not None else cur.get("tolerance", DEFAULT_TOLERANCE)
+        if old["value"]:
+            change = (cur["value"] - old["value"]) / abs(old["value"])
+        else:
+            change = 0.0 if not cur["value"] else float("inf")
+        worse = change if cur.get("better", "lower") == "lower" else -change
+
+        verdict = ""
+        if worse > tolerance:
+            verdict = "REGRESSION"
+            regressions += 1
+        elif worse < -tolerance:
+            verdict = "improved"
+        print(f"  {name:<48} {old['value']:12.2f} → {cur['value']:12.2f} {cur['unit']:<7} "
+              f"{change * 100:+7.1f}%  {verdict}")
+
+    for name, error in new.get("errors", {}).items():
+        print(f"  {name}: failed in new run: {error}")
+        regressions += 1
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run or compare the benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--json", help="write results to this file")
+    run_parser.add_argument("--only", help=f"comma-separated cases ({', '.join(CASES)})")
+    run_parser.add_argument("--quick", action="store_true", help="smaller sizes, fewer rounds")
+    run_parser.add_argument("--video", action="append", help="recorded clip for face_detector")
+    run_parser.add_argument("--repeat", type=int, default=3, help="rounds per case; best is kept")
+
+    compare_parser = sub.add_parser("compare", help="flag regressions between two runs")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float,
+                                help="allowed relative slowdown for every metric (default: per metric)")
+
+    opts = parser.parse_args(argv)
+    return run(opts) if opts.command == "run" else compare(opts)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,144 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-SKIN_PATH = os.path.join(BASE_DIR, "skins", "default")
+SKINS_DIR = os.path.join(BASE_DIR, "skins")
+DEFAULT_SKIN = "default"
+SKIN_PATH = os.path.join(SKINS_DIR, DEFAULT_SKIN)
 
-FPS = 80  # Animation speed in ms
+FPS = 80  # Default frame duration in ms (skins can override per state/frame)
+HAPPY_DURATION = 4  # seconds a happy reaction lasts
+PAT_DURATION = 1.2  # seconds a pat reaction lasts
+SPRITE_SIZE = (64, 64)  # Frames are pre-scaled to this size
+
+# Packed, pre-scaled skin atlases (rebuilt when a skin folder changes)
+ATLAS_CACHE_DIR = os.path.join(BASE_DIR, "cache", "atlas")
+FRAME_CACHE_BYTES = 8 * 1024 * 1024  # decoded frames kept across all skins
+
+# --- Ollama ---
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")
+OLLAMA_MODEL = "llama3.2:1b"
+# Make sure to update this path to yours (used only when the HTTP API is down)
+OLLAMA_PATH = r"C:\Users\GSPL\AppData\Local\Programs\Ollama\ollama.exe"
+OLLAMA_KEEP_ALIVE = "30m"       # keep the model loaded between lines
+OLLAMA_CONNECT_TIMEOUT = 2      # seconds
+OLLAMA_READ_TIMEOUT = 60        # seconds between streamed chunks
+OLLAMA_HTTP_RETRY = 30          # seconds to wait before retrying HTTP after a failure
+
+# --- Pre-generated speech lines ---
+RESPONSE_POOL_FILE = os.path.join(BASE_DIR, "data", "response_pool.json")
+RESPONSE_POOL_SIZE = 5          # variants kept per prompt
+RESPONSE_POOL_TTL = 6 * 3600    # seconds before a variant goes stale
+RESPONSE_POOL_MAX_USES = 3      # times a variant is shown before it is replaced
+
+# --- AI job queue ---
+AI_MAX_WORKERS = 2              # concurrent LLM calls (background refills use at most one fewer)
+AI_MAX_PENDING = 16             # queued jobs before the least important is dropped
+SMILE_COOLDOWN = 3              # seconds between smile reactions
+
+# --- Face detection ---
+DETECT_WIDTH = 320              # frames are downscaled to this width for face search
+FULL_SCAN_EVERY = 10            # while tracking, rescan the whole frame every N frames
+ROI_PADDING = 0.5               # tracked search box grows by this fraction of the face
+SMILE_EVERY = 2                 # run the smile cascade on every Nth frame with a face
+VISION_PROCESS = False          # run face detection in a child process (frames via shared memory)
+VISION_TIMEOUT = 5              # seconds to wait for the child before restarting it
+VISION_STOP_WAIT = 0.5          # seconds stop() waits for the camera thread; it then finishes alone
+
+# --- Camera duty cycle (seconds) ---
+CAMERA_INDEX = 0
+CAMERA_INTERVALS = {"sleeping": 5.0, "idle": 2.0, "default": 1.0}  # no face, by pet state
+FACE_PRESENT_INTERVAL = 0.8
+FACE_LOST_INTERVAL = 0.3        # sample fast right after the face disappears...
+FACE_LOST_WINDOW = 15           # ...for this long
+CAMERA_RELEASE_AFTER = 300      # no face this long → release the camera
+CAMERA_PROBE_INTERVAL = 30      # while released, reopen this often to look again
+READ_BACKOFF_MIN = 0.1          # failed reads back off exponentially
+READ_BACKOFF_MAX = 10
+
+# --- Persistence ---
+DATA_DIR = os.path.join(BASE_DIR, "data")
+REWARDS_DB = "rewards.db"       # event log + totals, inside DATA_DIR
+SAVE_DEBOUNCE = 2.0             # seconds; reward updates within this window share one write
+
+# --- Keyboard & mouse activity ---
+ACTIVITY_RING_SIZE = 4096       # keystroke timestamps kept for rate metrics
+BURST_WINDOW = 5                # seconds; typing rate over this window...
+BURST_KPM = 300                 # ...at or above this many keys/min is a burst
+MOUSE_ACTIVITY = True           # moves, clicks and scrolls count as activity too
+MOUSE_TICK_INTERVAL = 0.25      # seconds; raw mouse events coalesce into at most one tick per interval
+MOUSE_RING_SIZE = 256           # coalesced mouse ticks kept
+MOUSE_RETURN_TICKS = 6          # while idle/asleep, this many mouse ticks...
+MOUSE_RETURN_WINDOW = 4.0       # ...within this many seconds count as coming back (keys always do)
+
+# --- Focus engine ---
+IDLE_AFTER = 20                 # seconds without input before idle
+SLEEP_AFTER = 120               # seconds without input before sleeping
+# Granted once per focus session when focused time reaches `after` seconds.
+# Optional: xp, streak, quest (id), state (e.g. "happy"), prompt (PROMPTS key,
+# defaults to id). Pomodoros: {"id": "pomodoro_25", "after": 25 * 60, ...}
+FOCUS_MILESTONES = [
+    {"id": "focus_25", "after": 25, "xp": 5, "quest": "25sec_focus"},
+    {"id": "focus_60", "after": 60, "xp": 10, "streak": 1, "quest": "1min_focus",
+     "state": "happy"},
+]
+
+# --- UI dispatch (background threads → Tk thread) ---
+UI_PUMP_INTERVAL = 16           # ms between pump ticks while commands are flowing
+UI_PUMP_IDLE = 250              # ms; the pump backs off to this when quiet
+UI_PUMP_BUDGET = 8              # ms of queued UI work per tick before yielding to Tk
+
+# --- Chat window ---
+CHAT_SCROLLBACK = 200           # messages kept in the chat widget; older ones are trimmed
+CHAT_TRANSCRIPT = "chat_transcript.txt"   # full chat log, inside DATA_DIR
+
+# --- Chat memory ---
+CHAT_HISTORY = "chat_history.json"   # summary, recent turns and model context, inside DATA_DIR
+CHAT_TOKEN_BUDGET = 1024        # est. tokens of summary + turns when a prompt is rebuilt
+CHAT_KEEP_TURNS = 6             # newest turns (3 exchanges) never folded into the summary
+CHAT_CONTEXT_MAX = 4096         # past this many context tokens, rebuild from the summary
+
+# --- Startup ---
+STARTUP_TARGET = 0.5            # seconds from launch to the first idle frame on screen
+
+# --- Metrics & diagnostics ---
+METRICS_PORT = 9477             # local-only /metrics endpoint (127.0.0.1); None disables it
+METRICS_DUMP = "metrics.jsonl"  # periodic snapshots, inside DATA_DIR
+METRICS_DUMP_INTERVAL = 60      # seconds between snapshots
+METRICS_DUMP_MAX_BYTES = 5_000_000   # then rotated to metrics.jsonl.1
+DEBUG_OVERLAY_KEY = "<F12>"     # toggles the diagnostics overlay on the pet window
+DEBUG_OVERLAY_REFRESH = 500     # ms between overlay refreshes while shown
+
+# --- Power / load governor ---
+POWER_PROFILE = None            # "full", "balanced" or "saver" to pin one; None = automatic
+# Per profile: min_frame_ms (animation frames held at least this long),
+# camera_scale (multiplies camera sampling intervals), smile_every (smile
+# cascade on every Nth face frame), llm_ambient (False = ambient lines come
+# from the pre-generated pool or canned text; no new generations)
+POWER_PROFILES = {
+    "full": {"min_frame_ms": 0, "camera_scale": 1.0, "smile_every": SMILE_EVERY, "llm_ambient": True},
+    "balanced": {"min_frame_ms": 120, "camera_scale": 2.0, "smile_every": SMILE_EVERY * 2,
+                 "llm_ambient": True},
+    "saver": {"min_frame_ms": 250, "camera_scale": 4.0, "smile_every": SMILE_EVERY * 4,
+              "llm_ambient": False},
+}
+GOVERNOR_INTERVAL = 10          # seconds between sensor samples
+GOVERNOR_CPU = (60, 85)         # system CPU % that calls for balanced, saver
+GOVERNOR_MEMORY = (85, 95)      # memory use % that calls for balanced, saver
+GOVERNOR_BATTERY_LOW = 25       # on battery: balanced; at or below this %: saver
+GOVERNOR_MARGIN = 10            # points a reading must drop below a threshold to clear it
+GOVERNOR_RELAX = 3              # samples in a row that allow a lighter profile before stepping down
+
+# --- Calendar (local .ics files) ---
+CALENDAR_DIR = os.path.join(DATA_DIR, "calendars")   # every *.ics in here is read
+CALENDAR_FILES = []             # extra .ics paths anywhere on disk
+CALENDAR_CACHE_DIR = os.path.join(BASE_DIR, "cache", "calendar")   # expanded occurrences per file
+CALENDAR_PAST_DAYS = 1          # recurring events are expanded from midnight this many days back...
+CALENDAR_AHEAD_DAYS = 14        # ...to this many days ahead; the window rolls forward daily
+CALENDAR_REFRESH = 60           # seconds between checks for new or changed files
+CALENDAR_QUIET = True           # no speech and no LLM work during meetings
+
+# --- Pets ---
+# One window per entry, each with its own state, skin and position ("x", "y"
+# in screen pixels; default: side by side). main.py --pets N repeats the list.
+PETS = [{"skin": DEFAULT_SKIN}]
+RENDER_SLACK_MS = 15            # pet frames due within this many ms redraw in one Tk tick
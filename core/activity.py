@@ -0,0 +1,77 @@
+import bisect
+import time
+from collections import deque
+
+from config import ACTIVITY_RING_SIZE, MOUSE_RING_SIZE, MOUSE_TICK_INTERVAL
+
+
+class ActivityRing:
+    """Bounded ring of input timestamps.
+
+    append(timestamp) is the only thing the OS input hook does: a bound
+    deque.append, which is a single C call, atomic under the GIL and never
+    allocates a new buffer. Readers (the monitor thread) bisect the sorted
+    timestamps without copying them.
+    """
+
+    def __init__(self, size=ACTIVITY_RING_SIZE):
+        self.times = deque(maxlen=size)
+        self.append = self.times.append
+
+    def last_time(self):
+        try:
+            return self.times[-1]
+        except IndexError:
+            return 0.0
+
+    def count_since(self, since):
+        """Number of events with timestamp >= since (bounded by the ring size)."""
+        # Timestamps are appended in order, so bisect instead of copying the
+        # ring; a concurrent append can shift the answer by a key, no more
+        times = self.times
+        return len(times) - bisect.bisect_left(times, since)
+
+    def count_after(self, since):
+        """Number of events with timestamp > since."""
+        times = self.times
+        return len(times) - bisect.bisect_right(times, since)
+
+    def per_minute(self, window, now=None):
+        """Event rate over the last `window` seconds, scaled to events/minute."""
+        now = now if now is not None else time.time()
+        return self.count_since(now - window) * 60.0 / window
+
+
+class CoalescedActivity:
+    """Throttles a high-rate input stream (mouse moves) into activity ticks.
+
+    touch() is the listener callback for moves, clicks and scrolls alike
+    (it ignores its arguments). It reads the clock and compares it against
+    the next tick time; only when the interval has passed does it append a
+    tick to the ring and call on_tick. Hundreds of moves a second become at
+    most 1/interval ticks, and the last tick is never more than `interval`
+    older than the last real event.
+    """
+
+    def __init__(self, interval=MOUSE_TICK_INTERVAL, size=MOUSE_RING_SIZE, clock=time, on_tick=None):
+        self.ring = ActivityRing(size)
+        self.interval = interval
+        self.now = clock.time
+        self.on_tick = on_tick
+        self.next_tick = 0.0
+        self.events = 0   # raw callbacks and ticks emitted, for diagnostics
+        self.ticks = 0
+
+    def touch(self, *args):
+        self.events += 1
+        now = self.now()
+        if now < self.next_tick:
+            return
+        self.next_tick = now + self.interval
+        self.ring.append(now)
+        self.ticks += 1
+        if self.on_tick is not None:
+            self.on_tick()
+
+    def last_time(self):
+        return self.ring.last_time()
@@ -1,12 +1,28 @@
-import os
 import tkinter as tk
-from PIL import Image, ImageTk
-from config import SKIN_PATH, FPS
+from collections import Counter
+from config import DEFAULT_SKIN
+from core.frame_cache import FrameCache
+from core.metrics import registry
+from core.render_clock import TkTimer
+
+# Likely next states, decoded ahead of time while Tk is idle
+NEXT_STATES = {
+    "idle": ["sleeping", "focused"],
+    "focused": ["happy", "idle"],
+    "happy": ["idle"],
+    "sleeping": ["focused"],
+}
+
 
 class Animator:
-    def __init__(self, root, state_manager):
+    def __init__(self, root, state_manager, frame_cache=None, skin=DEFAULT_SKIN, ui=None,
+                 clock=None, name=None):
         self.root = root
         self.state_manager = state_manager
+        self.frame_cache = frame_cache or FrameCache()
+        self.skin = skin
+        # Frame timers: own `after`s, or a RenderClock shared by several pets
+        self.clock = clock or TkTimer(root)
 
         # Pet display label
         self.label = tk.Label(root, bg="white", bd=0, highlightthickness=0)
@@ -15,38 +31,110 @@ class Animator:
         # Bind click → pat reaction
         self.label.bind("<Button-1>", self.on_click)
 
-        self.animations = self.load_all_frames()
+        self.frames = []
+        self.durations = []
         self.frame_index = 0
         self.prev_state = None
+        self.shown = None        # image currently on the label
+        self.after_id = None
+        self.hidden = False
+        self.wakeups = Counter() # ticks per state, for profiling
+        self.min_frame_ms = 0    # frames are held at least this long (power governor)
+        registry.gauge("animator_ticks", "Render clock wakeups since start",
+                       fn=lambda: sum(self.wakeups.values()), **({"pet": name} if name else {}))
+        registry.gauge("frame_cache_misses", "Skin states decoded into Tk images",
+                       fn=lambda: self.frame_cache.misses)
+
+        # Hidden window → stop ticking until it is shown again
+        self.root.bind("<Unmap>", self.on_unmap, add="+")
+        self.root.bind("<Map>", self.on_map, add="+")
+
+        # State changes are pushed from other threads; hop onto the Tk thread to redraw
+        if ui is not None:
+            key = ("animator_wake", id(self))
+            self.state_manager.subscribe(lambda old, new: ui.post(self.wake, key=key))
+        else:
+            self.state_manager.subscribe(lambda old, new: self.root.after(0, self.wake))
+
+    def set_skin(self, skin):
+        """Switch skin live; frames are decoded lazily on the next tick."""
+        if skin == self.skin:
+            return
+        if not self.frame_cache.durations(skin, "idle"):
+            print(f"[SKIN] {skin} has no idle frames, keeping {self.skin}")
+            return
+        self.skin = skin
+        self.prev_state = None
+        print(f"[SKIN] → {skin}")
+        self.wake()
 
-    def load_all_frames(self):
-        animations = {}
-        
-        for state_name in os.listdir(SKIN_PATH):
-            state_folder = os.path.join(SKIN_PATH, state_name)
-            if os.path.isdir(state_folder):
-                frames = []
-                for file in sorted(os.listdir(state_folder)):
-                    if file.endswith(".png"):
-                        img = Image.open(os.path.join(state_folder, file))
-                        img = img.resize((64, 64), Image.NEAREST)  # keep pixel crisp
-                        frames.append(ImageTk.PhotoImage(img))
-                animations[state_name] = frames
-        return animations
-        
-    def update_frame(self):
+    def _load_state(self, state):
+        if not self.frame_cache.durations(self.skin, state):
+            state = "idle"
+        if not self.frame_cache.durations(self.skin, state) and self.skin != DEFAULT_SKIN:
+            # Not even idle (e.g. a broken skin from config): use the default skin
+            print(f"[SKIN] {self.skin} has no idle frames, using {DEFAULT_SKIN}")
+            self.skin = DEFAULT_SKIN
+            return self._load_state(state)
+        frames = self.frame_cache.get(self.skin, state)
+        self.durations = self.frame_cache.durations(self.skin, state)
+        self.root.after_idle(self.frame_cache.prefetch, self.skin, NEXT_STATES.get(state, []))
+        return frames
+
+    # -------------------------------------------------
+    # RENDER CLOCK
+    # -------------------------------------------------
+    def update_frame(self, advance=True):
+        self.after_id = None
         state = self.state_manager.get_state()
+        self.wakeups[state] += 1
 
         # If state changed → restart animation
         if state != self.prev_state:
             self.frame_index = 0
+            self.frames = self._load_state(state)
+        elif advance and len(self.frames) > 1:
+            self.frame_index = (self.frame_index + 1) % len(self.frames)
         self.prev_state = state
+        if not self.frames:
+            return  # the default skin itself has nothing to show
+
+        # Skip the redraw when the image is unchanged
+        image = self.frames[self.frame_index]
+        if image is not self.shown:
+            self.label.config(image=image)
+            self.shown = image
+
+        if self.hidden:
+            return
+
+        # Still frame → sleep until a state change wakes us
+        if len(self.frames) > 1:
+            delay = max(self.durations[self.frame_index], self.min_frame_ms)
+            self.after_id = self.clock.call_later(delay, self.update_frame)
+
+    def wake(self):
+        """Redraw now (e.g. after a state change) instead of waiting for the next tick."""
+        if self.after_id is not None:
+            self.clock.cancel(self.after_id)
+            self.after_id = None
+        self.update_frame(advance=False)
+
+    def set_min_frame(self, ms):
+        """Cap the animation rate; takes effect from the next frame."""
+        self.min_frame_ms = ms
 
-        frames = self.animations[state]
-        self.label.config(image=frames[self.frame_index])
-        self.frame_index = (self.frame_index + 1) % len(frames)
+    def on_unmap(self, event):
+        if event.widget is self.root:
+            self.hidden = True
+            if self.after_id is not None:
+                self.clock.cancel(self.after_id)
+                self.after_id = None
 
-        self.root.after(FPS, self.update_frame)
+    def on_map(self, event):
+        if event.widget is self.root and self.hidden:
+            self.hidden = False
+            self.wake()
 
     def on_click(self, event):
         # Trigger pat animation + speech bubble
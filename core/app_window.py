@@ -1,54 +1,137 @@
+import os
 import tkinter as tk
-import ttkbootstrap as ttk
-from core.animator import Animator
-from core.state_manager import StateManager
+from core.debug_overlay import DebugOverlay
+from core.frame_cache import FrameCache
+from core.pets import PET_WIDTH, Pet, PetGroup
+from core.render_clock import RenderClock
+from core.scheduler import Scheduler
 from core.signals import Signals
-from core.speech_bubble import SpeechBubble
-from core.chat_window import ChatWindow
+from core.startup import StartupProfiler, run_stages
+from core.ui_queue import UIQueue
+from config import DATA_DIR, DEFAULT_SKIN, METRICS_DUMP, METRICS_PORT, PETS
 
 
 class AppWindow:
-    def __init__(self):
-        self.root = ttk.Window(themename="cosmo")
-        self.root.title("Desk Pet")
-        self.root.geometry("150x170") 
+    def __init__(self, profiler=None, profile=False, pets=None):
+        # Only what the first frame needs runs here; the rest is staged
+        # in the background once the window is on screen
+        self.profiler = profiler or StartupProfiler()
+        self.profile = profile  # print the startup report and exit
+        self.stages_started = False
 
-        # --- Core Systems ---
-        self.state_manager = StateManager()
-        self.state_manager.app_ref = self
+        with self.profiler.stage("window"):
+            self.root = tk.Tk()
 
-        self.animator = Animator(self.root, self.state_manager)
-        self.speech = SpeechBubble(self.root)
-        self.signals = Signals(self.state_manager)
+        with self.profiler.stage("pet"):
+            # --- Core Systems ---
+            # Background threads post UI work here; it runs on the Tk thread
+            self.ui = UIQueue(self.root).start()
 
-        # --- Chat Window (NEW) ---
+            # Shared by every pet: decoded frames, the frame timer and the
+            # thread that ends pat/happy reactions
+            self.frame_cache = FrameCache()
+            self.render_clock = RenderClock(self.root)
+            self.scheduler = Scheduler().start()
+
+            specs = pets or PETS
+            self.pets = []
+            for i, spec in enumerate(specs):
+                window = self.root if i == 0 else tk.Toplevel(self.root)
+                x, y = spec.get("x"), spec.get("y")
+                if x is None and len(specs) > 1:
+                    x, y = 60 + i * (PET_WIDTH + 10), 60   # side by side
+                self.pets.append(Pet(self, window, skin=spec.get("skin", DEFAULT_SKIN), x=x, y=y,
+                                     name=f"pet{i + 1}" if i else None))
+
+                # Shortcut: Ctrl + C → Open Chat
+                window.bind("<Control-c>", lambda e: self.chat and self.chat.open())
+                window.bind("<Control-C>", lambda e: self.chat and self.chat.open())
+
+            # The first pet is "the" pet for chat replies and diagnostics
+            self.state_manager = self.pets[0].state_manager
+            self.animator = self.pets[0].animator
+            self.speech = self.pets[0].speech
+
+            # One set of signals (input, camera, LLM) drives every pet
+            self.signals = Signals(PetGroup(self.pets))  # nothing started yet
+
+            # Diagnostics: hidden until DEBUG_OVERLAY_KEY
+            self.overlay = DebugOverlay(self.root, self.state_manager)
+
+        # --- Chat Window (created once the LLM stage is up) ---
+        self.chat = None
+
+    # -------------------------------------------------
+    # STAGED STARTUP
+    # -------------------------------------------------
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self._start_stages()
+
+    def _start_stages(self):
+        if self.stages_started:
+            return
+        self.stages_started = True
+        first = self.profiler.mark("first_frame")
+        print(f"[STARTUP] First frame after {first * 1000:.0f} ms")
+
+        stages = self.signals.stages()
+        names = [name for name, _ in stages]
+        stages.insert(names.index("llm") + 1, ("chat", self._create_chat))
+        stages.append(("power", self._follow_power))
+        stages.append(("theme", self._load_theme))
+        stages.append(("metrics", self._start_metrics))
+        run_stages(stages, self.profiler, on_done=self._stages_done)
+
+    def _create_chat(self):
+        from core.chat_window import ChatWindow
         self.chat = ChatWindow(
             root=self.root,
             ollama=self.signals.ollama,
+            ai_queue=self.signals.ai_queue,
+            ui=self.ui,
             speech=self.speech
         )
 
-        # Shortcut: Ctrl + C → Open Chat
-        self.root.bind("<Control-c>", lambda e: self.chat.open())
-        self.root.bind("<Control-C>", lambda e: self.chat.open())
+    def _follow_power(self):
+        # Animation rate follows the power profile; applied on the Tk thread
+        self.signals.governor.subscribe(
+            lambda name, profile: self.ui.post(self._set_min_frame, profile["min_frame_ms"], key="power")
+        )
+
+    def _set_min_frame(self, ms):
+        for pet in self.pets:
+            pet.animator.set_min_frame(ms)
+
+    def _load_theme(self):
+        # Import off the Tk thread; the style itself must be applied on it
+        import ttkbootstrap as ttk
+        self.ui.post(lambda: ttk.Style(theme="cosmo"))
 
-        # --- Window Behavior ---
-        self.root.attributes("-topmost", True)  
-        self.root.overrideredirect(True)  
-              
-        # Draggable frameless window
-        self.root.bind("<ButtonPress-1>", self.start_move)
-        self.root.bind("<B1-Motion>", self.do_move)
+    def _start_metrics(self):
+        from core.metrics import MetricsDump, serve
+        self.metrics_dump = MetricsDump(os.path.join(DATA_DIR, METRICS_DUMP)).start()
+        if METRICS_PORT:
+            try:
+                serve(METRICS_PORT)
+            except OSError as e:
+                print(f"[METRICS] Port {METRICS_PORT} unavailable:", e)
 
-    # Draggable frameless window handlers
-    def start_move(self, event):
-        self.x = event.x
-        self.y = event.y
+    def _stages_done(self):
+        print(f"[STARTUP] Ready after {self.profiler.mark('ready') * 1000:.0f} ms")
+        if self.profile:
+            self.ui.post(self._finish_profile)
 
-    def do_move(self, event):
-        self.root.geometry(f"+{event.x_root - self.x}+{event.y_root - self.y}")
+    def _finish_profile(self):
+        self.profiler.uninstall()
+        self.profiler.report()
+        self.signals.stop()
+        self.root.destroy()
 
     # Run Main Loop
     def run(self):
-        self.animator.update_frame()
+        for pet in self.pets:
+            pet.animator.update_frame()
+        self.root.bind("<Map>", self._on_map, add="+")
+        self.root.after(1000, self._start_stages)  # in case <Map> never arrives
         self.root.mainloop()
@@ -0,0 +1,451 @@
+"""Meetings from local .ics calendars, expanded into an interval index.
+
+    python -m core.calendar_index [file.ics ...] [--at 2024-01-08T10:00]
+
+Every *.ics in CALENDAR_DIR (plus CALENDAR_FILES) is parsed with icalendar
+and its events are expanded (RRULE, RDATE, EXDATE and RECURRENCE-ID
+overrides, via dateutil) over a rolling window of CALENDAR_PAST_DAYS back
+to CALENDAR_AHEAD_DAYS ahead of today's midnight. Only busy, timed events
+count: all-day, cancelled and free (TRANSP:TRANSPARENT) events are skipped.
+
+Each file's occurrences are cached in CALENDAR_CACHE_DIR under a key of
+its content hash and the window. A refresh stats the files, hashes only
+those whose size or mtime moved, and re-parses only those whose content
+changed (or all of them once a day, when the window rolls). Daily and
+weekly rules without COUNT start their expansion at the window instead of
+at DTSTART, so a standup that began years ago costs the same as one that
+began last week.
+
+Lookups run on the Signals monitor thread: IntervalIndex answers "what is
+on at t", "when does that change" and "what is next" by bisect, and
+Calendar.current() keeps the answer until that change, so most calls are
+one comparison.
+"""
+import argparse
+import bisect
+import glob
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from config import (
+    CALENDAR_AHEAD_DAYS, CALENDAR_CACHE_DIR, CALENDAR_DIR, CALENDAR_FILES, CALENDAR_PAST_DAYS,
+    CALENDAR_REFRESH,
+)
+from core.metrics import registry
+
+CALENDAR_VERSION = 1
+LONG_EVENT = 4 * 3600   # seconds; longer occurrences are kept in a short side list
+
+# Rules that can start expanding at the window: days per period
+SKIP_PERIOD_DAYS = {"DAILY": 1, "WEEKLY": 7}
+
+
+# -------------------------------------------------
+# INTERVAL INDEX
+# -------------------------------------------------
+class IntervalIndex:
+    """Occurrences (start, end, title) in epoch seconds, queried by bisect.
+
+    A sweep over every start and end cuts the timeline into segments over
+    which the meeting on (the earliest started of those running) stays the
+    same, so lookup() is one bisect however many meetings overlap. at()
+    lists every overlapping occurrence: those up to LONG_EVENT long are
+    bisected by start, longer ones (conferences, offsites) are few and
+    scanned in full.
+    """
+
+    def __init__(self, occurrences=()):
+        occurrences = sorted(tuple(o) for o in occurrences)
+        self.short = [o for o in occurrences if o[1] - o[0] <= LONG_EVENT]
+        self.long = [o for o in occurrences if o[1] - o[0] > LONG_EVENT]
+        self.starts = [o[0] for o in self.short]
+        self.long_starts = [o[0] for o in self.long]
+
+        self.cuts, self.segments = [], []
+        running, i = [], 0
+        for t in sorted({t for o in occurrences for t in o[:2]}):
+            while i < len(occurrences) and occurrences[i][0] <= t:
+                heapq.heappush(running, occurrences[i])
+                i += 1
+            while running and running[0][1] <= t:
+                heapq.heappop(running)
+            on = running[0] if running else None
+            if not self.segments or on != self.segments[-1]:
+                self.cuts.append(t)
+                self.segments.append(on)
+
+    def __len__(self):
+        return len(self.short) + len(self.long)
+
+    def lookup(self, t):
+        """(meeting on at t or None, next time that can change or None)."""
+        i = bisect.bisect_right(self.cuts, t)
+        return (self.segments[i - 1] if i else None,
+                self.cuts[i] if i < len(self.cuts) else None)
+
+    def at(self, t):
+        """Every occurrence with start <= t < end, earliest start first."""
+        hi = bisect.bisect_right(self.starts, t)
+        lo = bisect.bisect_left(self.starts, t - LONG_EVENT, 0, hi)
+        hits = [o for o in self.short[lo:hi] if o[1] > t]
+        if self.long:
+            hits.extend(o for o in self.long if o[0] <= t < o[1])
+            hits.sort()
+        return hits
+
+    def next_after(self, t):
+        """First occurrence starting after t, or None."""
+        candidates = []
+        i = bisect.bisect_right(self.starts, t)
+        if i < len(self.short):
+            candidates.append(self.short[i])
+        i = bisect.bisect_right(self.long_starts, t)
+        if i < len(self.long):
+            candidates.append(self.long[i])
+        return min(candidates) if candidates else None
+
+
+# -------------------------------------------------
+# PARSING & EXPANSION
+# -------------------------------------------------
+def _like(value, like, end_of_day=False):
+    """value (a date or datetime) as a datetime with the same awareness/zone as `like`."""
+    if not isinstance(value, datetime):
+        clock = datetime.max.time() if end_of_day else like.time()
+        value = datetime.combine(value, clock)
+    if like.tzinfo is None:
+        return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+    if value.tzinfo is None:
+        return value.replace(tzinfo=like.tzinfo)
+    return value.astimezone(like.tzinfo)
+
+
+def _at(ts, like):
+    """Epoch seconds as a datetime in the zone (or floating local time) of `like`."""
+    if like.tzinfo is None:
+        return datetime.fromtimestamp(ts)
+    return datetime.fromtimestamp(ts, tz=like.tzinfo)
+
+
+def _ts(value, like):
+    return round(_like(value, like).timestamp())
+
+
+def _values(component, name):
+    """Dates of a multi-valued property (EXDATE, RDATE), however it was split."""
+    prop = component.get(name)
+    if prop is None:
+        return []
+    props = prop if isinstance(prop, list) else [prop]
+    # PERIOD values (start, end) in RDATE are taken by their start
+    return [d.dt[0] if isinstance(d.dt, tuple) else d.dt for p in props for d in p.dts]
+
+
+def _rules(component, dtstart, lo_dt, skip_ahead=True):
+    from dateutil.rrule import rrulestr
+    from icalendar import vRecur
+
+    prop = component.get("RRULE")
+    if prop is None:
+        return []
+    rules = []
+    for recur in prop if isinstance(prop, list) else [prop]:
+        recur = vRecur(recur)
+        if "UNTIL" in recur:
+            until = _like(recur["UNTIL"][0], dtstart, end_of_day=True)
+            # dateutil wants UNTIL in UTC when DTSTART is zoned
+            if until.tzinfo is not None:
+                until = until.astimezone(timezone.utc)
+            recur["UNTIL"] = [until]
+        start = dtstart
+        period = SKIP_PERIOD_DAYS.get(recur.get("FREQ", [""])[0])
+        if skip_ahead and period and "COUNT" not in recur and "BYSETPOS" not in recur:
+            # Whole periods keep the rule's phase (weekday, every-other-week);
+            # wall-clock date arithmetic keeps the local time across DST
+            step = period * int(recur.get("INTERVAL", [1])[0])
+            periods = (lo_dt.date() - dtstart.date()).days // step - 1
+            if periods > 0:
+                start = dtstart + timedelta(days=periods * step)
+        rules.append(rrulestr(recur.to_ical().decode(), dtstart=start))
+    return rules
+
+
+def _busy(component):
+    return (str(component.get("STATUS", "")).upper() != "CANCELLED"
+            and str(component.get("TRANSP", "")).upper() != "TRANSPARENT")
+
+
+def _span(component):
+    """(dtstart, duration seconds) of a timed event, or None for all-day/empty ones."""
+    if component.get("DTSTART") is None:
+        return None
+    dtstart = component.decoded("DTSTART")
+    if not isinstance(dtstart, datetime):
+        return None
+    if component.get("DTEND") is not None:
+        duration = _like(component.decoded("DTEND"), dtstart).timestamp() - dtstart.timestamp()
+    elif component.get("DURATION") is not None:
+        duration = component.decoded("DURATION").total_seconds()
+    else:
+        return None
+    return (dtstart, round(duration)) if duration > 0 else None
+
+
+def expand(calendar, lo, hi, skip_ahead=True):
+    """Busy occurrences [start, end, title] of a parsed VCALENDAR overlapping [lo, hi)."""
+    events, overrides = [], {}
+    for component in calendar.walk("VEVENT"):
+        if component.get("RECURRENCE-ID") is not None:
+            overrides.setdefault(str(component.get("UID", "")), []).append(component)
+        else:
+            events.append(component)
+
+    occurrences, skipped = [], 0
+    for component in events:
+        try:
+            span = _span(component)
+            if span is None or not _busy(component):
+                continue
+            dtstart, duration = span
+            title = str(component.get("SUMMARY", ""))
+            starts = {round(dtstart.timestamp())}
+            starts.update(_ts(d, dtstart) for d in _values(component, "RDATE"))
+            lo_dt, hi_dt = _at(lo - duration, dtstart), _at(hi, dtstart)
+            for rule in _rules(component, dtstart, lo_dt, skip_ahead):
+                starts.update(round(d.timestamp()) for d in rule.between(lo_dt, hi_dt, inc=True))
+            starts.difference_update(_ts(d, dtstart) for d in _values(component, "EXDATE"))
+            starts.difference_update(
+                _ts(o.decoded("RECURRENCE-ID"), dtstart)
+                for o in overrides.get(str(component.get("UID", "")), ())
+            )
+            occurrences.extend([s, s + duration, title] for s in starts
+                               if s < hi and s + duration > lo)
+        except Exception:
+            skipped += 1
+
+    # Moved or edited single occurrences of a series
+    for group in overrides.values():
+        for component in group:
+            try:
+                span = _span(component)
+                if span is None or not _busy(component):
+                    continue
+                start = round(span[0].timestamp())
+                if start < hi and start + span[1] > lo:
+                    occurrences.append([start, start + span[1], str(component.get("SUMMARY", ""))])
+            except Exception:
+                skipped += 1
+
+    if skipped:
+        print(f"[Calendar] Skipped {skipped} unreadable events")
+    occurrences.sort()
+    return occurrences
+
+
+def expand_file(path, lo, hi, skip_ahead=True):
+    with open(path, "rb") as f:
+        return expand_ics(f.read(), lo, hi, skip_ahead)
+
+
+def expand_ics(data, lo, hi, skip_ahead=True):
+    """Busy occurrences of every VCALENDAR in .ics bytes, sorted by start."""
+    from icalendar import Calendar as ICalendar
+    occurrences = []
+    for calendar in ICalendar.from_ical(data, multiple=True):
+        occurrences.extend(expand(calendar, lo, hi, skip_ahead))
+    occurrences.sort()
+    return occurrences
+
+
+def window(now, past_days=CALENDAR_PAST_DAYS, ahead_days=CALENDAR_AHEAD_DAYS):
+    """(lo, hi) epoch seconds: local midnights past_days back and ahead_days + 1 ahead."""
+    today = date.fromtimestamp(now)
+    lo = datetime.combine(today - timedelta(days=past_days), datetime.min.time())
+    hi = datetime.combine(today + timedelta(days=ahead_days + 1), datetime.min.time())
+    return round(lo.timestamp()), round(hi.timestamp())
+
+
+# -------------------------------------------------
+# CALENDAR (files → cache → index)
+# -------------------------------------------------
+class Calendar:
+    def __init__(self, paths=None, directory=CALENDAR_DIR, cache_dir=CALENDAR_CACHE_DIR, clock=time,
+                 past_days=CALENDAR_PAST_DAYS, ahead_days=CALENDAR_AHEAD_DAYS,
+                 interval=CALENDAR_REFRESH, on_change=None):
+        self.paths = paths          # None: CALENDAR_FILES plus *.ics in directory
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self.clock = clock
+        self.past_days = past_days
+        self.ahead_days = ahead_days
+        self.interval = interval
+        self.on_change = on_change  # called after a refresh changes the index (e.g. to wake the monitor)
+
+        self.files = {}             # path -> ((size, mtime, lo, hi), cache key, occurrences)
+        self.index = IntervalIndex()
+        self._current = (None, 0, 0, None)   # (index, valid from, valid until, occurrence)
+        self.stop_event = threading.Event()
+
+        self.parse_time = registry.histogram("calendar_parse_ms", help="Parse and expand one .ics")
+        registry.gauge("calendar_occurrences", "Meetings in the expansion window",
+                       fn=lambda: len(self.index))
+
+    def sources(self):
+        if self.paths is not None:
+            return list(self.paths)
+        paths = list(CALENDAR_FILES)
+        if self.directory:
+            paths.extend(sorted(glob.glob(os.path.join(self.directory, "*.ics"))))
+        return paths
+
+    # -------------------------------------------------
+    # LOOKUPS (monitor thread)
+    # -------------------------------------------------
+    def current(self, now):
+        """The meeting on at `now` (earliest started) as (start, end, title), or None."""
+        index, valid_from, valid_until, occurrence = self._current
+        if index is self.index and valid_from <= now < valid_until:
+            return occurrence
+        index = self.index
+        occurrence, change = index.lookup(now)
+        self._current = (index, now, change if change is not None else float("inf"), occurrence)
+        return occurrence
+
+    def next_change(self, now):
+        """When current() can next change (a start or an end), or None."""
+        self.current(now)
+        until = self._current[2]
+        return None if until == float("inf") else until
+
+    def upcoming(self, now):
+        return self.index.next_after(now)
+
+    # -------------------------------------------------
+    # LOADING
+    # -------------------------------------------------
+    def refresh(self, now=None):
+        """Re-read new or changed files (cache first); True if the index changed."""
+        lo, hi = window(self.clock.time() if now is None else now, self.past_days, self.ahead_days)
+        files, changed = {}, False
+        for path in self.sources():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = (st.st_size, st.st_mtime_ns, lo, hi)
+            entry = self.files.get(path)
+            if entry is None or entry[0] != stamp:
+                # Touched or synced but unchanged files hash the same: no parse
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                digest = hashlib.sha1(data).hexdigest()
+                key = f"{CALENDAR_VERSION}|{digest}|{lo}|{hi}"
+                if entry is None or entry[1] != key:
+                    entry = (stamp, key, self._load(path, data, key, lo, hi))
+                    changed = True
+                else:
+                    entry = (stamp,) + entry[1:]
+            files[path] = entry
+        changed = changed or files.keys() != self.files.keys()
+        self.files = files
+        if changed:
+            self.index = IntervalIndex(o for entry in files.values() for o in entry[2])
+            print(f"[Calendar] {len(self.index)} meetings from {len(files)} calendars")
+            if self.on_change is not None:
+                self.on_change()
+        return changed
+
+    def _cache_file(self, path):
+        name = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _load(self, path, data, key, lo, hi):
+        cache_file = self._cache_file(path)
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return cached["occurrences"]
+        except (OSError, ValueError):
+            pass
+
+        start = time.perf_counter()
+        try:
+            occurrences = expand_ics(data, lo, hi)
+        except Exception as e:
+            print(f"[Calendar] Could not read {path}: {e}")
+            return []
+        self.parse_time.observe((time.perf_counter() - start) * 1000)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_file + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"key": key, "path": path, "occurrences": occurrences}, f)
+            os.replace(cache_file + ".tmp", cache_file)
+        except OSError as e:
+            print("Calendar cache error:", e)
+        return occurrences
+
+    # -------------------------------------------------
+    # REFRESH THREAD
+    # -------------------------------------------------
+    def start(self):
+        self.refresh()
+        threading.Thread(target=self._loop, name="calendar", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Calendar refresh error:", e)
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def _fmt(ts):
+    return datetime.fromtimestamp(ts).strftime("%a %H:%M")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("files", nargs="*", help=".ics files (default: CALENDAR_DIR)")
+    parser.add_argument("--at", help="local ISO time to query instead of now")
+    args = parser.parse_args()
+
+    now = datetime.fromisoformat(args.at).timestamp() if args.at else time.time()
+    calendar = Calendar(paths=args.files or None)
+    start = time.perf_counter()
+    calendar.refresh(now)
+    print(f"Loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    meeting = calendar.current(now)
+    upcoming = calendar.upcoming(now)
+    print(f"Now:  {meeting[2]} ({_fmt(meeting[0])}-{_fmt(meeting[1])})" if meeting else "Now:  free")
+    print(f"Next: {upcoming[2]} at {_fmt(upcoming[0])}" if upcoming else "Next: nothing")
+
+    n = 10_000
+    start = time.perf_counter_ns()
+    for i in range(n):
+        calendar.index.at(now + i)
+    print(f"Lookup: {(time.perf_counter_ns() - start) / n:.0f} ns (index), ", end="")
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        calendar.current(now)
+    print(f"{(time.perf_counter_ns() - start) / n:.0f} ns (cached)")
+
+
+if __name__ == "__main__":
+    main()
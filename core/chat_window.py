@@ -1,15 +1,45 @@
+import os
+import threading
+import time
 import tkinter as tk
+from collections import deque
 from tkinter import scrolledtext
-import threading
+
+from ai.conversation import Conversation
+from ai.job_queue import CHAT
+from config import CHAT_SCROLLBACK, CHAT_TRANSCRIPT, DATA_DIR
 
 
 class ChatWindow:
-    def __init__(self, root, ollama, speech=None):
+    def __init__(self, root, ollama, ai_queue, ui, speech=None, conversation=None,
+                 scrollback=CHAT_SCROLLBACK, transcript=os.path.join(DATA_DIR, CHAT_TRANSCRIPT)):
         self.root = root
         self.ollama = ollama
+        self.ai_queue = ai_queue
+        self.conversation = conversation or Conversation(ollama, ai_queue)
+        self.ui = ui          # UIQueue: replies arrive on AI worker threads
         self.speech = speech  # optional speech bubble link
         self.window = None
 
+        # One reply streams at a time: Send is off until it has finished
+        self.replying = False
+        self.send_btn = None
+
+        # Text waiting for the next UI tick, inserted in one go:
+        # (text, ends_message) chunks
+        self.pending_text = []
+        self.text_lock = threading.Lock()
+
+        # Scrollback: line count of each finished message in the widget
+        self.scrollback = scrollback
+        self.message_lines = deque()
+        self.open_lines = 0   # lines of the message still streaming in
+
+        # Every finished message is appended here, so trimming loses nothing
+        self.transcript = transcript
+        self.transcript_lock = threading.Lock()
+        os.makedirs(os.path.dirname(transcript), exist_ok=True)
+
     def open(self):
         if self.window and tk.Toplevel.winfo_exists(self.window):
             self.window.lift()
@@ -30,6 +60,8 @@ class ChatWindow:
         )
         self.chat_box.pack(padx=8, pady=5)
         self.chat_box.config(state=tk.DISABLED)
+        self.message_lines.clear()
+        self.open_lines = 0
 
         # --- Entry box ---
         self.entry = tk.Entry(self.window, font=("Arial", 11))
@@ -37,48 +69,111 @@ class ChatWindow:
         self.entry.bind("<Return>", self.on_send)
 
         # --- Send button ---
-        send_btn = tk.Button(
+        self.send_btn = tk.Button(
             self.window,
             text="Send",
             font=("Arial", 10, "bold"),
-            command=self.on_send
+            command=self.on_send,
+            state=tk.DISABLED if self.replying else tk.NORMAL
         )
-        send_btn.pack(pady=5)
+        self.send_btn.pack(pady=5)
 
-        # Greet the user once
-        self._append_text("Pet", "Hi there! I’m your desk buddy 😺. What’s up?")
+        # Pick up where the last conversation left off, or greet the user
+        turns = self.conversation.recent_turns(self.scrollback)
+        for turn in turns:
+            sender = "You" if turn["role"] == "user" else "Pet"
+            self._queue_text(f"{sender}: {turn['content']}\n\n", ends_message=True)
+        if not turns:
+            self._append_text("Pet", "Hi there! I’m your desk buddy 😺. What’s up?")
 
+    # -------------------------------
+    # TEXT (any thread → next UI tick)
     # -------------------------------
     def _append_text(self, sender, text):
+        """Queue a whole chat line; safe from any thread."""
+        self._queue_text(f"{sender}: {text}\n\n", ends_message=True)
+        self._log(sender, text)
+
+    def _queue_text(self, text, ends_message=False):
+        with self.text_lock:
+            self.pending_text.append((text, ends_message))
+        self.ui.post(self._flush_text, key="chat_text")
+
+    def _flush_text(self):
+        # Tk thread: everything queued since the last tick is one insert
+        with self.text_lock:
+            chunks = self.pending_text
+            self.pending_text = []
+        if not chunks or not (self.window and tk.Toplevel.winfo_exists(self.window)):
+            return
+
+        for text, ends_message in chunks:
+            self.open_lines += text.count("\n")
+            if ends_message:
+                self.message_lines.append(self.open_lines)
+                self.open_lines = 0
+
+        # Only follow the output if the user hasn't scrolled up to read
+        at_bottom = self.chat_box.yview()[1] >= 0.999
         self.chat_box.config(state=tk.NORMAL)
-        self.chat_box.insert(tk.END, f"{sender}: {text}\n\n")
+        self.chat_box.insert(tk.END, "".join(text for text, _ in chunks))
+        self._trim()
         self.chat_box.config(state=tk.DISABLED)
-        self.chat_box.yview(tk.END)
+        if at_bottom:
+            self.chat_box.yview(tk.END)
+
+    def _trim(self):
+        # Drop the oldest messages beyond the scrollback cap in one delete
+        lines = 0
+        while len(self.message_lines) > self.scrollback:
+            lines += self.message_lines.popleft()
+        if lines:
+            self.chat_box.delete("1.0", f"{lines + 1}.0")
+
+    def _log(self, sender, text):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self.transcript_lock:
+                with open(self.transcript, "a", encoding="utf-8") as f:
+                    f.write(f"[{stamp}] {sender}: {text}\n")
+        except OSError as e:
+            print("Transcript error:", e)
 
     # -------------------------------
     def on_send(self, event=None):
         user_input = self.entry.get().strip()
-        if not user_input:
+        # Still answering: keep the text in the entry for when Send comes back
+        if not user_input or self.replying:
             return
 
         self.entry.delete(0, tk.END)
         self._append_text("You", user_input)
 
-        threading.Thread(target=self._get_response, args=(user_input,), daemon=True).start()
+        self._set_replying(True)
+        job = self.ai_queue.submit(lambda: self._get_response(user_input), priority=CHAT)
+        if job.cancelled:  # queue full of chat already: this one was dropped
+            self._set_replying(False)
+
+    def _set_replying(self, replying):
+        # Tk thread
+        self.replying = replying
+        if self.window and tk.Toplevel.winfo_exists(self.window):
+            self.send_btn.config(state=tk.DISABLED if replying else tk.NORMAL)
 
     # -------------------------------
     def _get_response(self, user_input):
+        # AI worker thread: tokens are queued as they arrive and drawn per UI tick
+        self._queue_text("Pet: ")
+        parts = []
         try:
-            prompt = (
-                f"You are a cute pixel cat pet named Mrs. Mewlette who lives on the user's desktop. "
-                f"Keep your replies short, warm, and positive. Use emojis sometimes. "
-                f"Reply to: {user_input}"
-            )
-            response = self.ollama.generate(prompt)
+            for token in self.conversation.stream_reply(user_input):
+                parts.append(token)
+                self._queue_text(token)
+
+            response = "".join(parts).strip()
             if not response:
                 response = "😿 ...I'm a bit tired right now."
-
-            self._append_text("Pet", response)
+                self._queue_text(response)
 
             # Optionally show in the bubble
             if self.speech:
@@ -86,5 +181,9 @@ class ChatWindow:
 
         except Exception as e:
             print("Chat error:", e)
-            self._append_text("Pet", "Oops, something went wrong 🥲")
-          
+            response = "".join(parts).strip() + " Oops, something went wrong 🥲"
+            self._queue_text(" Oops, something went wrong 🥲")
+
+        self._queue_text("\n\n", ends_message=True)
+        self._log("Pet", response.strip())
+        self.ui.post(self._set_replying, False)
@@ -0,0 +1,67 @@
+import tkinter as tk
+
+from config import DEBUG_OVERLAY_KEY, DEBUG_OVERLAY_REFRESH
+from core.metrics import registry
+
+
+def _hist(snap, name, field="p95"):
+    h = snap["histograms"].get(name)
+    return h[field] if h and h["count"] else "-"
+
+
+def format_lines(snap, state=None):
+    """A few short lines from a registry snapshot; fits the 150 px pet window."""
+    gauges, counters = snap["gauges"], snap["counters"]
+    json_writes = sum(h["count"] for key, h in snap["histograms"].items()
+                      if key.startswith("json_write_ms"))
+    db = snap["histograms"].get("db_write_ms", {"count": 0})
+    return [
+        f"llm 1st {_hist(snap, 'llm_first_token_ms', 'p50')} "
+        f"p95 {_hist(snap, 'llm_first_token_ms')}ms",
+        f"ai q {gauges.get('ai_queue_depth', '-')} "
+        f"wait p95 {_hist(snap, 'ai_job_wait_ms')}ms",
+        f"cam {_hist(snap, 'detector_frame_ms', 'p50')}ms "
+        f"{gauges.get('detector_fps', '-')}fps",
+        f"tk late p95 {_hist(snap, 'tk_tick_jitter_ms')} "
+        f"max {_hist(snap, 'tk_tick_jitter_ms', 'max')}ms",
+        f"db {db['count']}w p95 {_hist(snap, 'db_write_ms')}ms",
+        f"json {json_writes}w  keys {counters.get('keys_total', 0)}",
+        f"{state or '?'} {gauges.get('state_age_seconds', '-')}s "
+        f"({counters.get('state_changes_total', 0)} chg)"
+        + (" mtg" if gauges.get("calendar_in_meeting") else ""),
+    ]
+
+
+class DebugOverlay:
+    """Hidden diagnostics text over the pet; DEBUG_OVERLAY_KEY toggles it.
+
+    The label is only created the first time it is shown, and only refreshes
+    while visible. Tk thread only.
+    """
+
+    def __init__(self, root, state_manager=None, metrics=registry,
+                 key=DEBUG_OVERLAY_KEY, refresh=DEBUG_OVERLAY_REFRESH):
+        self.root = root
+        self.state_manager = state_manager
+        self.metrics = metrics
+        self.refresh = refresh
+        self.label = None
+        self.after_id = None
+        self.root.bind(key, self.toggle, add="+")
+
+    def toggle(self, event=None):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+            self.label.place_forget()
+            return
+        if self.label is None:
+            self.label = tk.Label(self.root, font=("Consolas", 7), justify="left", anchor="nw",
+                                  bg="black", fg="#7CFC00", bd=0)
+        self.label.place(x=0, y=0, relwidth=1)
+        self._update()
+
+    def _update(self):
+        state = self.state_manager.get_state() if self.state_manager else None
+        self.label.config(text="\n".join(format_lines(self.metrics.snapshot(), state)))
+        self.after_id = self.root.after(self.refresh, self._update)
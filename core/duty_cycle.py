@@ -0,0 +1,52 @@
+import time
+
+from config import (
+    CAMERA_INTERVALS, FACE_PRESENT_INTERVAL, FACE_LOST_INTERVAL, FACE_LOST_WINDOW,
+    CAMERA_RELEASE_AFTER, CAMERA_PROBE_INTERVAL, READ_BACKOFF_MIN, READ_BACKOFF_MAX,
+)
+
+
+class DutyCycle:
+    """Decides how often the camera loop samples, based on what the pet is doing.
+
+    - face present → FACE_PRESENT_INTERVAL
+    - face just lost → FACE_LOST_INTERVAL for FACE_LOST_WINDOW seconds
+    - otherwise → per pet state (slow while sleeping)
+    - no face for CAMERA_RELEASE_AFTER → release the camera, probe every
+      CAMERA_PROBE_INTERVAL
+    - read failures → exponential backoff
+
+    `scale` stretches every sampling interval (set by the power governor).
+    """
+
+    def __init__(self):
+        self.last_face_time = time.time()
+        self.face_seen = False
+        self.backoff = 0
+        self.scale = 1.0
+
+    def next_interval(self, state, face_present, now=None):
+        now = now if now is not None else time.time()
+        if face_present:
+            self.last_face_time = now
+            self.face_seen = True
+            return FACE_PRESENT_INTERVAL * self.scale
+
+        if self.face_seen and now - self.last_face_time < FACE_LOST_WINDOW:
+            return FACE_LOST_INTERVAL * self.scale
+        return CAMERA_INTERVALS.get(state, CAMERA_INTERVALS["default"]) * self.scale
+
+    def should_release(self, now=None):
+        now = now if now is not None else time.time()
+        return now - self.last_face_time > CAMERA_RELEASE_AFTER
+
+    def probe_interval(self):
+        return CAMERA_PROBE_INTERVAL * self.scale
+
+    def read_failed(self):
+        """Return how long to wait after a failed open/read (doubles each time)."""
+        self.backoff = min(READ_BACKOFF_MAX, max(READ_BACKOFF_MIN, self.backoff * 2))
+        return self.backoff
+
+    def read_ok(self):
+        self.backoff = 0
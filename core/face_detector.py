@@ -2,17 +2,42 @@ import cv2
 import threading
 import time
 
+from core.duty_cycle import DutyCycle
+from core.face_reactions import FaceReactions
+from core.frame_sources import CameraSource
+from core.metrics import registry
+from config import (
+    CAMERA_INDEX, DETECT_WIDTH, FULL_SCAN_EVERY, ROI_PADDING, SMILE_EVERY,
+)
+
 
 class FaceDetector:
-    def __init__(self, state_manager, enable_camera=True):
+    def __init__(self, state_manager, ollama, ai_queue, enable_camera=True, source=None):
         self.state_manager = state_manager
+        self.ollama = ollama
+        self.ai_queue = ai_queue
         self.enable_camera = enable_camera
+        self.source = source or CameraSource(CAMERA_INDEX)
+        self.duty_cycle = DutyCycle()
         self.running = False
-        self.last_face_time = time.time()
-        self.smile_counter = 0  # 👈 Track how long smile persists
-        self.away_message_shown = False
+        self.reactions = FaceReactions(state_manager, ollama, ai_queue)
+
+        # Diagnostics: detection cost and the frame rate the duty cycle settles on
+        self.frame_time = registry.histogram("detector_frame_ms", help="Face/smile detection per frame")
+        self.fps = registry.gauge("detector_fps", "Frames processed per second (smoothed)")
+        self.last_frame = None
+
+        # Tracking state for the tiered pipeline
+        self.track_box = None         # last face (x, y, w, h) in full-res pixels
+        self.frames_since_full = 0    # frames since the last whole-frame scan
+        self.face_frames = 0          # frames with a face (paces the smile cascade)
+        self.smile_every = SMILE_EVERY  # set by the power governor
 
-        # Haar cascades (lightweight & local)
+        # Haar cascades (lightweight & local), loaded on first frame
+        self.face_cascade = None
+        self.smile_cascade = None
+
+    def load_cascades(self):
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
         self.smile_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_smile.xml")
 
@@ -33,80 +58,121 @@ class FaceDetector:
         print("[FaceDetector] Stopped.")
 
     def _run(self):
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            print("⚠️ Camera not accessible.")
-            return
-
         while self.running:
-            ret, frame = cap.read()
-            if not ret:
+            # (Re)open the source, backing off if it keeps failing
+            if not self.source.is_open() and not self.source.open():
+                print("⚠️ Camera not accessible.")
+                time.sleep(self.duty_cycle.read_failed())
                 continue
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
-
-            # ------------------------------
-            # No face detected → “away” state
-            # ------------------------------
-            if len(faces) == 0:
-                if time.time() - self.last_face_time > 10 and not self.away_message_shown:
-                    try:
-                        self.state_manager.app_ref.speech.show("Hey, still there? 👀 Focus time!")
-                        self.away_message_shown = True
-                    except:
-                        pass
-                time.sleep(1)
+            frame = self.source.read()
+            if frame is None:
+                time.sleep(self.duty_cycle.read_failed())
+                continue
+            self.duty_cycle.read_ok()
+
+            start = time.perf_counter()
+            face, smiled = self.process_frame(frame)
+            self._record_frame(start)
+            now = time.time()
+            self.reactions.update(face is not None, smiled, now)
+
+            state = self.state_manager.get_state()
+            delay = self.duty_cycle.next_interval(state, face is not None, now)
+
+            # Long absence → free the camera and only probe now and then
+            if face is None and self.duty_cycle.should_release(now):
+                self.source.release()
+                self.reset_tracking()
+                self._wait_for_probe()
                 continue
 
-            # ------------------------------
-            # Face detected → reset timers
-            # ------------------------------
-            self.last_face_time = time.time()
-            self.away_message_shown = False
-
-            for (x, y, w, h) in faces:
-                face_roi = gray[y:y + h, x:x + w]
-
-                # Stricter smile detection
-                smiles = self.smile_cascade.detectMultiScale(
-                    face_roi,
-                    scaleFactor=1.8,   # more strict, less false positives
-                    minNeighbors=25,   # require many smile features
-                )
-
-                # ------------------------------
-                # Smile logic with persistence
-                # ------------------------------
-                if len(smiles) > 0:
-                    self.smile_counter += 1
-                else:
-                    self.smile_counter = 0
-
-                # Only trigger after 3 consecutive smile detections
-                if self.smile_counter >= 3:
-                    self.smile_counter = 0
-                    self._trigger_smile_reaction()
-                    break
-
-            time.sleep(0.8)
-
-        cap.release()
+            time.sleep(delay)
+
+        self.source.release()
         cv2.destroyAllWindows()
 
+    def _record_frame(self, start):
+        end = time.perf_counter()
+        self.frame_time.observe((end - start) * 1000)
+        if self.last_frame is not None and end > self.last_frame:
+            rate = 1 / (end - self.last_frame)
+            self.fps.set(round(0.8 * self.fps.value + 0.2 * rate, 2))
+        self.last_frame = end
+
+    def _wait_for_probe(self):
+        """Sleep until the next probe, or until typing suggests the user is back."""
+        deadline = time.time() + self.duty_cycle.probe_interval()
+        while self.running and time.time() < deadline:
+            if self.state_manager.get_state() == "focused":
+                return
+            time.sleep(1)
+
+    def reset_tracking(self):
+        """Forget the tracked face: the next frame gets a full scan."""
+        self.track_box = None
+
     # -------------------------------------------------
-    # Trigger Ollama response for smile
+    # Tiered detection: downscale → track ROI → periodic full scan
     # -------------------------------------------------
-    def _trigger_smile_reaction(self):
-        try:
-            self.state_manager.set_state("happy")
-            from ai.ollama_react import OllamaReact
-            ollama = OllamaReact()
-            msg = ollama.generate("Say something sweet noticing my smile. Keep it short and cute with emojis.")
-            if msg and len(msg.strip()) > 0:
-                self.state_manager.app_ref.speech.show(msg)
-                print("AI OUTPUT (smile):", msg)
-        except Exception as e:
-            print("Smile AI error:", e)
-        time.sleep(3)  # prevent back-to-back triggers
-        
+    def process_frame(self, frame):
+        """Return (face box or None, smiled True/False/None) for one BGR frame."""
+        if self.face_cascade is None:
+            self.load_cascades()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        scale = min(1.0, DETECT_WIDTH / gray.shape[1])
+        small = gray if scale == 1.0 else cv2.resize(
+            gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+
+        face = None
+        if self.track_box is not None and self.frames_since_full < FULL_SCAN_EVERY:
+            face = self._search_roi(small, scale)
+            self.frames_since_full += 1
+
+        if face is None:
+            face = self._search_full(small, scale)
+            self.frames_since_full = 0
+
+        self.track_box = face
+        if face is None:
+            return None, None
+
+        # Smile cascade on the full-res face, every smile_every face frames
+        self.face_frames += 1
+        if self.face_frames % self.smile_every:
+            return face, None
+        x, y, w, h = face
+        smiles = self.smile_cascade.detectMultiScale(
+            gray[y:y + h, x:x + w],
+            scaleFactor=1.8,   # more strict, less false positives
+            minNeighbors=25,   # require many smile features
+        )
+        return face, len(smiles) > 0
+
+    def _search_full(self, small, scale):
+        faces = self.face_cascade.detectMultiScale(small, scaleFactor=1.3, minNeighbors=5)
+        return self._largest(faces, 0, 0, scale)
+
+    def _search_roi(self, small, scale):
+        # Padded box around the last face, in downscaled pixels
+        x, y, w, h = (int(v * scale) for v in self.track_box)
+        pad_w, pad_h = int(w * ROI_PADDING), int(h * ROI_PADDING)
+        x0, y0 = max(0, x - pad_w), max(0, y - pad_h)
+        x1 = min(small.shape[1], x + w + pad_w)
+        y1 = min(small.shape[0], y + h + pad_h)
+
+        faces = self.face_cascade.detectMultiScale(
+            small[y0:y1, x0:x1], scaleFactor=1.3, minNeighbors=5,
+            minSize=(max(1, w // 2), max(1, h // 2)),
+        )
+        return self._largest(faces, x0, y0, scale)
+
+    def _largest(self, faces, off_x, off_y, scale):
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        return (
+            int((x + off_x) / scale), int((y + off_y) / scale),
+            int(w / scale), int(h / scale),
+        )
@@ -0,0 +1,80 @@
+import time
+
+from ai.job_queue import MILESTONE
+from config import SMILE_COOLDOWN
+
+
+class FaceReactions:
+    """What the pet does with detection results: away nudges and smile reactions.
+
+    Kept apart from FaceDetector (capture and OpenCV) so the same logic can
+    be driven by recorded or scripted detections without a camera.
+    """
+
+    def __init__(self, state_manager, ollama, ai_queue, clock=time):
+        self.state_manager = state_manager
+        self.ollama = ollama
+        self.ai_queue = ai_queue
+        self.clock = clock
+        self.last_face_time = clock.time()
+        self.smile_counter = 0  # 👈 Track how long smile persists
+        self.away_message_shown = False
+        self.last_smile_reaction = 0
+        self.quiet = False   # set by Signals during calendar meetings
+
+    def update(self, face_present, smiled, now):
+        """One detection result; smiled is True/False, or None if not checked."""
+        # ------------------------------
+        # No face detected → “away” state
+        # ------------------------------
+        if not face_present:
+            if now - self.last_face_time > 10 and not self.away_message_shown and not self.quiet:
+                try:
+                    self.state_manager.app_ref.speech.show("Hey, still there? 👀 Focus time!")
+                    self.away_message_shown = True
+                except:
+                    pass
+            return
+
+        # ------------------------------
+        # Face detected → reset timers
+        # ------------------------------
+        self.last_face_time = now
+        self.away_message_shown = False
+
+        # ------------------------------
+        # Smile logic with persistence (None = not checked this frame)
+        # ------------------------------
+        if smiled is True:
+            self.smile_counter += 1
+        elif smiled is False:
+            self.smile_counter = 0
+
+        # Only trigger after 3 consecutive smile detections
+        if self.smile_counter >= 3:
+            self.smile_counter = 0
+            self._trigger_smile_reaction()
+
+    def _trigger_smile_reaction(self):
+        # Cooldown instead of sleeping, so detection keeps running
+        now = self.clock.time()
+        if now - self.last_smile_reaction < SMILE_COOLDOWN:
+            return
+        self.last_smile_reaction = now
+
+        self.state_manager.set_state("happy")
+        if self.quiet:
+            return
+        self.ai_queue.submit(
+            lambda: self.ollama.generate(
+                "Say something sweet noticing my smile. Keep it short and cute with emojis."
+            ),
+            priority=MILESTONE,
+            key="smile",
+            on_done=self._show_smile_line,
+        )
+
+    def _show_smile_line(self, msg):
+        if msg and len(msg.strip()) > 0:
+            self.state_manager.app_ref.speech.show(msg)
+            print("AI OUTPUT (smile):", msg)
@@ -0,0 +1,62 @@
+"""Focus/idle decisions as deadlines instead of a 1 s poll.
+
+FocusEngine is plain bookkeeping with no thread and no clock of its own:
+given the time of the last input (key or mouse) it says which state the pet
+should be in, which focus milestones are due, and the next time any of that can
+change. Signals sleeps until that deadline or until input wakes it.
+"""
+from config import FOCUS_MILESTONES, IDLE_AFTER, SLEEP_AFTER
+
+
+class FocusEngine:
+    def __init__(self, milestones=FOCUS_MILESTONES, idle_after=IDLE_AFTER, sleep_after=SLEEP_AFTER):
+        self.milestones = sorted(milestones, key=lambda m: m["after"])
+        self.idle_after = idle_after
+        self.sleep_after = sleep_after
+        self.focus_start = None   # start of the current focus session
+        self.fired = set()        # milestone ids already granted this session
+
+    def start_focus(self, now):
+        self.focus_start = now
+        self.fired = set()
+
+    def end_focus(self):
+        self.focus_start = None
+
+    # Thresholds are compared as absolute times, exactly as next_deadline
+    # computes them, so waking at a deadline always crosses it
+    def state_for(self, now, last_input_time):
+        if now >= last_input_time + self.sleep_after:
+            return "sleeping"
+        if now >= last_input_time + self.idle_after:
+            return "idle"
+        return "focused"
+
+    def due(self, now, last_input_time):
+        """Milestones reached this session and not fired yet; marks them fired.
+
+        Focus time counts up to the moment the session went idle, so a late
+        wakeup (GC, slow I/O, a stalled thread) still grants what was earned.
+        """
+        if self.focus_start is None:
+            return []
+        end = min(now, last_input_time + self.idle_after)
+        due = [m for m in self.milestones
+               if self.focus_start + m["after"] <= end and m["id"] not in self.fired]
+        self.fired.update(m["id"] for m in due)
+        return due
+
+    def next_deadline(self, now, last_input_time):
+        """Earliest time the state or a milestone can change without input (None: never)."""
+        deadlines = []
+        if now < last_input_time + self.idle_after:
+            deadlines.append(last_input_time + self.idle_after)
+        elif now < last_input_time + self.sleep_after:
+            deadlines.append(last_input_time + self.sleep_after)
+
+        if self.focus_start is not None:
+            for m in self.milestones:
+                if m["id"] not in self.fired:
+                    deadlines.append(self.focus_start + m["after"])
+                    break
+        return min(deadlines) if deadlines else None
@@ -0,0 +1,69 @@
+import os
+from collections import OrderedDict
+
+from PIL import ImageTk
+
+from config import ATLAS_CACHE_DIR, SKINS_DIR, FRAME_CACHE_BYTES
+from core.sprite_atlas import SkinAtlas
+
+
+class FrameCache:
+    """LRU of Tk frames per (skin, state), bounded by decoded bytes.
+
+    States are turned into PhotoImages on first use, so memory follows what
+    is actually shown rather than how many skins are installed. Tk thread only.
+    """
+
+    def __init__(self, max_bytes=FRAME_CACHE_BYTES, skins_dir=SKINS_DIR, cache_dir=ATLAS_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.skins_dir = skins_dir
+        self.cache_dir = cache_dir   # where atlases are built and mapped from
+        self.atlases = {}            # skin -> SkinAtlas (memory-mapped, not decoded)
+        self.entries = OrderedDict() # (skin, state) -> [PhotoImage]
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def available_skins(self):
+        return sorted(
+            name for name in os.listdir(self.skins_dir)
+            if os.path.isdir(os.path.join(self.skins_dir, name))
+        )
+
+    def atlas(self, skin):
+        if skin not in self.atlases:
+            self.atlases[skin] = SkinAtlas(os.path.join(self.skins_dir, skin), self.cache_dir)
+        return self.atlases[skin]
+
+    def get(self, skin, state):
+        """Return the state's frames, decoding them on first use."""
+        key = (skin, state)
+        frames = self.entries.get(key)
+        if frames is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return frames
+
+        self.misses += 1
+        atlas = self.atlas(skin)
+        frames = [ImageTk.PhotoImage(img) for img in atlas.frames(state)]
+        self.entries[key] = frames
+        self.bytes += len(frames) * atlas.frame_bytes
+        self._evict()
+        return frames
+
+    def durations(self, skin, state):
+        """Per-frame durations (ms) from the skin manifest."""
+        return self.atlas(skin).durations(state)
+
+    def prefetch(self, skin, states):
+        """Decode states that are likely to be shown next (call when idle)."""
+        for state in states:
+            if (skin, state) not in self.entries and state in self.atlas(skin).index:
+                self.get(skin, state)
+
+    def _evict(self):
+        # Never drop the entry that was just added
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            (skin, _), frames = self.entries.popitem(last=False)
+            self.bytes -= len(frames) * self.atlases[skin].frame_bytes
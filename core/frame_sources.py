@@ -0,0 +1,121 @@
+"""Where FaceDetector gets its frames from.
+
+Every source has open() -> bool, is_open(), read() -> BGR frame or None,
+and release(), so the detector can run on a webcam, a recording, a folder
+of stills or generated frames without caring which.
+"""
+import os
+
+import cv2
+
+
+class FrameSource:
+    def open(self):
+        return True
+
+    def is_open(self):
+        return True
+
+    def read(self):
+        return None
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """Live webcam via cv2.VideoCapture."""
+
+    def __init__(self, index=0):
+        self.index = index
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+        return True
+
+    def is_open(self):
+        return self.cap is not None
+
+    def read(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileSource(CameraSource):
+    """Recorded clip; optionally loops back to the start at the end."""
+
+    def __init__(self, path, loop=False):
+        super().__init__(path)
+        self.loop = loop
+
+    def read(self):
+        frame = super().read()
+        if frame is None and self.loop and self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            frame = super().read()
+        return frame
+
+
+class ImageDirSource(FrameSource):
+    """Still images from a folder, in name order."""
+
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.files = []
+        self.pos = 0
+
+    def open(self):
+        self.files = sorted(
+            os.path.join(self.path, name) for name in os.listdir(self.path)
+            if name.lower().endswith(self.EXTENSIONS)
+        )
+        self.pos = 0
+        return bool(self.files)
+
+    def is_open(self):
+        return bool(self.files)
+
+    def read(self):
+        if self.pos >= len(self.files):
+            if not self.loop or not self.files:
+                return None
+            self.pos = 0
+        frame = cv2.imread(self.files[self.pos])
+        self.pos += 1
+        return frame
+
+    def release(self):
+        self.files = []
+
+
+class SyntheticSource(FrameSource):
+    """Frames from any iterable or generator function (for tests and benchmarks)."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.it = None
+
+    def open(self):
+        self.it = iter(self.frames() if callable(self.frames) else self.frames)
+        return True
+
+    def is_open(self):
+        return self.it is not None
+
+    def read(self):
+        return next(self.it, None)
+
+    def release(self):
+        self.it = None
@@ -0,0 +1,174 @@
+"""Power/load governor: picks a performance profile from battery, CPU and memory.
+
+Every GOVERNOR_INTERVAL seconds the sensors are sampled (non-blocking psutil
+calls, well under a millisecond) and a profile is chosen:
+
+  full      on AC power, machine not busy
+  balanced  on battery, or CPU / memory above their first threshold
+  saver     battery low, or CPU / memory above their second threshold
+
+Hysteresis: a threshold that is already in effect only clears once the
+reading drops GOVERNOR_MARGIN points below it, and moving to a lighter
+profile takes GOVERNOR_RELAX samples in a row that allow it (one step at a
+time). Heavier profiles apply on the first sample. Subscribers get
+(name, profile) on every change, on the governor thread.
+"""
+import threading
+import time
+
+from config import (
+    GOVERNOR_BATTERY_LOW, GOVERNOR_CPU, GOVERNOR_INTERVAL, GOVERNOR_MARGIN,
+    GOVERNOR_MEMORY, GOVERNOR_RELAX, POWER_PROFILE, POWER_PROFILES,
+)
+from core.metrics import registry
+
+LEVELS = ["full", "balanced", "saver"]
+
+
+class PsutilSensors:
+    def __init__(self):
+        import psutil
+        self.psutil = psutil
+        psutil.cpu_percent(interval=None)  # first call only sets the baseline
+
+    def read(self):
+        """{"cpu": %, "memory": %, "on_battery": bool, "battery": % or None}."""
+        battery = None
+        try:
+            battery = self.psutil.sensors_battery()
+        except (AttributeError, NotImplementedError, OSError):
+            pass
+        return {
+            "cpu": self.psutil.cpu_percent(interval=None),   # average since the last call
+            "memory": self.psutil.virtual_memory().percent,
+            "on_battery": bool(battery and not battery.power_plugged),
+            "battery": battery.percent if battery else None,
+        }
+
+
+class Governor:
+    def __init__(self, sensors=None, interval=GOVERNOR_INTERVAL, pinned=POWER_PROFILE,
+                 profiles=POWER_PROFILES, margin=GOVERNOR_MARGIN, relax_samples=GOVERNOR_RELAX):
+        self.sensors = sensors
+        self.interval = interval
+        self.pinned = pinned
+        self.profiles = profiles
+        self.margin = margin
+        self.relax_samples = relax_samples
+
+        self.level = None      # index into LEVELS; None until the first sample
+        self.relax = 0         # samples in a row that allowed a lighter profile
+        self.reading = None
+        self.subscribers = []
+        self.stop_event = threading.Event()
+
+        self.switches = registry.counter("governor_switches_total", "Power profile changes")
+        self.sample_time = registry.histogram("governor_sample_ms", help="Sensor sampling cost")
+        registry.gauge("governor_level", "Power profile (0 full, 1 balanced, 2 saver)",
+                       fn=lambda: self.level)
+
+    @property
+    def name(self):
+        return LEVELS[self.level] if self.level is not None else None
+
+    @property
+    def profile(self):
+        return self.profiles[self.name] if self.level is not None else None
+
+    def subscribe(self, callback):
+        """callback(name, profile) on every change; called now if a profile is set."""
+        self.subscribers.append(callback)
+        if self.level is not None:
+            callback(self.name, self.profile)
+
+    # -------------------------------------------------
+    # DECISION
+    # -------------------------------------------------
+    def wanted_level(self, reading, current=0):
+        """Heaviest level any reading asks for, given the level currently in effect."""
+        def over(value, threshold, level):
+            if value is None:
+                return False
+            # Thresholds already in effect clear only `margin` points below
+            margin = self.margin if current >= level else 0
+            return value >= threshold - margin
+
+        level = 0
+        for key, thresholds in (("cpu", GOVERNOR_CPU), ("memory", GOVERNOR_MEMORY)):
+            for i, threshold in enumerate(thresholds):
+                if over(reading.get(key), threshold, i + 1):
+                    level = max(level, i + 1)
+
+        if reading.get("on_battery"):
+            level = max(level, 1)
+            battery = reading.get("battery")
+            if battery is not None and battery <= GOVERNOR_BATTERY_LOW + (self.margin if current >= 2 else 0):
+                level = 2
+        return level
+
+    def update(self, reading):
+        """Feed one sensor reading; returns the profile name now in effect."""
+        self.reading = reading
+        if self.pinned:
+            self._switch(LEVELS.index(self.pinned))
+            return self.name
+
+        current = self.level or 0
+        wanted = self.wanted_level(reading, current)
+        if self.level is None or wanted > current:
+            self.relax = 0
+            self._switch(wanted)
+        elif wanted < current:
+            self.relax += 1
+            if self.relax >= self.relax_samples:
+                self.relax = 0
+                # One step at a time, so a brief lull doesn't jump saver → full
+                self._switch(current - 1)
+        else:
+            self.relax = 0
+        return self.name
+
+    def _switch(self, level):
+        if level == self.level:
+            return
+        old = self.name
+        self.level = level
+        self.switches.inc()
+        print(f"[POWER] {old or 'start'} → {self.name} ({self._describe()})")
+        for callback in self.subscribers:
+            try:
+                callback(self.name, self.profile)
+            except Exception as e:
+                print("Governor subscriber error:", e)
+
+    def _describe(self):
+        r = self.reading or {}
+        battery = f"battery {r['battery']:.0f}%" if r.get("on_battery") and r.get("battery") is not None else "AC"
+        return f"cpu {r.get('cpu', 0):.0f}%, mem {r.get('memory', 0):.0f}%, {battery}"
+
+    # -------------------------------------------------
+    # SAMPLING THREAD
+    # -------------------------------------------------
+    def start(self):
+        if self.sensors is None:
+            self.sensors = PsutilSensors()
+        self.sample()
+        threading.Thread(target=self._loop, name="governor", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def sample(self):
+        start = time.perf_counter()
+        try:
+            reading = self.sensors.read()
+        except Exception as e:
+            print("Governor sensor error:", e)
+            return self.name
+        self.sample_time.observe((time.perf_counter() - start) * 1000)
+        return self.update(reading)
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
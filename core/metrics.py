@@ -0,0 +1,262 @@
+"""Process-wide metrics: counters, gauges and fixed-bucket histograms.
+
+Recording is a plain attribute update (Counter.inc, Gauge.set) or a bisect
+into a short bucket list (Histogram.observe), a few hundred nanoseconds at
+most, so it can sit on the Tk tick paths. The keystroke hook records
+nothing itself: keys_total is counted by the monitor from the ring. Updates are not
+locked: under the GIL a rare concurrent increment can be lost, which is
+fine for diagnostics.
+
+Everything registers in the shared `registry`; modules fetch their metrics
+once (get-or-create by name and labels) and keep a reference. Read side:
+snapshot() for the JSONL dump and the debug overlay, render_text() for the
+local /metrics endpoint (Prometheus text format).
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+from config import METRICS_DUMP_INTERVAL, METRICS_DUMP_MAX_BYTES
+
+_bisect = bisect.bisect_left
+
+# Default bucket upper bounds
+MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000)
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300, 1800, 3600)
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{inner}}}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge:
+    """A current value, either set() by its owner or read from fn() on demand."""
+    kind = "gauge"
+
+    def __init__(self, name, help="", fn=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def read(self):
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return None
+        return self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, buckets=MS_BUCKETS, help=""):
+        self.name = name
+        self.help = help
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)   # last one is +Inf
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[_bisect(self.bounds, value)] += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (max for the last one)."""
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}   # "name{labels}" -> metric
+
+    def _get(self, cls, name, labels, **kwargs):
+        key = _key(name, labels)
+        metric = self.metrics.get(key)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.get(key)
+                if metric is None:
+                    metric = self.metrics[key] = cls(name, **kwargs)
+                    metric.labels = labels
+        return metric
+
+    def counter(self, name, help="", **labels):
+        return self._get(Counter, name, labels, help=help)
+
+    def gauge(self, name, help="", fn=None, **labels):
+        gauge = self._get(Gauge, name, labels, help=help)
+        if fn is not None:
+            gauge.fn = fn   # the newest owner reports
+        return gauge
+
+    def histogram(self, name, buckets=MS_BUCKETS, help="", **labels):
+        return self._get(Histogram, name, labels, buckets=buckets, help=help)
+
+    # -------------------------------------------------
+    # READ SIDE
+    # -------------------------------------------------
+    def get(self, name, **labels):
+        return self.metrics.get(_key(name, labels))
+
+    def snapshot(self):
+        """{"counters": {key: n}, "gauges": {key: v}, "histograms": {key: summary}}."""
+        with self.lock:
+            items = list(self.metrics.items())
+        snap = {"counters": {}, "gauges": {}, "histograms": {}}
+        for key, metric in items:
+            if metric.kind == "counter":
+                snap["counters"][key] = metric.value
+            elif metric.kind == "gauge":
+                snap["gauges"][key] = metric.read()
+            else:
+                snap["histograms"][key] = metric.summary()
+        return snap
+
+    def render_text(self):
+        """Prometheus text exposition format."""
+        with self.lock:
+            items = sorted(self.metrics.items())
+        lines, described = [], set()
+        for key, metric in items:
+            if metric.name not in described:
+                described.add(metric.name)
+                if metric.help:
+                    lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.kind == "counter":
+                lines.append(f"{key} {metric.value}")
+            elif metric.kind == "gauge":
+                value = metric.read()
+                if value is not None:
+                    lines.append(f"{key} {value}")
+            else:
+                cumulative = 0
+                counts = list(metric.counts)
+                for bound, n in zip(metric.bounds + ["+Inf"], counts):
+                    cumulative += n
+                    labels = dict(metric.labels, le=bound)
+                    lines.append(f"{_key(metric.name + '_bucket', labels)} {cumulative}")
+                lines.append(f"{_key(metric.name + '_sum', metric.labels)} {metric.sum}")
+                lines.append(f"{_key(metric.name + '_count', metric.labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# -------------------------------------------------
+# /metrics ENDPOINT (local only)
+# -------------------------------------------------
+def serve(port, host="127.0.0.1", metrics=registry):
+    """Serve GET /metrics on host:port from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] Serving http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+# -------------------------------------------------
+# PERIODIC JSONL DUMP
+# -------------------------------------------------
+class MetricsDump:
+    """Append a snapshot line to a JSONL file every `interval` seconds.
+
+    The file is rotated to `path + ".1"` once it passes max_bytes.
+    """
+
+    def __init__(self, path, interval=METRICS_DUMP_INTERVAL, max_bytes=METRICS_DUMP_MAX_BYTES,
+                 metrics=registry):
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.metrics = metrics
+        self.stop_event = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._loop, name="metrics-dump", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.dump()
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.dump()
+
+    def dump(self):
+        line = json.dumps(dict(ts=round(time.time(), 3), **self.metrics.snapshot()))
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print("Metrics dump error:", e)
@@ -0,0 +1,99 @@
+"""Pet windows hosted by one AppWindow.
+
+Each Pet has its own window, StateManager, Animator and speech bubble, so
+its skin, position and reactions (pats, the happy bounce) are its own.
+What is expensive lives on the AppWindow and is shared: the decoded-frame
+cache, the render clock, the UI queue, the reaction timer thread and
+everything behind Signals (input hooks, camera, LLM, rewards).
+
+Signals and the face detector drive PetGroup, which looks like a single
+StateManager: focus states go to every pet, and the pet's lines are said
+by one pet at a time, in turn.
+"""
+import itertools
+import tkinter as tk
+
+from config import DEFAULT_SKIN
+from core.animator import Animator
+from core.speech_bubble import SpeechBubble
+from core.state_manager import StateManager
+
+PET_WIDTH, PET_HEIGHT = 150, 170
+
+
+class Pet:
+    def __init__(self, app, window, skin=DEFAULT_SKIN, x=None, y=None, name=None):
+        self.app = app
+        self.window = window
+        self.name = name
+
+        window.title("Desk Pet")
+        position = f"+{x}+{y}" if x is not None and y is not None else ""
+        window.geometry(f"{PET_WIDTH}x{PET_HEIGHT}{position}")
+
+        self.state_manager = StateManager(app.scheduler, name=name)
+        self.state_manager.app_ref = self
+        self.animator = Animator(window, self.state_manager, frame_cache=app.frame_cache,
+                                 skin=skin, ui=app.ui, clock=app.render_clock, name=name)
+        self.speech = SpeechBubble(window, app.ui)
+
+        # --- Window Behavior ---
+        window.attributes("-topmost", True)
+        window.overrideredirect(True)
+
+        # Draggable frameless window
+        window.bind("<ButtonPress-1>", self.start_move)
+        window.bind("<B1-Motion>", self.do_move)
+
+        # Right click → switch between unlocked skins
+        window.bind("<Button-3>", self.show_skin_menu)
+
+    # Draggable frameless window handlers
+    def start_move(self, event):
+        self.x = event.x
+        self.y = event.y
+
+    def do_move(self, event):
+        self.window.geometry(f"+{event.x_root - self.x}+{event.y_root - self.y}")
+
+    def show_skin_menu(self, event):
+        rewards = self.app.signals.rewards
+        unlocked = rewards.unlocks.get("skins", []) if rewards else []
+        menu = tk.Menu(self.window, tearoff=0)
+        for skin in self.animator.frame_cache.available_skins():
+            if skin == DEFAULT_SKIN or skin in unlocked:
+                menu.add_command(
+                    label=("✓ " if skin == self.animator.skin else "   ") + skin,
+                    command=lambda s=skin: self.animator.set_skin(s),
+                )
+        menu.tk_popup(event.x_root, event.y_root)
+
+
+class PetGroup:
+    """Every pet behind the StateManager interface Signals and the detector use.
+
+    get_state() and subscribe() follow the first pet, as with a single pet.
+    """
+
+    def __init__(self, pets):
+        self.pets = pets
+        self.app_ref = self    # Signals speaks through state_manager.app_ref.speech
+        self.speech = self
+        self._turn = itertools.count()
+
+    def set_state(self, new_state):
+        for pet in self.pets:
+            pet.state_manager.set_state(new_state)
+
+    def trigger_pat(self):
+        self.set_state("pat")
+
+    def get_state(self):
+        return self.pets[0].state_manager.get_state()
+
+    def subscribe(self, callback):
+        self.pets[0].state_manager.subscribe(callback)
+
+    def show(self, message, duration=4000):
+        """Say a line through the next pet in turn (any thread)."""
+        self.pets[next(self._turn) % len(self.pets)].speech.show(message, duration)
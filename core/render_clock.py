@@ -0,0 +1,87 @@
+"""Animation timers for the Animator: per widget, or one clock for many pets.
+
+Both have call_later(ms, fn) → handle and cancel(handle), Tk thread only.
+TkTimer is a plain `after` per call. RenderClock keeps every pet's next
+frame in one heap behind a single `after`: when it fires, every frame due
+within RENDER_SLACK_MS runs in the same tick, so pets whose frames line up
+(same durations) redraw together and N animated pets cost one Tk timer
+wakeup per frame instead of N.
+"""
+import heapq
+import itertools
+import time
+
+from config import RENDER_SLACK_MS
+from core.metrics import registry
+
+
+class TkTimer:
+    def __init__(self, root):
+        self.root = root
+
+    def call_later(self, ms, fn):
+        return self.root.after(ms, fn)
+
+    def cancel(self, handle):
+        self.root.after_cancel(handle)
+
+
+class RenderClock:
+    def __init__(self, root, slack=RENDER_SLACK_MS, clock=time):
+        self.root = root
+        self.now = clock.monotonic
+        self.slack = slack / 1000
+        self.heap = []          # [due, seq, fn]; fn None once cancelled
+        self._seq = itertools.count()
+        self.after_id = None
+        self.armed_for = None   # due time the pending `after` was set for
+
+        self.wakeups = 0        # Tk timer callbacks
+        self.calls = 0          # frames run
+        registry.gauge("render_clock_wakeups", "Tk timer wakeups of the shared render clock",
+                       fn=lambda: self.wakeups)
+        registry.gauge("render_clock_frames", "Frames run by the shared render clock",
+                       fn=lambda: self.calls)
+
+    def call_later(self, ms, fn):
+        entry = [self.now() + ms / 1000, next(self._seq), fn]
+        heapq.heappush(self.heap, entry)
+        self._arm()
+        return entry
+
+    def cancel(self, handle):
+        handle[2] = None   # dropped when it reaches the top of the heap
+
+    def _arm(self):
+        heap = self.heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        if not heap:
+            return
+        due = heap[0][0]
+        if self.after_id is not None:
+            if self.armed_for <= due:
+                return
+            self.root.after_cancel(self.after_id)
+        self.armed_for = due
+        delay = max(0, round((due - self.now()) * 1000))
+        self.after_id = self.root.after(delay, self._tick)
+
+    def _tick(self):
+        self.after_id = None
+        self.wakeups += 1
+        heap = self.heap
+        horizon = self.now() + self.slack
+        due = []
+        while heap and heap[0][0] <= horizon:
+            entry = heapq.heappop(heap)
+            if entry[2] is not None:
+                due.append(entry[2])
+        # Callbacks reschedule themselves; run them after the heap is settled
+        for fn in due:
+            self.calls += 1
+            try:
+                fn()
+            except Exception as e:
+                print("Render clock error:", e)
+        self._arm()
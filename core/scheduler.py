@@ -0,0 +1,75 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class ScheduledCall:
+    def __init__(self, when, fn, args):
+        self.when = when
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """One thread that runs callbacks at deadlines.
+
+    Replaces the pattern of starting a thread that just sleeps: timers are
+    cheap heap entries and can be cancelled. Callbacks run on the scheduler
+    thread, so they must be short.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.heap = []
+        self.running = False
+        self._seq = itertools.count()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+    def call_later(self, delay, fn, *args):
+        """Run fn(*args) after `delay` seconds; returns a cancellable handle."""
+        return self.call_at(time.monotonic() + delay, fn, *args)
+
+    def call_at(self, when, fn, *args):
+        """Run fn(*args) at time.monotonic() == when."""
+        call = ScheduledCall(when, fn, args)
+        with self.cond:
+            heapq.heappush(self.heap, (when, next(self._seq), call))
+            self.cond.notify()
+        return call
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running:
+                    if self.heap:
+                        delay = self.heap[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self.cond.wait(delay)
+                    else:
+                        self.cond.wait()
+                if not self.running:
+                    return
+                _, _, call = heapq.heappop(self.heap)
+
+            if call.cancelled:
+                continue
+            try:
+                call.fn(*call.args)
+            except Exception as e:
+                print("Scheduler error:", e)
@@ -1,207 +1,445 @@
+from datetime import datetime
 import threading
 import time
-from pynput import keyboard
+
+from ai.job_queue import AMBIENT, MILESTONE
+from config import (
+    BURST_WINDOW, BURST_KPM, CALENDAR_QUIET, MOUSE_ACTIVITY, MOUSE_RETURN_TICKS, MOUSE_RETURN_WINDOW,
+)
+from core.activity import ActivityRing, CoalescedActivity
+from core.focus_engine import FocusEngine
+from core.metrics import registry
+
+
+# Fixed speech prompts (pre-generated in the background by ResponsePool)
+PROMPTS = {
+    "welcome": "Say a cute, short 'welcome back' message under 6 words. Use emojis.",
+    "sleepy": "Say a sleepy message like a cat dozing off. Be cute and soft. Use emojis.",
+    "idle": "Say something calm like 'taking a small break'. Use emojis.",
+    "back_to_work": "Say something motivating like 'back to work!'. Keep it under 5 words with emojis.",
+    "focus_25": "Say an encouraging short message under 5 words. Use emojis.",
+    "focus_60": "Say something excited and celebratory in under 5 words. Use emojis.",
+    "burst": "Say something impressed about how fast I'm typing, under 6 words. Use emojis.",
+}
+
+# Served instead of a new generation when the power governor turns ambient LLM lines off
+CANNED = {
+    "welcome": "Welcome back! 😺",
+    "sleepy": "Zzz... 😴",
+    "idle": "Taking a little break~ ☕",
+    "back_to_work": "Back to work! 💪",
+    "focus_25": "Nice focus! ✨",
+    "focus_60": "One whole minute! 🎉",
+    "burst": "So fast! ⚡",
+}
+CANNED_BY_PROMPT = {PROMPTS[name]: line for name, line in CANNED.items()}
 
 
 class Signals:
-    def __init__(self, state_manager):
+    def __init__(self, state_manager, clock=time):
         self.state_manager = state_manager
-        self.last_key_time = time.time()
-        self.focus_start_time = None
+        # Anything with time() (the time module, or a simulation's virtual clock)
+        self.clock = clock
+        self.now = clock.time
+        self.last_input_time = self.now()   # last key or mouse tick
         self.running = True
         self.prev_state = None
-        self.last_focus_state_change = time.time()
+        self.last_focus_state_change = self.now()
         self.last_talk_time = 0
         self.started_typing = False
+        self.current_state = state_manager.get_state()
+
+        # Keystrokes land in a ring buffer; the monitor thread aggregates them
+        self.activity = ActivityRing()
+        self.record_key = self.activity.append
+        # Counted by the monitor from the ring, so the hook pays nothing for it
+        self.keys_total = registry.counter("keys_total", "Keystrokes seen by the input hook")
+        self.seen_key_time = 0.0
+        self.keys_per_minute = 0.0
+        self.in_burst = False
+        self.wakeup = threading.Event()
+
+        # Mouse moves/clicks/scrolls coalesce into a few ticks a second; they
+        # keep the pet focused but stay out of the typing-rate metrics
+        self.mouse = CoalescedActivity(clock=clock, on_tick=self._on_mouse_tick)
+        self.seen_mouse_time = 0.0
+        registry.gauge("mouse_events", "Raw mouse events seen by the listener",
+                       fn=lambda: self.mouse.events)
+        registry.gauge("mouse_ticks", "Coalesced mouse activity ticks", fn=lambda: self.mouse.ticks)
+
+        # Idle/sleep thresholds and focus milestones
+        self.focus = FocusEngine()
+
+        # Filled in by the startup stages below
+        self.listener = None
+        self.mouse_listener = None
+        self.rewards = None
+        self.monitor_thread = None
+        self.ollama = None
+        self.ai_queue = None
+        self.response_pool = None
+        self.face_detector = None
+        self.governor = None
+        self.calendar = None
+        self.llm_ambient = True   # False: ambient lines never start a generation
+        self.in_meeting = False   # a calendar meeting is on: no speech, no focus milestones
+        registry.gauge("calendar_in_meeting", "1 while a calendar meeting is on",
+                       fn=lambda: int(self.in_meeting))
 
         # ================================
-        #  AI MODULE (Ollama)
+        #  STATE PUSHES (log every transition)
         # ================================
-        from ai.ollama_react import OllamaReact
-        self.ollama = OllamaReact()
+        self.state_manager.subscribe(self.on_state_change)
 
-        # ================================
-        #  REWARDS / QUESTS SYSTEM
-        # ================================
+    # -------------------------------------------------
+    # STARTUP STAGES (priority order, heavy imports inside)
+    # -------------------------------------------------
+    def stages(self):
+        """(name, fn) pairs; AppWindow runs them off the Tk thread after the first frame."""
+        return [
+            ("keyboard", self.start_keyboard),
+            ("mouse", self.start_mouse),
+            ("rewards", self.start_rewards),
+            ("monitor", self.start_monitor),
+            ("calendar", self.start_calendar),
+            ("llm", self.start_ai),
+            ("camera", self.start_camera),
+            ("governor", self.start_governor),
+        ]
+
+    def start(self):
+        """Run every stage now, in order."""
+        for _, fn in self.stages():
+            fn()
+
+    def start_keyboard(self):
+        # Keys are buffered from here on, even before the monitor runs
+        from pynput import keyboard
+        self.listener = keyboard.Listener(on_press=self.on_key_press)
+        self.listener.start()
+
+    def start_mouse(self):
+        if not MOUSE_ACTIVITY:
+            return
+        from pynput import mouse
+        touch = self.mouse.touch
+        self.mouse_listener = mouse.Listener(on_move=touch, on_click=touch, on_scroll=touch)
+        self.mouse_listener.start()
+
+    def start_rewards(self):
         from rewards.rewards_manager import RewardsManager
         self.rewards = RewardsManager()
 
-        # Reward flags
-        self.reward_25_given = False
-        self.reward_60_given = False
+    def start_monitor(self):
+        self.monitor_thread = threading.Thread(target=self.monitor_activity, daemon=True)
+        self.monitor_thread.start()
+
+    def start_calendar(self):
+        from core.calendar_index import Calendar
+        self.calendar = Calendar(clock=self.clock, on_change=self.wakeup.set).start()
+        self.wakeup.set()   # re-plan the monitor's deadline around meetings
 
-        # ================================
-        #  FACE DETECTOR
-        # ================================
-        from core.face_detector import FaceDetector
-        self.face_detector = FaceDetector(state_manager, enable_camera=True)
+    def start_ai(self):
+        from ai.job_queue import AIJobQueue
+        from ai.ollama_react import OllamaReact
+        from ai.response_pool import ResponsePool
+        self.ollama = OllamaReact()
+        self.ai_queue = AIJobQueue()
+        self.ai_queue.start()
+        self.response_pool = ResponsePool(self.ollama, self.ai_queue)
+        for prompt in PROMPTS.values():
+            self.response_pool.register(prompt)
+        self.response_pool.start()
+        self._apply_quiet()
+
+    def start_camera(self):
+        from config import VISION_PROCESS
+        if VISION_PROCESS:
+            from core.vision_process import VisionProcess as FaceDetector
+        else:
+            from core.face_detector import FaceDetector
+        self.face_detector = FaceDetector(
+            self.state_manager, self.ollama, self.ai_queue, enable_camera=True
+        )
         self.face_detector.start()
+        self._apply_quiet()
+
+    def start_governor(self):
+        from core.governor import Governor
+        self.governor = Governor()
+        self.governor.subscribe(self.apply_profile)
+        self.governor.start()
+
+    def apply_profile(self, name, profile):
+        """Apply a power profile to the LLM and camera (any thread)."""
+        self.llm_ambient = profile["llm_ambient"]
+        if self.face_detector is not None:
+            self.face_detector.duty_cycle.scale = profile["camera_scale"]
+            self.face_detector.smile_every = profile["smile_every"]
+        self._apply_quiet()
+
+    def _apply_quiet(self):
+        """Pause background LLM work for the power profile or a meeting."""
+        quiet = self.in_meeting and CALENDAR_QUIET
+        if self.response_pool is not None:
+            self.response_pool.paused = quiet or not self.llm_ambient
+            self.response_pool.wakeup.set()
+        if self.face_detector is not None:
+            self.face_detector.reactions.quiet = quiet
 
-        # ================================
-        #  KEYBOARD LISTENER
-        # ================================
-        self.listener = keyboard.Listener(on_press=self.on_key_press)
-        self.listener.start()
-
-        # ================================
-        #  MONITOR THREAD
-        # ================================
-        self.monitor_thread = threading.Thread(target=self.monitor_activity, daemon=True)
-        self.monitor_thread.start()
+    # -------------------------------------------------
+    # STATE CHANGE (pushed by StateManager)
+    # -------------------------------------------------
+    def on_state_change(self, old_state, new_state):
+        self.current_state = new_state
+        if self.rewards is not None:
+            self.rewards.record_state(old_state, new_state)
 
     # -------------------------------------------------
-    # KEY PRESS HANDLER
+    # KEY PRESS HANDLER (runs inside the OS input hook)
     # -------------------------------------------------
     def on_key_press(self, key):
-        current_state = self.state_manager.get_state()
-        self.last_key_time = time.time()
+        # Record and get out; decisions happen in _process_activity
+        self.record_key(self.now())
+        if self.current_state != "focused":
+            self.wakeup.set()
+
+    def _on_mouse_tick(self):
+        # At most one call per MOUSE_TICK_INTERVAL, from the mouse hook
+        if self.current_state != "focused":
+            self.wakeup.set()
+
+    # -------------------------------------------------
+    # ACTIVITY AGGREGATOR (monitor thread)
+    # -------------------------------------------------
+    def _process_activity(self, now):
+        # Typing rate metrics
+        self.keys_per_minute = self.activity.per_minute(60, now)
+        burst = self.activity.per_minute(BURST_WINDOW, now) >= BURST_KPM
+        if burst and not self.in_burst:
+            self._speak_ai(PROMPTS["burst"], state="focused")
+        self.in_burst = burst
+
+        last_key = self.activity.last_time()
+        last_move = self.mouse.last_time()
+        current_state = self.current_state
+        if last_key > self.seen_key_time:
+            self.keys_total.inc(self.activity.count_after(self.seen_key_time))
+            self.seen_key_time = last_key
+        elif last_move <= self.seen_mouse_time:
+            return
+        elif current_state in ["focused", "happy"]:
+            # Mouse only, while active: just pushes the idle deadline back
+            self.seen_mouse_time = last_move
+            self.last_input_time = max(self.last_input_time, last_move)
+            return
+        elif self.mouse.ring.count_since(last_move - MOUSE_RETURN_WINDOW) < MOUSE_RETURN_TICKS:
+            # A bumped mouse or the cursor crossing the pet is not a return;
+            # the ticks stay unseen so a sustained run still adds up
+            return
+        self.seen_mouse_time = last_move
+        last_input = max(last_key, last_move)
+
+        self.last_input_time = last_input
         self.started_typing = True
 
+        # Typing through a milestone's celebration is the same session:
+        # happy returns to focused on its own, and its milestones stay fired
+        if current_state == "happy" and self.focus.focus_start is not None:
+            return
+
         # Ignore welcome back if just celebrated
-        if current_state == "happy" and (time.time() - self.last_focus_state_change < 10):
+        if current_state == "happy" and (now - self.last_focus_state_change < 10):
             return
 
         # Was idle?
         was_idle = current_state not in ["focused", "happy"]
 
-        # Switch to focus if not already
+        # Switch to focus if not already (new session: milestones start over)
         if current_state != "focused":
-            self.focus_start_time = time.time()
+            self._start_focus(last_input)
             self.state_manager.set_state("focused")
             self.prev_state = "focused"
-            self.last_focus_state_change = time.time()
-
-            # Reset reward flags
-            self.reward_25_given = False
-            self.reward_60_given = False
+            self.last_focus_state_change = now
 
         # Welcome back reward
         if was_idle:
             self.rewards.add_xp(2)   # +2 XP
-            self._speak_ai(
-                "Say a cute, short 'welcome back' message under 6 words. Use emojis."
-            )
+            self._speak_ai(PROMPTS["welcome"], state="focused")
 
     # -------------------------------------------------
-    # MAIN MONITOR LOOP
+    # MAIN MONITOR LOOP (sleeps until the next deadline)
     # -------------------------------------------------
     def monitor_activity(self):
         time.sleep(3)
 
         while self.running:
-            now = time.time()
-            idle_duration = now - self.last_key_time
-            new_state = self.state_manager.get_state()
-
-            # Determine new state
-            if idle_duration > 120:
-                new_state = "sleeping"
-            elif idle_duration > 20:
-                new_state = "idle"
-            else:
-                new_state = "focused" if self.started_typing else self.prev_state or "idle"
-
-            # Handle state change
-            if new_state != self.prev_state:
-                print(f"[STATE CHANGE] {self.prev_state} → {new_state}")
-                self.state_manager.set_state(new_state)
-                self.prev_state = new_state
-                self.last_focus_state_change = now
-
-                if new_state == "sleeping":
-                    self._speak_ai(
-                        "Say a sleepy message like a cat dozing off. Be cute and soft. Use emojis."
-                    )
-                    self.focus_start_time = None
-
-                elif new_state == "idle":
-                    self._speak_ai(
-                        "Say something calm like 'taking a small break'. Use emojis."
-                    )
-                    self.focus_start_time = None
-
-                elif new_state == "focused" and self.started_typing:
-                    self._speak_ai(
-                        "Say something motivating like 'back to work!'. Keep it under 5 words with emojis."
-                    )
-                    self.focus_start_time = now
-                    self.reward_25_given = False
-                    self.reward_60_given = False
-
-            # -------------------------------------------------
-            # FOCUS REWARD SYSTEM
-            # -------------------------------------------------
-            if new_state == "focused" and self.started_typing:
-
-                if self.focus_start_time is None:
-                    self.focus_start_time = now
-
-                focus_duration = now - self.focus_start_time
-
-                # ---- 25 SECOND REWARD ----
-                if 25 < focus_duration < 27 and not self.reward_25_given:
-                    self.reward_25_given = True
-                    self.rewards.add_xp(5)
-                    self.rewards.complete_quest("25sec_focus")
-                    self._speak_ai(
-                        "Say an encouraging short message under 5 words. Use emojis."
-                    )
-
-                # ---- 60 SECOND REWARD ----
-                if 60 < focus_duration < 62 and not self.reward_60_given:
-                    self.reward_60_given = True
-
-                    self.rewards.add_xp(10)
-                    self.rewards.add_streak(1)
-                    self.rewards.complete_quest("1min_focus")
-
-                    self.state_manager.set_state("happy")
-                    self.prev_state = "happy"
-
-                    self._speak_ai(
-                        "Say something excited and celebratory in under 5 words. Use emojis."
-                    )
-
-            time.sleep(1)
+            deadline = self.tick(self.now())
+
+            # Keys and mouse ticks while not focused set wakeup; while focused
+            # they only push the idle deadline back, which is picked up when it expires
+            timeout = None if deadline is None else max(0, deadline - self.now())
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+
+    def tick(self, now):
+        """One monitor pass at `now`; returns when the next one is due (None: on input)."""
+        self._update_meeting(now)
+        self._process_activity(now)
+        self._update_state(now)
+
+        # Next idle/sleep threshold or milestone; while typing, also
+        # refresh the rate metrics every BURST_WINDOW
+        deadline = self.focus.next_deadline(now, self.last_input_time)
+        if now - self.seen_key_time < BURST_WINDOW:
+            deadline = min(deadline or now + BURST_WINDOW, now + BURST_WINDOW)
+        # ...and wake when a meeting starts or ends
+        if self.calendar is not None:
+            change = self.calendar.next_change(now)
+            if change is not None:
+                deadline = min(deadline or change, change)
+        return deadline
+
+    def _update_meeting(self, now):
+        meeting = self.calendar.current(now) if self.calendar is not None else None
+        if (meeting is not None) == self.in_meeting:
+            return
+        self.in_meeting = meeting is not None
+        if meeting is not None:
+            until = datetime.fromtimestamp(meeting[1]).strftime("%H:%M")
+            minutes = round((meeting[1] - now) / 60)
+            print(f"[CALENDAR] In a meeting: {meeting[2]} (until {until}, {minutes} min)")
+            # Meeting time isn't focus time; a new session starts after it
+            self.focus.end_focus()
+        else:
+            print("[CALENDAR] Meeting over")
+        self._apply_quiet()
+
+    def _start_focus(self, now):
+        if not self.in_meeting:
+            self.focus.start_focus(now)
+
+    def _update_state(self, now):
+        new_state = self.focus.state_for(now, self.last_input_time)
+        if new_state == "focused" and not self.started_typing:
+            new_state = self.prev_state or "idle"
+
+        # Milestones first: a late wakeup still pays out the focus time it covered
+        for milestone in self.focus.due(now, self.last_input_time):
+            self._grant_milestone(milestone)
+
+        # Handle state change
+        if new_state != self.prev_state:
+            print(f"[STATE CHANGE] {self.prev_state} → {new_state}")
+            self.state_manager.set_state(new_state)
+            self.prev_state = new_state
+            self.last_focus_state_change = now
+
+            if new_state == "sleeping":
+                self._speak_ai(PROMPTS["sleepy"], state="sleeping")
+                self.focus.end_focus()
+
+            elif new_state == "idle":
+                self._speak_ai(PROMPTS["idle"], state="idle")
+                self.focus.end_focus()
+
+            elif new_state == "focused" and self.started_typing:
+                self._speak_ai(PROMPTS["back_to_work"], state="focused")
+                self._start_focus(now)
+
+        elif new_state == "focused" and self.started_typing and self.focus.focus_start is None:
+            self._start_focus(now)
+
+    # -------------------------------------------------
+    # FOCUS REWARD SYSTEM
+    # -------------------------------------------------
+    def _grant_milestone(self, milestone):
+        print(f"[MILESTONE] {milestone['id']}")
+        if milestone.get("xp"):
+            self.rewards.add_xp(milestone["xp"])
+        if milestone.get("streak"):
+            self.rewards.add_streak(milestone["streak"])
+        if milestone.get("quest"):
+            self.rewards.complete_quest(milestone["quest"])
+
+        # Transient states (happy) return to focused on their own
+        if milestone.get("state"):
+            self.state_manager.set_state(milestone["state"])
+
+        prompt = PROMPTS.get(milestone.get("prompt", milestone["id"]))
+        if prompt:
+            self._speak_ai(prompt, priority=MILESTONE)
 
     # -------------------------------------------------
     # SPEECH WRAPPER (COOLDOWN)
     # -------------------------------------------------
-    def _speak_ai(self, prompt):
-        now = time.time()
+    def _speak_ai(self, prompt, priority=AMBIENT, state=None):
+        """Show a line for prompt; state-bound lines are dropped once the state moves on."""
+        if self.response_pool is None:
+            return  # LLM stage not up yet
+        if self.in_meeting and CALENDAR_QUIET:
+            return
+        now = self.now()
         if now - self.last_talk_time < 10:
             return
         self.last_talk_time = now
 
-        threading.Thread(
-            target=self._show_ai_line,
-            args=(prompt,),
-            daemon=True
-        ).start()
+        # Pre-generated line → show instantly
+        line = self.response_pool.get(prompt)
+        if line:
+            print("AI OUTPUT (pool):", line)
+            self.state_manager.app_ref.speech.show(line)
+            return
+
+        # Power saving: ambient lines don't start a generation
+        if priority >= AMBIENT and not self.llm_ambient:
+            line = CANNED_BY_PROMPT.get(prompt)
+            if line:
+                self.state_manager.app_ref.speech.show(line)
+            return
+
+        is_relevant = None
+        if state is not None:
+            is_relevant = lambda: self.state_manager.get_state() == state
+
+        self.ai_queue.submit(
+            lambda: self.ollama.generate(prompt),
+            priority=priority,
+            key=prompt,
+            on_done=lambda msg: self._show_ai_line(prompt, msg),
+            is_relevant=is_relevant,
+        )
 
     # -------------------------------------------------
-    # OLLAMA CALL
+    # OLLAMA RESULT
     # -------------------------------------------------
-    def _show_ai_line(self, prompt):
-        try:
-            msg = self.ollama.generate(prompt)
-            if msg and len(msg.strip()) > 0:
-                print("AI OUTPUT:", msg)
-                self.state_manager.app_ref.speech.show(msg)
-        except Exception as e:
-            print("Ollama error:", e)
+    def _show_ai_line(self, prompt, msg):
+        if msg and len(msg.strip()) > 0:
+            print("AI OUTPUT:", msg)
+            self.state_manager.app_ref.speech.show(msg)
+            self.response_pool.add(prompt, msg)
 
     # -------------------------------------------------
     # STOP EVERYTHING
     # -------------------------------------------------
     def stop(self):
         self.running = False
-        try:
-            self.listener.stop()
-        except:
-            pass
-        try:
-            self.face_detector.stop()
-        except:
-            pass
-            
+        self.wakeup.set()
+        # Each part on its own: one that never started (None) or fails to
+        # stop must not keep the rest running
+        for name, part, method in [
+            ("response pool", self.response_pool, "stop"),
+            ("AI queue", self.ai_queue, "stop"),
+            ("rewards", self.rewards, "flush"),
+            ("keyboard listener", self.listener, "stop"),
+            ("mouse listener", self.mouse_listener, "stop"),
+            ("face detector", self.face_detector, "stop"),
+            ("governor", self.governor, "stop"),
+            ("calendar", self.calendar, "stop"),
+        ]:
+            if part is None:
+                continue
+            try:
+                getattr(part, method)()
+            except Exception as e:
+                print(f"[SIGNALS] Error stopping {name}:", e)
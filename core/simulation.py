@@ -0,0 +1,462 @@
+"""Headless replay of activity traces on a virtual clock.
+
+    python -m core.simulation trace.jsonl [--json out.json] [--verbose]
+    python -m core.simulation --workday [--json out.json]
+
+Runs the real Signals, StateManager, FocusEngine, FaceReactions and
+RewardsManager with no UI, camera, keyboard hook or LLM: time comes from a
+VirtualClock, timers from a VirtualScheduler, speech is recorded instead of
+shown and AI jobs return canned lines immediately. Rewards go to a throwaway
+data directory. The output is the state timeline, the reward ledger (from
+the event store), the focus milestones and session ends, and every line the
+pet said.
+
+A trace is JSON lines, `t` in seconds from the start of the run:
+
+    {"t": 0, "event": "typing", "for": 61, "kps": 4}
+    {"t": 240, "event": "smile"}
+    {"t": 300, "event": "face", "present": false, "for": 30}
+    {"t": 400, "event": "key"}
+    {"t": 405, "event": "mouse", "for": 20, "hz": 100}
+    {"t": 410, "event": "pat"}
+    {"t": 420, "event": "meeting", "for": 120, "title": "Standup"}
+    {"t": 600, "event": "end"}
+
+typing presses `kps` keys a second for `for` seconds; mouse sends `hz`
+raw move events a second for `for` seconds (one if no `for`); face sends one
+detection (`present`, `smiled`), or one per `every` seconds for `for`
+seconds; smile is three smiling detections in a row; meeting puts a
+calendar meeting of `for` seconds on the pet's calendar. Without an end event
+the run goes on until the pet has settled after the last event.
+"""
+import argparse
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from config import SLEEP_AFTER
+from core.calendar_index import Calendar, IntervalIndex
+from core.face_reactions import FaceReactions
+from core.scheduler import ScheduledCall
+from core.signals import Signals
+from core.state_manager import StateManager
+from rewards.rewards_manager import RewardsManager
+
+LEDGER_TYPES = ["xp_gained", "level_up", "streak_changed", "quest_completed"]
+
+
+def _monday_9am():
+    # A fixed weekday morning, so day boundaries and daily totals are repeatable
+    return datetime(2024, 1, 8, 9, 0).timestamp()
+
+
+# -------------------------------------------------
+# VIRTUAL TIME
+# -------------------------------------------------
+class VirtualClock:
+    """Stands in for the time module: time() and monotonic() read the same value."""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else _monday_9am()
+        self.t = self.start
+
+    def time(self):
+        return self.t
+
+    monotonic = time
+
+    def set(self, t):
+        self.t = max(self.t, t)
+
+
+class VirtualScheduler:
+    """Scheduler interface on a VirtualClock; the simulation runs due calls."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.heap = []
+        self._seq = itertools.count()
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def call_later(self, delay, fn, *args):
+        return self.call_at(self.clock.monotonic() + delay, fn, *args)
+
+    def call_at(self, when, fn, *args):
+        call = ScheduledCall(when, fn, args)
+        heapq.heappush(self.heap, (when, next(self._seq), call))
+        return call
+
+    def next_time(self):
+        while self.heap and self.heap[0][2].cancelled:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def run_next(self):
+        when, _, call = heapq.heappop(self.heap)
+        self.clock.set(when)
+        call.fn(*call.args)
+
+
+# -------------------------------------------------
+# STUBS (speech, AI)
+# -------------------------------------------------
+class SpeechLog:
+    def __init__(self, clock):
+        self.clock = clock
+        self.lines = []   # (t, text)
+
+    def show(self, text):
+        self.lines.append((self.clock.time(), text))
+
+
+class StubOllama:
+    model = "simulation"
+
+    def generate(self, prompt):
+        return f"<{prompt[:40]}>"
+
+
+class StubPool:
+    """ResponsePool that always has a line ready."""
+
+    def __init__(self):
+        self.paused = False
+        self.wakeup = threading.Event()
+
+    def get(self, prompt):
+        return f"<{prompt[:40]}>"
+
+    def add(self, prompt, text):
+        pass
+
+    def stop(self):
+        pass
+
+
+class ImmediateQueue:
+    """AIJobQueue that runs each job at once, on the caller's thread."""
+
+    def submit(self, fn, priority=None, key=None, on_done=None, is_relevant=None):
+        if is_relevant is not None and not is_relevant():
+            return None
+        result = fn()
+        if on_done is not None:
+            on_done(result)
+        return None
+
+    def stop(self):
+        pass
+
+
+# -------------------------------------------------
+# SIMULATION
+# -------------------------------------------------
+class Simulation:
+    def __init__(self, data_dir=None, start=None):
+        self.clock = VirtualClock(start)
+        self.scheduler = VirtualScheduler(self.clock)
+        self.temp_dir = None
+        if data_dir is None:
+            data_dir = self.temp_dir = tempfile.mkdtemp(prefix="pet-sim-")
+
+        # StateManager reaches the speech bubble through app_ref.speech
+        self.speech = SpeechLog(self.clock)
+        self.state_manager = StateManager(self.scheduler)
+        self.state_manager.app_ref = self
+
+        self.signals = Signals(self.state_manager, clock=self.clock)
+        self.signals.rewards = RewardsManager(data_dir, clock=self.clock)
+        self.signals.ollama = StubOllama()
+        self.signals.ai_queue = ImmediateQueue()
+        self.signals.response_pool = StubPool()
+        self.reactions = FaceReactions(
+            self.state_manager, self.signals.ollama, self.signals.ai_queue, clock=self.clock
+        )
+
+        self.timeline = []   # (t, old_state, new_state)
+        self.state_manager.subscribe(
+            lambda old, new: self.timeline.append((self.clock.time(), old, new))
+        )
+        # Focus sessions as the monitor sees them: a transient state (happy)
+        # can hide the idle that ended one from the timeline
+        self.milestones = []   # (t, milestone id)
+        self.focus_ends = []   # t
+        grant, end_focus = self.signals._grant_milestone, self.signals.focus.end_focus
+
+        def record_milestone(milestone):
+            self.milestones.append((self.clock.time(), milestone["id"]))
+            grant(milestone)
+
+        def record_end():
+            if self.signals.focus.focus_start is not None:
+                self.focus_ends.append(self.clock.time())
+            end_focus()
+        self.signals._grant_milestone = record_milestone
+        self.signals.focus.end_focus = record_end
+
+        # monitor_activity waits 3 s before its first pass
+        self.deadline = self.clock.time() + 3
+        self.ticks = 0
+
+    # -------------------------------------------------
+    # DRIVING TIME
+    # -------------------------------------------------
+    def advance_to(self, t):
+        """Run timers and monitor passes due up to absolute time t, in order."""
+        while True:
+            timer = self.scheduler.next_time()
+            deadline = self.deadline
+            if timer is not None and timer <= t and (deadline is None or timer <= deadline):
+                self.scheduler.run_next()
+            elif deadline is not None and deadline <= t:
+                self._tick(deadline)
+            else:
+                break
+        self.clock.set(t)
+
+    def _tick(self, now):
+        self.clock.set(now)
+        self.ticks += 1
+        self.deadline = self.signals.tick(now)
+
+    # -------------------------------------------------
+    # INPUT EVENTS
+    # -------------------------------------------------
+    def key(self, t):
+        self.advance_to(t)
+        self.signals.on_key_press(None)
+        # What the monitor thread does when a key sets wakeup
+        if self.signals.wakeup.is_set():
+            self.signals.wakeup.clear()
+            self._tick(t)
+
+    def mouse(self, t):
+        self.advance_to(t)
+        self.signals.mouse.touch()
+        if self.signals.wakeup.is_set():
+            self.signals.wakeup.clear()
+            self._tick(t)
+
+    def face(self, t, present=True, smiled=None):
+        self.advance_to(t)
+        self.reactions.update(present, smiled, t)
+
+    def pat(self, t):
+        self.advance_to(t)
+        self.state_manager.trigger_pat()
+
+    def run(self, events):
+        """Replay trace events (t relative to the start); returns the end time."""
+        base = self.clock.start
+        end = None
+        last = 0.0
+        meetings = [(base + e["t"], base + e["t"] + e["for"], e.get("title", "Meeting"))
+                    for e in events if e["event"] == "meeting"]
+        if meetings:
+            self.signals.calendar = Calendar(paths=[], clock=self.clock)
+            self.signals.calendar.index = IntervalIndex(meetings)
+        for event in sorted(events, key=lambda e: e["t"]):
+            t = base + event["t"]
+            kind = event["event"]
+            if kind == "typing":
+                kps = event.get("kps", 4)
+                for i in range(int(event["for"] * kps)):
+                    self.key(t + i / kps)
+                last = max(last, event["t"] + event["for"])
+            elif kind == "key":
+                self.key(t)
+            elif kind == "mouse":
+                hz = event.get("hz", 100)
+                for i in range(max(1, int(event.get("for", 0) * hz))):
+                    self.mouse(t + i / hz)
+                last = max(last, event["t"] + event.get("for", 0))
+            elif kind == "face":
+                every = event.get("every", 1.0)
+                for i in range(max(1, int(event.get("for", 0) / every))):
+                    self.face(t + i * every, event.get("present", True), event.get("smiled"))
+                last = max(last, event["t"] + event.get("for", 0))
+            elif kind == "smile":
+                for i in range(3):
+                    self.face(t + i * 0.5, True, True)
+            elif kind == "pat":
+                self.pat(t)
+            elif kind == "meeting":
+                last = max(last, event["t"] + event["for"])
+            elif kind == "end":
+                end = event["t"]
+                break
+            else:
+                raise ValueError(f"Unknown trace event: {kind}")
+            last = max(last, event["t"])
+
+        # Let the idle/sleep thresholds play out after the last input
+        end = end if end is not None else last + SLEEP_AFTER + 5
+        self.advance_to(base + end)
+        return end
+
+    # -------------------------------------------------
+    # RESULTS
+    # -------------------------------------------------
+    def results(self):
+        base = self.clock.start
+        rewards = self.signals.rewards
+        rewards.flush()
+        ledger = rewards.store.history(base, self.clock.time() + 1, types=LEDGER_TYPES)
+        return {
+            "start": datetime.fromtimestamp(base).isoformat(),
+            "duration": self.clock.time() - base,
+            "monitor_ticks": self.ticks,
+            "timeline": [
+                {"t": round(t - base, 3), "from": old, "to": new}
+                for t, old, new in self.timeline
+            ],
+            "ledger": [
+                {"t": round(ts - base, 3), "type": type_, "value": value, "data": data}
+                for ts, type_, value, data in ledger
+            ],
+            "milestones": [{"t": round(t - base, 3), "id": id_} for t, id_ in self.milestones],
+            "focus_ends": [round(t - base, 3) for t in self.focus_ends],
+            "speech": [{"t": round(t - base, 3), "text": text} for t, text in self.speech.lines],
+            "stats": dict(rewards.stats),
+            "quests": dict(rewards.quests),
+        }
+
+    def close(self):
+        self.signals.rewards.flush()
+        self.signals.rewards.store.engine.dispose()
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def simulate(events, verbose=False):
+    """Replay events in a fresh Simulation and return its results dict."""
+    sim = Simulation()
+    try:
+        if verbose:
+            sim.run(events)
+        else:
+            # Signals and RewardsManager print every transition and reward
+            with contextlib.redirect_stdout(io.StringIO()):
+                sim.run(events)
+        return sim.results()
+    finally:
+        sim.close()
+
+
+# -------------------------------------------------
+# TRACES
+# -------------------------------------------------
+def load_trace(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def workday_trace(seed=1):
+    """An 8 h day: typing blocks with reading pauses (some with mouse use), breaks,
+    smiles and a lunch."""
+    rng = random.Random(seed)
+    events, t = [], 0.0
+    lunch_done = False
+    while t < 8 * 3600:
+        # A block of work: bursts of typing with reading pauses in between
+        block_end = t + rng.uniform(20, 50) * 60
+        while t < block_end:
+            burst = rng.uniform(10, 90)
+            events.append({"t": round(t, 3), "event": "typing", "for": round(burst, 3),
+                           "kps": rng.choice([2, 3, 4, 6])})
+            pause = rng.choice([rng.uniform(1, 15), rng.uniform(15, 60)])
+            if pause > 20 and rng.random() < 0.5:
+                # Reading: scrolling and pointing, no keys
+                events.append({"t": round(t + burst + 2, 3), "event": "mouse",
+                               "for": round(pause - 4, 3), "hz": 30})
+            t += burst + pause
+            if rng.random() < 0.05:
+                events.append({"t": round(t, 3), "event": "smile"})
+                t += 2
+        # Break: away from the desk, lunch once around midday
+        if not lunch_done and t > 3.5 * 3600:
+            away, lunch_done = 3600, True
+        else:
+            away = rng.uniform(2, 15) * 60
+        events.append({"t": round(t, 3), "event": "face", "present": False, "for": 30, "every": 5})
+        if rng.random() < 0.3:
+            events.append({"t": round(t + away - 5, 3), "event": "pat"})
+        t += away
+    events.append({"t": round(t, 3), "event": "end"})
+    return events
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def _clock(seconds):
+    seconds = int(seconds)
+    return f"+{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def print_results(results, limit=40):
+    timeline, ledger, speech = results["timeline"], results["ledger"], results["speech"]
+    print(f"Simulated {_clock(results['duration'])} from {results['start']} "
+          f"({results['monitor_ticks']} monitor passes)")
+
+    print(f"\nState timeline ({len(timeline)} changes)")
+    for row in timeline[:limit]:
+        print(f"  {_clock(row['t'])}  {row['from']:>9} → {row['to']}")
+    if len(timeline) > limit:
+        print(f"  ... {len(timeline) - limit} more")
+
+    print(f"\nReward ledger ({len(ledger)} entries)")
+    for row in ledger[:limit]:
+        detail = f"  {row['data']}" if row["data"] else ""
+        print(f"  {_clock(row['t'])}  {row['type']:<16} {row['value']:>4}{detail}")
+    if len(ledger) > limit:
+        print(f"  ... {len(ledger) - limit} more")
+
+    print(f"\nSpeech ({len(speech)} lines)")
+    for row in speech[:limit]:
+        print(f"  {_clock(row['t'])}  {row['text']}")
+    if len(speech) > limit:
+        print(f"  ... {len(speech) - limit} more")
+
+    print(f"\nStats {results['stats']}")
+    print(f"Quests {results['quests']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay an activity trace headlessly.")
+    parser.add_argument("trace", nargs="?", help="JSON-lines trace file")
+    parser.add_argument("--workday", action="store_true", help="generate an 8 h workday trace")
+    parser.add_argument("--json", help="write the full results to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's own log output")
+    args = parser.parse_args(argv)
+    if not args.trace and not args.workday:
+        parser.error("give a trace file or --workday")
+
+    events = workday_trace() if args.workday else load_trace(args.trace)
+    start = time.perf_counter()
+    results = simulate(events, verbose=args.verbose)
+    elapsed = time.perf_counter() - start
+
+    print_results(results)
+    print(f"\nReplayed {len(events)} trace events in {elapsed * 1000:.0f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
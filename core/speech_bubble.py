@@ -1,8 +1,9 @@
 import tkinter as tk
 
 class SpeechBubble:
-    def __init__(self, root):
+    def __init__(self, root, ui):
         self.root = root
+        self.ui = ui  # UIQueue: show() may be called from any thread
         self.label = tk.Label(
             root,
             text="",
@@ -17,9 +18,16 @@ class SpeechBubble:
             wraplength=120       # ← controls max bubble width
         )
         self.visible = False
+        self.hide_id = None
 
     def show(self, message, duration=4000):
-        """Display the speech bubble with wrapped text."""
+        """Display the speech bubble with wrapped text (from any thread).
+
+        Lines posted within one UI tick coalesce: only the newest is shown.
+        """
+        self.ui.post(self._show, message, duration, key=("speech", id(self)))
+
+    def _show(self, message, duration):
         self.label.config(text=message)
         self.label.lift()
 
@@ -27,10 +35,13 @@ class SpeechBubble:
         self.label.place(x=10, y=10)
         self.visible = True
 
-        # Auto-hide after duration
-        self.root.after(duration, self.hide)
+        # Auto-hide after duration; an older line's timer must not hide this one
+        if self.hide_id is not None:
+            self.root.after_cancel(self.hide_id)
+        self.hide_id = self.root.after(duration, self.hide)
 
     def hide(self):
+        self.hide_id = None
         if self.visible:
             self.label.place_forget()
             self.visible = False
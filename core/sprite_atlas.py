@@ -0,0 +1,242 @@
+"""Packs a skin folder into one pre-scaled RGBA atlas plus a JSON index.
+
+Layout on disk (in ATLAS_CACHE_DIR), <id> being the skin folder's name plus
+a hash of its absolute path, so same-named skins in different roots never
+share a cache:
+    <id>.<key>.atlas   raw RGBA frames back to back, SPRITE_SIZE each
+    <id>.atlas.json    {"key", "file", "size", "states": {state: {"offsets", "durations"}}}
+
+Every build writes a new <key> file and then points the index at it, so a
+rebuild never replaces an atlas another process still has memory-mapped
+(which Windows refuses); stale files are removed once nothing maps them.
+
+A state is a folder of PNG frames, or a source declared in the optional
+skin manifest (<skin>/skin.json):
+
+    {
+        "default_duration": 80,
+        "states": {
+            "idle":  {"durations": [1500, 120, 120]},
+            "pat":   {"duration": 80},
+            "wave":  {"source": "wave.gif"},
+            "walk":  {"source": "walk.png", "frames": 4}
+        }
+    }
+
+"source" may be an animated GIF/APNG (its own frame delays are used unless
+overridden) or, with "frames", a horizontal spritesheet. Durations are ms.
+
+The key is a hash of every source file's path, size and mtime, so the atlas
+is rebuilt only when the skin folder changes. Build ahead of time with:
+
+    python -m core.sprite_atlas skins/default [skins/other ...]
+"""
+import hashlib
+import json
+import mmap
+import os
+import sys
+
+from PIL import Image, ImageSequence
+
+from config import ATLAS_CACHE_DIR, SPRITE_SIZE, FPS
+
+ATLAS_VERSION = 2
+MANIFEST = "skin.json"
+
+
+def read_manifest(skin_path):
+    try:
+        with open(os.path.join(skin_path, MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def list_frames(skin_path, manifest=None):
+    """Return {state: [source path, ...]} for a skin folder."""
+    manifest = manifest if manifest is not None else read_manifest(skin_path)
+    states = {}
+    for state_name in sorted(os.listdir(skin_path)):
+        state_folder = os.path.join(skin_path, state_name)
+        if os.path.isdir(state_folder):
+            states[state_name] = [
+                os.path.join(state_folder, file)
+                for file in sorted(os.listdir(state_folder))
+                if file.endswith(".png")
+            ]
+    for state_name, spec in manifest.get("states", {}).items():
+        if "source" in spec:
+            states[state_name] = [os.path.join(skin_path, spec["source"])]
+    return states
+
+
+def source_key(skin_path, states=None):
+    """Hash of every source file's relative path, size and mtime (plus SPRITE_SIZE)."""
+    states = states if states is not None else list_frames(skin_path)
+    digest = hashlib.sha1(repr((ATLAS_VERSION, SPRITE_SIZE)).encode())
+    paths = [os.path.join(skin_path, MANIFEST)]
+    for state_paths in states.values():
+        paths.extend(state_paths)
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        rel = os.path.relpath(path, skin_path)
+        digest.update(f"{rel}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def scale_frame(img):
+    return img.convert("RGBA").resize(SPRITE_SIZE, Image.NEAREST)  # keep pixel crisp
+
+
+def load_frame(path):
+    """Decode and scale one PNG the way the animator expects."""
+    return scale_frame(Image.open(path))
+
+
+def decode_state(paths, spec, default_duration=FPS):
+    """Return ([PIL.Image, ...], [duration ms, ...]) for one state."""
+    images, durations = [], []
+    if "source" in spec:
+        src = Image.open(paths[0])
+        if "frames" in spec:
+            # Horizontal spritesheet
+            count = spec["frames"]
+            width = src.width // count
+            for i in range(count):
+                images.append(scale_frame(src.crop((i * width, 0, (i + 1) * width, src.height))))
+                durations.append(default_duration)
+        else:
+            # Animated GIF / APNG (a still image is just one frame)
+            for frame in ImageSequence.Iterator(src):
+                images.append(scale_frame(frame))
+                durations.append(frame.info.get("duration") or default_duration)
+    else:
+        images = [load_frame(path) for path in paths]
+        durations = [default_duration] * len(images)
+
+    if "duration" in spec:
+        durations = [spec["duration"]] * len(images)
+    if spec.get("durations"):  # an empty list keeps the defaults above
+        durations = [spec["durations"][i % len(spec["durations"])] for i in range(len(images))]
+    return images, [max(1, int(d)) for d in durations]
+
+
+def atlas_paths(skin_path, cache_dir=ATLAS_CACHE_DIR, key=""):
+    """Return (atlas data file for `key`, index file) of a skin."""
+    skin_path = os.path.abspath(skin_path)
+    name = os.path.basename(os.path.normpath(skin_path))
+    path_hash = hashlib.sha1(os.path.normcase(skin_path).encode()).hexdigest()[:10]
+    base = os.path.join(cache_dir, f"{name}-{path_hash}")
+    return f"{base}.{key[:16]}.atlas", base + ".atlas.json"
+
+
+def _remove_stale(skin_path, cache_dir, keep):
+    # Older builds of this skin; one still mapped elsewhere (Windows) stays until next time
+    prefix = os.path.basename(atlas_paths(skin_path, cache_dir)[1])[:-len("atlas.json")]
+    for file in os.listdir(cache_dir):
+        if file.startswith(prefix) and file.endswith(".atlas") and file != keep:
+            try:
+                os.remove(os.path.join(cache_dir, file))
+            except OSError:
+                pass
+
+
+def build_atlas(skin_path, cache_dir=ATLAS_CACHE_DIR, states=None, key=None):
+    """Decode every frame of a skin and write its atlas + index."""
+    manifest = read_manifest(skin_path)
+    states = states if states is not None else list_frames(skin_path, manifest)
+    key = key or source_key(skin_path, states)
+    specs = manifest.get("states", {})
+    default_duration = manifest.get("default_duration", FPS)
+    atlas_file, index_file = atlas_paths(skin_path, cache_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    index = {"key": key, "file": os.path.basename(atlas_file), "size": list(SPRITE_SIZE),
+             "states": {}}
+    offset = 0
+    with open(atlas_file + ".tmp", "wb") as f:
+        for state_name, paths in states.items():
+            images, durations = decode_state(paths, specs.get(state_name, {}), default_duration)
+            offsets = []
+            for img in images:
+                data = img.tobytes()
+                f.write(data)
+                offsets.append(offset)
+                offset += len(data)
+            index["states"][state_name] = {"offsets": offsets, "durations": durations}
+
+    # Index last: a crash in between leaves a stale key → rebuild next time.
+    # The atlas name is new for this key, so nothing has it mapped.
+    os.replace(atlas_file + ".tmp", atlas_file)
+    with open(index_file + ".tmp", "w") as f:
+        json.dump(index, f)
+    os.replace(index_file + ".tmp", index_file)
+    _remove_stale(skin_path, cache_dir, keep=index["file"])
+    return index
+
+
+def _read_index(index_file):
+    try:
+        with open(index_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SkinAtlas:
+    """A skin's memory-mapped atlas; frames are PIL views created on demand."""
+
+    def __init__(self, skin_path, cache_dir=ATLAS_CACHE_DIR):
+        self.skin_path = skin_path
+        states = list_frames(skin_path)
+        key = source_key(skin_path, states)
+        atlas_file, index_file = atlas_paths(skin_path, cache_dir, key)
+
+        index = _read_index(index_file)
+        if (not index or index.get("key") != key or index.get("size") != list(SPRITE_SIZE)
+                or not os.path.exists(atlas_file)):
+            print(f"[Atlas] Building {atlas_file}")
+            index = build_atlas(skin_path, cache_dir, states, key)
+
+        self.index = index["states"]
+        self.frame_bytes = SPRITE_SIZE[0] * SPRITE_SIZE[1] * 4
+        self.buf = None
+        if os.path.getsize(atlas_file) > 0:
+            with open(atlas_file, "rb") as f:
+                self.buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def states(self):
+        return list(self.index)
+
+    def frames(self, state_name):
+        """Return [PIL.Image, ...] for one state (empty if the skin lacks it)."""
+        entry = self.index.get(state_name, {"offsets": []})
+        return [
+            Image.frombuffer("RGBA", SPRITE_SIZE, self.buf[offset:offset + self.frame_bytes],
+                             "raw", "RGBA", 0, 1)
+            for offset in entry["offsets"]
+        ]
+
+    def durations(self, state_name):
+        """Return per-frame durations in ms for one state."""
+        return self.index.get(state_name, {"durations": []})["durations"]
+
+
+def load_atlas(skin_path, cache_dir=ATLAS_CACHE_DIR):
+    """Return {state: [PIL.Image, ...]} for a skin, rebuilding the atlas if stale.
+
+    Frames are views over a memory-mapped atlas file, so nothing is decoded.
+    """
+    atlas = SkinAtlas(skin_path, cache_dir)
+    return {state_name: atlas.frames(state_name) for state_name in atlas.states()}
+
+
+if __name__ == "__main__":
+    for skin in sys.argv[1:]:
+        index = build_atlas(skin)
+        frames = sum(len(entry["offsets"]) for entry in index["states"].values())
+        print(f"[Atlas] {skin}: {frames} frames → {os.path.join(ATLAS_CACHE_DIR, index['file'])}")
@@ -0,0 +1,115 @@
+"""Staged startup: the window and first frame first, everything else after.
+
+StartupProfiler times named stages and the imports made inside them. With
+install(), builtins.__import__ is wrapped: each stage gets its total import
+time (outermost imports on its thread) and the inclusive load time of every
+package first loaded in it, which is where deferred heavy modules (cv2,
+sqlalchemy, requests, ttkbootstrap) show up.
+"""
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from config import STARTUP_TARGET
+
+
+class StartupProfiler:
+    def __init__(self, target=STARTUP_TARGET):
+        self.target = target
+        self.t0 = time.perf_counter()
+        self.stages = []      # {"name", "thread", "start", "end", "imports": s, "packages": {name: s}}
+        self.marks = {}       # name -> seconds since t0
+        self.local = threading.local()
+        self._import = None
+
+    # -------------------------------------------------
+    # IMPORT TIMING
+    # -------------------------------------------------
+    def install(self):
+        self._import = builtins.__import__
+        real_import = self._import
+        local = self.local
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            stage = getattr(local, "stage", None)
+            package = name.split(".")[0]
+            if stage is None or level or (package in sys.modules and getattr(local, "depth", 0)):
+                return real_import(name, globals, locals, fromlist, level)
+
+            # First load of a package: inclusive time per package; the
+            # outermost import on this thread also counts toward the total
+            fresh = package not in sys.modules
+            local.depth = getattr(local, "depth", 0) + 1
+            start = time.perf_counter()
+            try:
+                return real_import(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                local.depth -= 1
+                if fresh:
+                    stage["packages"][package] = stage["packages"].get(package, 0) + elapsed
+                if local.depth == 0:
+                    stage["imports"] += elapsed
+
+        builtins.__import__ = timed_import
+
+    def uninstall(self):
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    # -------------------------------------------------
+    # STAGES
+    # -------------------------------------------------
+    @contextmanager
+    def stage(self, name):
+        record = {"name": name, "thread": threading.current_thread().name,
+                  "start": time.perf_counter() - self.t0, "end": None,
+                  "imports": 0.0, "packages": {}}
+        self.stages.append(record)
+        outer = getattr(self.local, "stage", None)
+        self.local.stage = record
+        try:
+            yield record
+        finally:
+            self.local.stage = outer
+            record["end"] = time.perf_counter() - self.t0
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+        return self.marks[name]
+
+    def report(self):
+        print(f"{'stage':<14} {'thread':<12} {'start':>8} {'wall':>8} {'imports':>8}  heaviest imports")
+        for s in self.stages:
+            wall = (s["end"] or s["start"]) - s["start"]
+            packages = sorted(s["packages"].items(), key=lambda kv: -kv[1])
+            heavy = ", ".join(f"{m} {t * 1000:.0f}" for m, t in packages[:4] if t >= 0.001)
+            print(f"{s['name']:<14} {s['thread'][:12]:<12} {s['start'] * 1000:7.0f}ms "
+                  f"{wall * 1000:7.0f}ms {s['imports'] * 1000:7.0f}ms  {heavy}")
+        for name, t in self.marks.items():
+            print(f"{name:<14} at {t * 1000:.0f} ms")
+        first = self.marks.get("first_frame")
+        if first is not None:
+            verdict = "OK" if first <= self.target else "OVER TARGET"
+            print(f"time to first frame {first * 1000:.0f} ms (target {self.target * 1000:.0f} ms) {verdict}")
+
+
+def run_stages(stages, profiler, on_done=None):
+    """Run (name, fn) stages in order on one background thread."""
+    def run():
+        for name, fn in stages:
+            with profiler.stage(name):
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"[STARTUP] Stage '{name}' failed:", e)
+        if on_done:
+            on_done()
+
+    thread = threading.Thread(target=run, name="startup", daemon=True)
+    thread.start()
+    return thread
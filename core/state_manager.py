@@ -1,34 +1,104 @@
 import threading
 import time
 
+from config import HAPPY_DURATION, PAT_DURATION
+from core.metrics import SECONDS_BUCKETS, registry
+from core.scheduler import Scheduler
+
+# Short reactions that end on their own, back to the state underneath
+TRANSIENT_STATES = {"happy": HAPPY_DURATION, "pat": PAT_DURATION}
+
+
 class StateManager:
-    def __init__(self):
+    def __init__(self, scheduler=None, name=None):
+        self.lock = threading.RLock()
         self.state = "idle"
-        self.previous_state = "idle"
+        self.previous_state = "idle"  # state to return to after a transient one
         self.app_ref = None
 
-    def set_state(self, new_state):
-        # Don't auto override pat reaction
+        self.scheduler = scheduler or Scheduler().start()
+        self.transient_timer = None
+        self.transient_token = None
+        self.subscribers = []
 
-        if new_state == "happy":
-            self.state = "happy"
-            threading.Thread(target=self._return_to_idle, daemon=True).start()
-        else:
-            self.state = new_state
+        # Diagnostics: how long each state lasts (extra pets are labelled by name)
+        self.labels = {"pet": name} if name else {}
+        self.entered = time.monotonic()
+        self.changes = registry.counter("state_changes_total", "Pet state transitions", **self.labels)
+        registry.gauge("state_age_seconds", "Time in the current state",
+                       fn=lambda: round(time.monotonic() - self.entered, 1), **self.labels)
 
-    def trigger_pat(self):
-        self.previous_state = self.state
-        self.state = "pat"
-        threading.Thread(target=self._pat_animation_duration, daemon=True).start()
+    def subscribe(self, callback):
+        """Call callback(old_state, new_state) whenever the state changes.
 
-    def _pat_animation_duration(self):
-        time.sleep(1.2)  # pat lasts 1.2 sec
-        self.state = self.previous_state
+        Runs on whichever thread caused the change; keep it short.
+        """
+        self.subscribers.append(callback)
 
-    def _return_to_idle(self):
-        time.sleep(4)
-        self.state = "idle"
+    def set_state(self, new_state):
+        with self.lock:
+            if new_state in TRANSIENT_STATES:
+                self._start_transient(new_state)
+                change = self._apply(new_state)
+            # Don't auto override a pat/happy reaction: just change where it returns to
+            elif self.transient_timer is not None:
+                self.previous_state = new_state
+                change = None
+            else:
+                change = self._apply(new_state)
+        self._notify(change)
+
+    def trigger_pat(self):
+        self.set_state("pat")
 
     def get_state(self):
         return self.state
-      
+
+    # -------------------------------------------------
+    # TRANSIENT STATES (cancellable deadlines)
+    # -------------------------------------------------
+    def _start_transient(self, state):
+        if self.transient_timer is not None:
+            self.transient_timer.cancel()
+        elif self.state not in TRANSIENT_STATES:
+            self.previous_state = self.state
+        # The token exists before the timer can fire, so the callback can
+        # always tell whether it is still the current reaction
+        token = object()
+        self.transient_token = token
+        self.transient_timer = self.scheduler.call_later(
+            TRANSIENT_STATES[state], self._end_transient, token)
+
+    def _end_transient(self, token):
+        with self.lock:
+            # A newer reaction replaced this one
+            if token is not self.transient_token:
+                return
+            self.transient_token = None
+            self.transient_timer = None
+            change = self._apply(self.previous_state)
+        self._notify(change)
+
+    def _apply(self, new_state):
+        """Switch state (lock held); returns (old, new, subscribers) to notify, or None."""
+        old_state = self.state
+        if new_state == old_state:
+            return None
+        self.state = new_state
+        now = time.monotonic()
+        registry.histogram("state_dwell_seconds", SECONDS_BUCKETS, "Time spent in a state",
+                           state=old_state, **self.labels).observe(now - self.entered)
+        self.entered = now
+        self.changes.inc()
+        return old_state, new_state, list(self.subscribers)
+
+    def _notify(self, change):
+        # Outside the lock: subscribers post to the UI, speak, write rewards...
+        if change is None:
+            return
+        old_state, new_state, subscribers = change
+        for callback in subscribers:
+            try:
+                callback(old_state, new_state)
+            except Exception as e:
+                print("State subscriber error:", e)
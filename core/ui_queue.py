@@ -0,0 +1,102 @@
+"""Run UI work posted from any thread on the Tk thread.
+
+Tkinter is not thread-safe, but speech lines and chat replies come from
+AI workers, the face detector and the signals monitor. Those threads only
+post() here; one `after` pump on the Tk thread runs the commands, up to a
+time budget per tick so a flood never freezes the main loop. Commands that
+share a key coalesce: the newest replaces any queued one.
+
+Only the Tk thread calls `after`: posting never touches Tk, so a worker
+never waits on the main loop (or fails when it isn't running). The pump
+polls every `interval` ms while commands flow and backs off, doubling, to
+`idle_interval` when the queue stays empty.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from config import UI_PUMP_BUDGET, UI_PUMP_IDLE, UI_PUMP_INTERVAL
+from core.metrics import registry
+
+
+class UIQueue:
+    def __init__(self, root, interval=UI_PUMP_INTERVAL, idle_interval=UI_PUMP_IDLE,
+                 budget=UI_PUMP_BUDGET):
+        self.root = root
+        self.interval = interval            # ms between ticks while busy
+        self.idle_interval = idle_interval  # ms between ticks when quiet
+        self.budget = budget / 1000         # seconds of work per tick
+        self.delay = interval
+
+        self.lock = threading.Lock()
+        self.commands = OrderedDict()  # key -> (fn, args), in posting order
+        self._seq = itertools.count()
+        self.after_id = None
+
+        # Counters for profiling
+        self.posted = 0
+        self.coalesced = 0
+        self.ran = 0
+        self.ticks = 0
+        self.due = None   # perf_counter time the next tick was scheduled for
+        self.jitter = registry.histogram("tk_tick_jitter_ms", help="How late Tk ran the UI pump tick")
+        self.pump_time = registry.histogram("ui_pump_ms", help="Time spent running UI commands per tick")
+        registry.gauge("ui_queue_depth", "UI commands waiting for the Tk thread",
+                       fn=lambda: len(self.commands))
+
+    def start(self):
+        # Tk thread only, like stop() and the pump itself
+        self._schedule(self.interval)
+        return self
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def post(self, fn, *args, key=None):
+        """Run fn(*args) on the Tk thread; safe to call from any thread."""
+        with self.lock:
+            self.posted += 1
+            if key is None:
+                key = ("_", next(self._seq))
+            elif key in self.commands:
+                # Newest wins, and moves behind anything posted in between
+                del self.commands[key]
+                self.coalesced += 1
+            self.commands[key] = (fn, args)
+
+    def _schedule(self, delay):
+        self.delay = delay
+        self.due = time.perf_counter() + delay / 1000
+        self.after_id = self.root.after(delay, self._pump)
+
+    def _pump(self):
+        self.after_id = None
+        self.ticks += 1
+        start = time.perf_counter()
+        self.jitter.observe(max(0.0, (start - self.due) * 1000))
+        deadline = start + self.budget
+        ran = 0
+        while True:
+            with self.lock:
+                if not self.commands:
+                    break
+                _, (fn, args) = self.commands.popitem(last=False)
+            try:
+                fn(*args)
+            except Exception as e:
+                print("UI command error:", e)
+            ran += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.ran += ran
+        if ran:
+            self.pump_time.observe((time.perf_counter() - start) * 1000)
+
+        # Poll quickly while there is traffic, back off when quiet
+        if ran or self.commands:
+            self._schedule(self.interval)
+        else:
+            self._schedule(min(self.delay * 2, self.idle_interval))
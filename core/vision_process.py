@@ -0,0 +1,157 @@
+"""Face detection in a child process, so OpenCV work never holds the Tk process's GIL.
+
+VisionProcess is a drop-in FaceDetector: capture, duty cycle and reactions
+stay on the parent's camera thread, but process_frame copies the frame into
+a shared-memory buffer and the child answers with a compact
+(face box, smiled) event over a queue. Arrays are never pickled. A child
+that dies or stops answering is restarted.
+
+The camera thread owns the child, the queues and the shared memory: stop()
+only asks it to finish, waiting at most VISION_STOP_WAIT (it runs on the Tk
+thread), and the thread shuts the child down on its way out, so nothing is
+torn down under a frame in flight.
+"""
+import multiprocessing as mp
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import VISION_STOP_WAIT, VISION_TIMEOUT
+from core.face_detector import FaceDetector
+
+
+def _vision_worker(requests, results):
+    """Child main loop: ("frame", seq, shm name, shape, smile_every) in → (seq, face, smiled) out.
+
+    ("reset",) drops the tracked face, as the parent does when it frees the camera.
+    """
+    detector = FaceDetector(None, None, None, enable_camera=False)
+    detector.load_cascades()
+    shm = None
+
+    while True:
+        msg = requests.get()
+        if msg is None:
+            break
+        if msg[0] == "reset":
+            detector.reset_tracking()
+            continue
+
+        _, seq, name, shape, detector.smile_every = msg
+        if shm is None or shm.name != name:
+            if shm is not None:
+                shm.close()
+            shm = shared_memory.SharedMemory(name=name)
+
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        face, smiled = detector.process_frame(frame)
+        del frame  # drop the view before the buffer can be closed
+        results.put((seq, face, smiled))
+
+    if shm is not None:
+        shm.close()
+
+
+class VisionProcess(FaceDetector):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ctx = mp.get_context("spawn")
+        self.process = None
+        self.requests = None
+        self.results = None
+        self.shm = None
+        self.seq = 0
+        self.stopping = False
+
+    # -------------------------------------------------
+    # CHILD LIFECYCLE
+    # -------------------------------------------------
+    def start(self):
+        if self.enable_camera:
+            self._spawn()
+        super().start()
+
+    def stop(self):
+        self.stopping = True
+        super().stop()
+        thread = getattr(self, "thread", None)
+        if thread is None:
+            self._shutdown()  # no camera thread: frames came from this caller
+        elif thread is not threading.current_thread():
+            # Usually done by now; one stuck on a frame (up to VISION_TIMEOUT)
+            # or a duty-cycle sleep shuts down when it wakes
+            thread.join(timeout=VISION_STOP_WAIT)
+
+    def _run(self):
+        try:
+            super()._run()
+        finally:
+            self._shutdown()
+
+    def _spawn(self):
+        self.requests = self.ctx.Queue()
+        self.results = self.ctx.Queue()
+        self.process = self.ctx.Process(
+            target=_vision_worker, args=(self.requests, self.results), daemon=True
+        )
+        self.process.start()
+        print(f"[Vision] Child process started (pid {self.process.pid}).")
+
+    def _shutdown(self):
+        if self.process is not None:
+            try:
+                self.requests.put(None)
+                self.process.join(timeout=2)
+            except Exception:
+                pass
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def _restart(self):
+        if self.stopping:
+            return
+        print("[Vision] Child process not responding, restarting.")
+        self._shutdown()
+        self._spawn()
+
+    # -------------------------------------------------
+    # FRAME HAND-OFF
+    # -------------------------------------------------
+    def _buffer_for(self, frame):
+        if self.shm is None or self.shm.size < frame.nbytes:
+            if self.shm is not None:
+                self.shm.close()
+                self.shm.unlink()
+            self.shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        return np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def reset_tracking(self):
+        super().reset_tracking()
+        if self.process is not None and not self.stopping:
+            self.requests.put(("reset",))
+
+    def process_frame(self, frame):
+        if self.stopping:
+            return None, None
+        if self.process is None or not self.process.is_alive():
+            self._restart()
+
+        self.seq += 1
+        self._buffer_for(frame)[:] = frame
+        self.requests.put(("frame", self.seq, self.shm.name, frame.shape, self.smile_every))
+
+        try:
+            while True:
+                seq, face, smiled = self.results.get(timeout=VISION_TIMEOUT)
+                if seq == self.seq:
+                    return face, smiled
+        except queue.Empty:
+            self._restart()
+            return None, None
@@ -1,7 +1,39 @@
-from core.app_window import AppWindow
+import argparse
+
+from core.startup import StartupProfiler
+
+
+def pet_count(value):
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value!r}")
+    if count < 1:
+        raise argparse.ArgumentTypeError("need at least 1 pet")
+    return count
+
 
 def main():
-    app = AppWindow()
+    parser = argparse.ArgumentParser(description="Desktop pet.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print per-stage wall and import times, then exit")
+    parser.add_argument("--pets", type=pet_count, metavar="N",
+                        help="N pet windows, cycling through the PETS entries in config")
+    args = parser.parse_args()
+    profile = args.profile_startup
+
+    pets = None
+    if args.pets is not None:
+        from config import PETS
+        pets = [dict(PETS[i % len(PETS)], x=None, y=None) if i >= len(PETS) else PETS[i]
+                for i in range(args.pets)]
+    profiler = StartupProfiler()
+    if profile:
+        profiler.install()
+
+    with profiler.stage("imports"):
+        from core.app_window import AppWindow
+    app = AppWindow(profiler, profile=profile, pets=pets)
     app.run()
 
 if __name__ == "__main__":
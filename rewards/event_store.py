@@ -0,0 +1,195 @@
+"""Append-only SQLite event log for rewards, with materialized totals.
+
+Every change is an event row (xp_gained, quest_completed, streak_changed,
+state_transition, ...). Current totals (stats, quests, unlocks) live in a
+small key → JSON table updated in the same transaction, so startup and
+reads never replay history. Events are buffered and inserted in batches
+once per SAVE_DEBOUNCE window (rewards.write_behind); a batch that fails
+(database locked, disk full) is put back and retried. The database runs in
+WAL mode.
+"""
+import json
+import time
+
+from sqlalchemy import (
+    Column, Float, Index, Integer, MetaData, String, Table, Text,
+    create_engine, event, func, select,
+)
+
+from config import SAVE_DEBOUNCE
+from core.metrics import registry
+from rewards.write_behind import WriteBehind
+
+metadata = MetaData()
+
+events = Table(
+    "events", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("ts", Float, nullable=False),
+    Column("type", String(32), nullable=False),
+    Column("value", Float, nullable=False, default=0),
+    Column("data", Text),
+    Index("ix_events_ts", "ts"),
+    Index("ix_events_type_ts", "type", "ts"),
+)
+
+totals = Table(
+    "totals", metadata,
+    Column("key", String(32), primary_key=True),
+    Column("value", Text, nullable=False),
+)
+
+
+def _set_pragmas(dbapi_conn, _):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
+class EventStore(WriteBehind):
+    def __init__(self, path, lock, debounce=SAVE_DEBOUNCE, clock=time):
+        self.engine = create_engine(f"sqlite:///{path}")
+        event.listen(self.engine, "connect", _set_pragmas)
+        metadata.create_all(self.engine)
+
+        # `lock` is the caller's lock around in-memory totals
+        super().__init__(lock, debounce)
+        self.clock = clock         # event timestamps: time module or a virtual clock
+        self.pending = []          # buffered event rows
+        self.dirty_totals = {}     # key -> live dict
+        self.write_ms = registry.histogram("db_write_ms", help="Reward batch transactions")
+
+    # -------------------------------------------------
+    # WRITES
+    # -------------------------------------------------
+    def append(self, type_, value=0, data=None, ts=None):
+        """Buffer one event; it reaches the database with the next batch."""
+        row = {
+            "ts": ts if ts is not None else self.clock.time(),
+            "type": type_,
+            "value": value,
+            "data": json.dumps(data) if data is not None else None,
+        }
+        with self.lock:
+            self.pending.append(row)
+            self._schedule()
+
+    def mark_dirty(self, key, data):
+        """Queue a materialized total to be rewritten with the next batch."""
+        with self.lock:
+            self.dirty_totals[key] = data
+            self._schedule()
+
+    def _take(self):
+        rows, self.pending = self.pending, []
+        totals_now = dict(self.dirty_totals)
+        self.dirty_totals.clear()
+        if not rows and not totals_now:
+            return None
+        snapshot = [{"key": key, "value": json.dumps(data)} for key, data in totals_now.items()]
+        return rows, totals_now, snapshot
+
+    def _write(self, batch):
+        """Insert buffered events and totals in one transaction."""
+        rows, _, snapshot = batch
+        with self.engine.begin() as conn:
+            if rows:
+                conn.execute(events.insert(), rows)
+            for item in snapshot:
+                conn.execute(
+                    totals.insert().prefix_with("OR REPLACE"), item
+                )
+
+    def _restore(self, batch):
+        # The transaction rolled back: older rows go first, newer marks win
+        rows, totals_now, _ = batch
+        self.pending[:0] = rows
+        for key, data in totals_now.items():
+            self.dirty_totals.setdefault(key, data)
+
+    def _written(self, elapsed):
+        self.write_ms.observe(elapsed * 1000)
+
+    # -------------------------------------------------
+    # READS
+    # -------------------------------------------------
+    def load_totals(self):
+        """Return {key: data} of every materialized total."""
+        with self.engine.connect() as conn:
+            return {
+                row.key: json.loads(row.value)
+                for row in conn.execute(select(totals))
+            }
+
+    def sum_value(self, type_, since, until=None):
+        """Sum of event values of one type in [since, until)."""
+        until = until if until is not None else self.clock.time()
+        query = select(func.coalesce(func.sum(events.c.value), 0)).where(
+            events.c.type == type_, events.c.ts >= since, events.c.ts < until
+        )
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+
+    def count(self, type_, since, until=None):
+        until = until if until is not None else self.clock.time()
+        query = select(func.count()).select_from(events).where(
+            events.c.type == type_, events.c.ts >= since, events.c.ts < until
+        )
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+
+    def daily_sum(self, type_, since, until=None):
+        """[(YYYY-MM-DD, sum of values)] per local day."""
+        until = until if until is not None else self.clock.time()
+        day = func.date(events.c.ts, "unixepoch", "localtime")
+        query = (
+            select(day, func.sum(events.c.value))
+            .where(events.c.type == type_, events.c.ts >= since, events.c.ts < until)
+            .group_by(day)
+            .order_by(day)
+        )
+        with self.engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(query)]
+
+    def history(self, since=0, until=None, types=None):
+        """[(ts, type, value, data)] in time order, optionally of some types only."""
+        until = until if until is not None else self.clock.time()
+        query = select(events.c.ts, events.c.type, events.c.value, events.c.data).where(
+            events.c.ts >= since, events.c.ts < until
+        )
+        if types:
+            query = query.where(events.c.type.in_(types))
+        with self.engine.connect() as conn:
+            return [
+                (row.ts, row.type, row.value, json.loads(row.data) if row.data else None)
+                for row in conn.execute(query.order_by(events.c.ts, events.c.id))
+            ]
+
+    def seconds_in_state(self, state, since, until=None):
+        """Time spent in a pet state, from state_transition events."""
+        until = until if until is not None else self.clock.time()
+        # State at `since` comes from the last transition before it
+        before = (
+            select(events.c.data)
+            .where(events.c.type == "state_transition", events.c.ts < since)
+            .order_by(events.c.ts.desc())
+            .limit(1)
+        )
+        during = (
+            select(events.c.ts, events.c.data)
+            .where(events.c.type == "state_transition",
+                   events.c.ts >= since, events.c.ts < until)
+            .order_by(events.c.ts)
+        )
+        with self.engine.connect() as conn:
+            row = conn.execute(before).first()
+            current = json.loads(row.data)["to"] if row else None
+            total, entered = 0.0, since
+            for ts, data in conn.execute(during):
+                if current == state:
+                    total += ts - entered
+                current, entered = json.loads(data)["to"], ts
+        if current == state:
+            total += until - entered
+        return total
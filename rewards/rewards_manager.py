@@ -1,14 +1,24 @@
 import json
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import DATA_DIR, REWARDS_DB
+from rewards.event_store import EventStore
 
 
 class RewardsManager:
-    def __init__(self):
-        self.data_dir = "data"
+    def __init__(self, data_dir=DATA_DIR, clock=time):
+        self.data_dir = data_dir
+        self.clock = clock
         os.makedirs(self.data_dir, exist_ok=True)
 
-        # File paths
+        # Called from the keyboard hook and the monitor thread
+        self.lock = threading.RLock()
+        self.store = EventStore(os.path.join(self.data_dir, REWARDS_DB), self.lock, clock=clock)
+
+        # Legacy JSON files (imported once into the event store)
         self.stats_file = os.path.join(self.data_dir, "stats.json")
         self.quests_file = os.path.join(self.data_dir, "quests.json")
         self.unlocks_file = os.path.join(self.data_dir, "unlocks.json")
@@ -32,112 +42,165 @@ class RewardsManager:
             "accessories": []
         }
 
-        # Load
-        self.stats = self._load_json(self.stats_file, self.stats_defaults)
-        self.quests = self._load_json(self.quests_file, self.quests_defaults)
-        self.unlocks = self._load_json(self.unlocks_file, self.unlocks_defaults)
+        # Load materialized totals (one-time migration from JSON)
+        saved = self.store.load_totals()
+        if not saved:
+            saved = self._migrate_json()
+
+        self.stats = self._with_defaults(saved.get("stats"), self.stats_defaults, "stats")
+        self.quests = self._with_defaults(saved.get("quests"), self.quests_defaults, "quests")
+        self.unlocks = self._with_defaults(saved.get("unlocks"), self.unlocks_defaults, "unlocks")
 
     # --------------------------------------------------
-    # JSON LOAD / SAVE
+    # LOAD / SAVE
     # --------------------------------------------------
-    def _load_json(self, path, defaults):
-        """Load file safely, recreate missing keys."""
-        if not os.path.exists(path):
-            self._save_json(path, defaults)
-            return defaults.copy()
-
-        try:
-            with open(path, "r") as f:
-                data = json.load(f)
-        except:
-            data = {}
-
-        # Add any missing default keys
-        for key, value in defaults.items():
-            if key not in data:
-                data[key] = value
-
-        self._save_json(path, data)
+    def _migrate_json(self):
+        """Import the old stats/quests/unlocks JSON files into the event store."""
+        saved = {}
+        for key, path in [("stats", self.stats_file),
+                          ("quests", self.quests_file),
+                          ("unlocks", self.unlocks_file)]:
+            try:
+                with open(path, "r") as f:
+                    saved[key] = json.load(f)
+            except:
+                continue
+            self._save(key, saved[key])
+
+        if saved:
+            print(f"[REWARDS] Migrated {', '.join(saved)} from JSON")
+            self.store.append("migrated", data=sorted(saved))
+            self.store.flush()
+        return saved
+
+    def _with_defaults(self, data, defaults, key):
+        """Recreate missing keys."""
+        data = data if isinstance(data, dict) else {}
+        missing = [name for name in defaults if name not in data]
+        for name in missing:
+            data[name] = json.loads(json.dumps(defaults[name]))  # deep copy
+        if missing:
+            self._save(key, data)
         return data
 
-    def _save_json(self, path, data):
-        with open(path, "w") as f:
-            json.dump(data, f, indent=4)
+    def _save(self, key, data):
+        # Batched: written with the next event batch
+        self.store.mark_dirty(key, data)
+
+    def flush(self):
+        """Write pending changes now (call on shutdown)."""
+        self.store.flush()
 
     # --------------------------------------------------
     # XP & LEVEL SYSTEM
     # --------------------------------------------------
     def add_xp(self, amount):
-        self.stats["xp"] += amount
-        print(f"[XP] Added {amount}, total: {self.stats['xp']}")
+        with self.lock:
+            self.stats["xp"] += amount
+            self.store.append("xp_gained", amount)
+            print(f"[XP] Added {amount}, total: {self.stats['xp']}")
 
-        # Level-up every 100 XP
-        while self.stats["xp"] >= 100:
-            self.stats["xp"] -= 100
-            self.stats["level"] += 1
-            print(f"[LEVEL UP] → Level {self.stats['level']}")
+            # Level-up every 100 XP
+            while self.stats["xp"] >= 100:
+                self.stats["xp"] -= 100
+                self.stats["level"] += 1
+                self.store.append("level_up", self.stats["level"])
+                print(f"[LEVEL UP] → Level {self.stats['level']}")
 
-        self._save_json(self.stats_file, self.stats)
+            self._save("stats", self.stats)
 
     # --------------------------------------------------
     # STREAK SYSTEM
     # --------------------------------------------------
     def add_streak(self, amount=1):
-        if "streak" not in self.stats:
-            self.stats["streak"] = 0  # safety
+        with self.lock:
+            if "streak" not in self.stats:
+                self.stats["streak"] = 0  # safety
 
-        self.stats["streak"] += amount
-        print(f"[STREAK] +{amount}, total = {self.stats['streak']}")
-        self._save_json(self.stats_file, self.stats)
+            self.stats["streak"] += amount
+            self.store.append("streak_changed", amount, {"streak": self.stats["streak"]})
+            print(f"[STREAK] +{amount}, total = {self.stats['streak']}")
+            self._save("stats", self.stats)
 
     def reset_streak(self):
-        self.stats["streak"] = 0
-        print("[STREAK] Reset → 0")
-        self._save_json(self.stats_file, self.stats)
+        with self.lock:
+            delta = -self.stats.get("streak", 0)
+            self.stats["streak"] = 0
+            self.store.append("streak_changed", delta, {"streak": 0})
+            print("[STREAK] Reset → 0")
+            self._save("stats", self.stats)
 
     # --------------------------------------------------
     # QUESTS SYSTEM
     # --------------------------------------------------
     def complete_quest(self, quest_id):
-        if quest_id not in self.quests:
-            print(f"[QUEST] Unknown quest '{quest_id}'")
-            return
+        with self.lock:
+            if quest_id not in self.quests:
+                print(f"[QUEST] Unknown quest '{quest_id}'")
+                return
 
-        if self.quests[quest_id] is True:
-            return  # already done today
+            if self.quests[quest_id] is True:
+                return  # already done today
 
-        self.quests[quest_id] = True
-        print(f"[QUEST] Completed: {quest_id}")
+            self.quests[quest_id] = True
+            self.store.append("quest_completed", data={"quest": quest_id})
+            print(f"[QUEST] Completed: {quest_id}")
 
-        # Quest rewards mapping
-        quest_rewards = {
-            "25sec_focus": 10,
-            "1min_focus": 25,
-            "daily_focus": 15
-        }
+            # Quest rewards mapping
+            quest_rewards = {
+                "25sec_focus": 10,
+                "1min_focus": 25,
+                "daily_focus": 15
+            }
 
-        if quest_id in quest_rewards:
-            self.add_xp(quest_rewards[quest_id])
+            if quest_id in quest_rewards:
+                self.add_xp(quest_rewards[quest_id])
 
-        self._save_json(self.quests_file, self.quests)
+            self._save("quests", self.quests)
 
     def reset_daily_quests(self):
-        for key in self.quests_defaults:
-            self.quests[key] = False
-        print("[QUESTS] Reset daily quests")
-        self._save_json(self.quests_file, self.quests)
+        with self.lock:
+            for key in self.quests_defaults:
+                self.quests[key] = False
+            self.store.append("quests_reset")
+            print("[QUESTS] Reset daily quests")
+            self._save("quests", self.quests)
 
     # --------------------------------------------------
     # UNLOCKS
     # --------------------------------------------------
     def unlock_item(self, category, item_name):
-        if category not in self.unlocks:
-            print(f"[UNLOCK] Unknown category '{category}'")
-            return
+        with self.lock:
+            if category not in self.unlocks:
+                print(f"[UNLOCK] Unknown category '{category}'")
+                return
+
+            if item_name not in self.unlocks[category]:
+                self.unlocks[category].append(item_name)
+                self.store.append("item_unlocked", data={"category": category, "item": item_name})
+                print(f"[UNLOCK] New {category[:-1]} unlocked → {item_name}")
 
-        if item_name not in self.unlocks[category]:
-            self.unlocks[category].append(item_name)
-            print(f"[UNLOCK] New {category[:-1]} unlocked → {item_name}")
+            self._save("unlocks", self.unlocks)
 
-        self._save_json(self.unlocks_file, self.unlocks)
-      
+    # --------------------------------------------------
+    # HISTORY
+    # --------------------------------------------------
+    def record_state(self, old_state, new_state):
+        self.store.append("state_transition", data={"from": old_state, "to": new_state})
+
+    def focused_minutes(self, days=7):
+        """Minutes spent focused over the last `days` days."""
+        since = self.clock.time() - days * 86400
+        self.store.flush()
+        return self.store.seconds_in_state("focused", since) / 60
+
+    def xp_today(self):
+        now = datetime.fromtimestamp(self.clock.time())
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.store.flush()
+        return self.store.sum_value("xp_gained", midnight.timestamp())
+
+    def xp_by_day(self, days=7):
+        since = datetime.fromtimestamp(self.clock.time()) - timedelta(days=days)
+        self.store.flush()
+        return self.store.daily_sum("xp_gained", since.timestamp())
@@ -0,0 +1,79 @@
+import abc
+import atexit
+import threading
+import time
+
+from config import SAVE_DEBOUNCE
+
+
+class WriteBehind(abc.ABC):
+    """Debounced background writes (EventStore builds on it).
+
+    Callers change their data under `lock` and call _schedule(); once per
+    debounce window flush() takes a snapshot (_take) under the lock and
+    writes it (_write) outside it. A failed write is handed back (_restore)
+    and retried a window later, so a locked or full disk loses nothing.
+    Anything pending is flushed at exit.
+    """
+
+    def __init__(self, lock, debounce=SAVE_DEBOUNCE):
+        self.lock = lock
+        self.debounce = debounce
+        self.timer = None
+        self.write_lock = threading.Lock()
+
+        # Counters for profiling
+        self.writes = 0
+        self.write_time = 0.0
+        self.failures = 0
+
+        atexit.register(self.flush)
+
+    def _schedule(self):
+        # Called with self.lock held
+        if self.timer is None:
+            self.timer = threading.Timer(self.debounce, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """Write everything pending now."""
+        # write_lock first: snapshots reach the disk in the order they were taken
+        with self.write_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                batch = self._take()
+            if not batch:
+                return
+
+            start = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception as e:
+                self.failures += 1
+                print("Save error, retrying later:", e)
+                with self.lock:
+                    self._restore(batch)
+                    self._schedule()
+                return
+            elapsed = time.perf_counter() - start
+            self.writes += 1
+            self.write_time += elapsed
+            self._written(elapsed)
+
+    @abc.abstractmethod
+    def _take(self):
+        """Snapshot and clear what is pending (lock held); falsy when nothing is."""
+
+    @abc.abstractmethod
+    def _write(self, batch):
+        """Persist a batch; raise to have it restored and retried."""
+
+    @abc.abstractmethod
+    def _restore(self, batch):
+        """Put a batch that failed to write back in front of newer changes (lock held)."""
+
+    def _written(self, elapsed):
+        pass